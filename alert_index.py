@@ -0,0 +1,16 @@
+class AlertIndex:
+    """Low-stock set kept up to date as rows change.
+
+    Rows are identified by their position in the inventory table. Expiry
+    alerts come from the lots (see LotBook.expiring_between), which hold
+    each lot's own date.
+    """
+
+    def __init__(self):
+        self.low_stock = set()
+
+    def refresh(self, pos, quantity, min_stock):
+        if quantity <= min_stock:
+            self.low_stock.add(pos)
+        else:
+            self.low_stock.discard(pos)
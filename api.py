@@ -0,0 +1,299 @@
+"""JSON HTTP API for inventory operations, for barcode scanners and ward systems.
+
+Runs on Tornado (already installed with Streamlit) against the same
+InventoryDB the dashboard uses. Set INVENTORY_API_PORT and the Streamlit
+app serves the API from its own process, sharing the database and login
+sessions; ``python api.py`` runs it on its own instead. Don't run both on
+the same data directory, as each process would write its own journal.
+
+Clients log in once (POST /api/login) and send the returned token as
+``Authorization: Bearer <token>``. Every write endpoint has a batch form
+taking up to MAX_BATCH records in one request.
+
+    POST  /api/login                      {"username", "password"}
+    GET   /api/items?q=&limit=            search or list items
+    GET   /api/items/<id or name>
+    POST  /api/items                      one item (Admin)
+    POST  /api/items/batch                {"items": [...]} (Admin)
+    PATCH /api/items/<id or name>         Quantity / Min_Stock / Location (Admin)
+    GET   /api/low-stock
+    POST  /api/usage                      {"item", "quantity", "department", "remarks"}
+    POST  /api/usage/batch                {"records": [...]}, or all-or-nothing with
+                                          {"atomic": true, "department", "remarks", "records"}
+    POST  /api/purchase-orders            {"item", "quantity", "supplier"} (Doctor, Admin)
+    POST  /api/purchase-orders/batch      {"orders": [...]} (Doctor, Admin)
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+
+import pandas as pd
+import tornado.web
+from tornado.ioloop import IOLoop
+
+import bulk_import
+from auth import CredentialStore, SessionStore
+from inventory_db import DATA_DIR, InventoryDB
+from persistence import _json_default
+
+MAX_BATCH = 1000
+UPDATABLE_FIELDS = ('Quantity', 'Min_Stock', 'Location')
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    # Roles allowed to call the handler; None means any logged-in user
+    roles = None
+    login_required = True
+
+    def initialize(self, db, credentials, sessions):
+        self.db = db
+        self.credentials = credentials
+        self.sessions = sessions
+        self.user = None
+
+    def prepare(self):
+        if not self.login_required:
+            return
+        header = self.request.headers.get('Authorization', '')
+        token = header[len('Bearer '):] if header.startswith('Bearer ') else None
+        self.user = self.sessions.get(token)
+        if self.user is None:
+            raise tornado.web.HTTPError(401, reason='Log in first')
+        if self.roles and self.user['role'] not in self.roles:
+            raise tornado.web.HTTPError(403, reason=f"Not allowed for role {self.user['role']}")
+
+    def json_body(self):
+        try:
+            body = json.loads(self.request.body or b'{}')
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason='Body must be JSON')
+        if not isinstance(body, dict):
+            raise tornado.web.HTTPError(400, reason='Body must be a JSON object')
+        return body
+
+    def batch(self, body, key):
+        records = body.get(key)
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise tornado.web.HTTPError(400, reason=f'"{key}" must be a list of objects')
+        if len(records) > MAX_BATCH:
+            raise tornado.web.HTTPError(413, reason=f'At most {MAX_BATCH} records per request')
+        return records
+
+    def position(self, key):
+        if key not in self.db.store:
+            raise tornado.web.HTTPError(404, reason=f'Unknown item: {key}')
+        return self.db.store.position(key)
+
+    def send(self, data, status=200):
+        self.set_status(status)
+        self.set_header('Content-Type', 'application/json')
+        self.finish(json.dumps(data, default=_json_default))
+
+    def write_error(self, status_code, **kwargs):
+        self.set_header('Content-Type', 'application/json')
+        self.finish(json.dumps({'error': self._reason}))
+
+
+def _whole_number(value, minimum=1):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= minimum
+
+
+class LoginHandler(BaseHandler):
+    login_required = False
+
+    async def post(self):
+        body = self.json_body()
+        # The password hash is slow on purpose; keep it off the event loop
+        user = await IOLoop.current().run_in_executor(
+            None, self.credentials.authenticate, str(body.get('username', '')), str(body.get('password', '')))
+        if user is None:
+            raise tornado.web.HTTPError(401, reason='Invalid username or password')
+        self.send({'token': self.sessions.issue(user), 'role': user['role'], 'name': user['name']})
+
+
+class ItemsHandler(BaseHandler):
+
+    def get(self):
+        query = self.get_argument('q', '')
+        try:
+            limit = int(self.get_argument('limit', '100'))
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason='limit must be a number')
+        if limit < 0:
+            raise tornado.web.HTTPError(400, reason='limit must be >= 0')
+        df = self.db.store.search_items(query) if query else self.db.store.df
+        self.send({'items': df.head(limit).to_dict('records')})
+
+    def post(self):
+        if self.user['role'] != 'Admin':
+            raise tornado.web.HTTPError(403, reason='Only admins can add items')
+        result = upsert(self.db, [self.json_body()])
+        if result['rejected']:
+            raise tornado.web.HTTPError(400, reason=result['rejected'][0]['reason'])
+        self.send(result, 201 if result['inserted'] else 200)
+
+
+class ItemsBatchHandler(BaseHandler):
+    roles = ('Admin',)
+
+    def post(self):
+        self.send(upsert(self.db, self.batch(self.json_body(), 'items')))
+
+
+def upsert(db, items):
+    """Validate items like a bulk import and upsert the valid ones."""
+    report = {'inserted': 0, 'updated': 0, 'rejected': []}
+    if not items:
+        return report
+    valid, rejected = bulk_import.validate_chunk(pd.DataFrame(items), db.store)
+    if len(valid):
+        report['updated'], report['inserted'] = db.upsert_items(valid)
+    report['rejected'] = [{'index': int(i), 'reason': reason} for i, reason in rejected['Reason'].items()]
+    return report
+
+
+class ItemHandler(BaseHandler):
+
+    def get(self, key):
+        self.send(self.db.store.df.iloc[self.position(key)].to_dict())
+
+    def patch(self, key):
+        if self.user['role'] != 'Admin':
+            raise tornado.web.HTTPError(403, reason='Only admins can update items')
+        self.position(key)
+        body = self.json_body()
+        values = {field: body[field] for field in UPDATABLE_FIELDS if field in body}
+        for field in ('Quantity', 'Min_Stock'):
+            if field in values and not _whole_number(values[field], 0):
+                raise tornado.web.HTTPError(400, reason=f'{field} must be a whole number >= 0')
+        if 'Location' in values and not (isinstance(values['Location'], str) and values['Location'].strip()):
+            raise tornado.web.HTTPError(400, reason='Location must be a non-empty string')
+        if not values:
+            raise tornado.web.HTTPError(400, reason=f"Nothing to update; send any of {', '.join(UPDATABLE_FIELDS)}")
+        self.db.update_item(key, **values)
+        self.send(self.db.store.df.iloc[self.position(key)].to_dict())
+
+
+class LowStockHandler(BaseHandler):
+
+    def get(self):
+        self.send({'items': self.db.store.low_stock_items().to_dict('records')})
+
+
+class UsageHandler(BaseHandler):
+
+    def record(self, record):
+        item, quantity, department = record.get('item'), record.get('quantity'), record.get('department')
+        if not isinstance(item, str) or item not in self.db.store:
+            return 404, {'ok': False, 'error': f'Unknown item: {item}'}
+        if not _whole_number(quantity):
+            return 400, {'ok': False, 'error': 'quantity must be a whole number > 0'}
+        if not department:
+            return 400, {'ok': False, 'error': 'department is required'}
+        ok, remaining = self.db.record_usage(item, quantity, self.user['name'], str(department), str(record.get('remarks', '')))
+        if not ok:
+            return 409, {'ok': False, 'error': 'Insufficient stock', 'quantity_after': remaining}
+        return 200, {'ok': True, 'quantity_after': remaining}
+
+    def post(self):
+        status, result = self.record(self.json_body())
+        self.send(result, status)
+
+
+class UsageBatchHandler(UsageHandler):
+
+    def post(self):
+        body = self.json_body()
+        records = self.batch(body, 'records')
+        if body.get('atomic'):
+            self.record_atomic(body, records)
+            return
+        results = [self.record(record)[1] for record in records]
+        self.send({'recorded': sum(r['ok'] for r in results), 'results': results})
+
+    def record_atomic(self, body, records):
+        # One department and remark for the whole batch, like the dashboard cart
+        if not body.get('department'):
+            raise tornado.web.HTTPError(400, reason='department is required for an atomic batch')
+        items = [record.get('item') if isinstance(record.get('item'), str) else None for record in records]
+        ok, result = self.db.record_usage_batch(
+            items, [record.get('quantity') for record in records], self.user['name'],
+            str(body['department']), str(body.get('remarks', '')))
+        if ok:
+            self.send({'recorded': len(result), 'results': result.to_dict('records')})
+        else:
+            self.send({'error': 'Nothing was recorded', 'problems': result.astype(object).where(result.notna(), None).to_dict('records')}, 409)
+
+
+class PurchaseOrderHandler(BaseHandler):
+    roles = ('Doctor', 'Admin')
+
+    def create(self, order):
+        item, quantity = order.get('item'), order.get('quantity')
+        if not isinstance(item, str) or item not in self.db.store:
+            return 404, {'error': f'Unknown item: {item}'}
+        if not _whole_number(quantity):
+            return 400, {'error': 'quantity must be a whole number > 0'}
+        status = 'Approved' if self.user['role'] == 'Admin' else 'Pending Approval'
+        item_name = self.db.store.get(item, 'Item_Name')
+        po_id = self.db.create_purchase_order(item_name, quantity, str(order.get('supplier', 'Pending')), status, self.user['name'])
+        if po_id is None:
+            return 409, {'error': 'Purchase order number already taken, retry'}
+        return 201, {'po_id': po_id, 'status': status}
+
+    def post(self):
+        status, result = self.create(self.json_body())
+        self.send(result, status)
+
+
+class PurchaseOrderBatchHandler(PurchaseOrderHandler):
+
+    def post(self):
+        self.send({'results': [self.create(order)[1] for order in self.batch(self.json_body(), 'orders')]})
+
+
+def make_app(db, credentials, sessions):
+    context = {'db': db, 'credentials': credentials, 'sessions': sessions}
+    return tornado.web.Application([
+        (r'/api/login', LoginHandler, context),
+        (r'/api/items', ItemsHandler, context),
+        (r'/api/items/batch', ItemsBatchHandler, context),
+        (r'/api/items/(.+)', ItemHandler, context),
+        (r'/api/low-stock', LowStockHandler, context),
+        (r'/api/usage', UsageHandler, context),
+        (r'/api/usage/batch', UsageBatchHandler, context),
+        (r'/api/purchase-orders', PurchaseOrderHandler, context),
+        (r'/api/purchase-orders/batch', PurchaseOrderBatchHandler, context),
+    ])
+
+
+def start_in_background(db, credentials, sessions, port, address='127.0.0.1'):
+    """Serve the API from a daemon thread with its own event loop."""
+    listening = threading.Event()
+
+    async def serve():
+        make_app(db, credentials, sessions).listen(port, address)
+        listening.set()
+        await asyncio.Event().wait()
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), name='inventory-api', daemon=True)
+    thread.start()
+    listening.wait()
+    return thread
+
+
+async def main(port, address):
+    db = InventoryDB(DATA_DIR)
+    make_app(db, CredentialStore(os.path.join(DATA_DIR, 'users.json')), SessionStore()).listen(port, address)
+    print(f'Inventory API listening on http://{address}:{port}/api')
+    await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve the inventory JSON API')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('INVENTORY_API_PORT', 8502)))
+    parser.add_argument('--address', default='127.0.0.1')
+    args = parser.parse_args()
+    asyncio.run(main(args.port, args.address))
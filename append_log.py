@@ -0,0 +1,135 @@
+import threading
+
+import pandas as pd
+
+
+class AppendLog:
+    """Append-only table stored as column chunks.
+
+    Rows are appended to per-column Python lists, which is amortized O(1);
+    once a chunk reaches ``chunk_size`` rows it is sealed into a DataFrame.
+    A full DataFrame is only assembled when ``to_frame()`` is called, and is
+    cached until the next append. Appends and reads are guarded by a lock
+    so a reader never sees a half-written row.
+
+    Sealed chunks never change, so a snapshot saves each one once, as its
+    own segment file (see ``capture``), and only copies the unsealed tail.
+    """
+
+    def __init__(self, columns, chunk_size=4096):
+        self.columns = list(columns)
+        self.chunk_size = chunk_size
+        self._chunks = []
+        self._tail = {col: [] for col in self.columns}
+        self._tail_len = 0
+        self._sealed_len = 0
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._sealed_len + self._tail_len
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def append(self, row):
+        with self._lock:
+            self._append(row)
+
+    def _append(self, row):
+        for col in self.columns:
+            self._tail[col].append(row.get(col))
+        self._tail_len += 1
+        if self._tail_len >= self.chunk_size:
+            self._seal()
+
+    @classmethod
+    def from_dict(cls, data, chunk_size=4096):
+        log = cls(data.keys(), chunk_size=chunk_size)
+        # Whole chunks are sliced off one frame rather than appended row by row
+        frame = pd.DataFrame(data, columns=log.columns)
+        sealed = len(frame) - len(frame) % chunk_size
+        for start in range(0, sealed, chunk_size):
+            log._add_chunk(frame.iloc[start:start + chunk_size].reset_index(drop=True))
+        log._set_tail({col: values[sealed:] for col, values in data.items()})
+        return log
+
+    @classmethod
+    def from_state(cls, state, read_segment, chunk_size=4096):
+        """A log from ``capture()``'s state, reading each segment with
+        ``read_segment(name)``. Accepts ``to_dict()`` output too."""
+        if 'segments' not in state:
+            # Snapshot written before logs were kept as segments
+            return cls.from_dict(state, chunk_size)
+        log = cls(state['columns'], chunk_size=chunk_size)
+        for name in state['segments']:
+            log._add_chunk(pd.DataFrame(read_segment(name), columns=log.columns))
+        log._set_tail(state['tail'])
+        return log
+
+    def _add_chunk(self, chunk):
+        self._chunks.append(chunk)
+        self._sealed_len += len(chunk)
+
+    def _set_tail(self, tail):
+        self._tail = {col: list(tail.get(col, [])) for col in self.columns}
+        self._tail_len = len(self._tail[self.columns[0]]) if self.columns else 0
+
+    def capture(self, name):
+        """(state, segments) for a snapshot. Sealed chunks are handed over
+        as ``segments`` ({file name: frame}); a chunk keeps its file name
+        for good, so a snapshot writer can skip files it wrote before.
+        Only the unsealed rows are copied."""
+        with self._lock:
+            chunks = list(self._chunks)
+            tail = {col: list(values) for col, values in self._tail.items()}
+        names = [f'{name}-{i:06}.json' for i in range(len(chunks))]
+        return {'columns': self.columns, 'segments': names, 'tail': tail}, dict(zip(names, chunks))
+
+    def to_dict(self):
+        data = {col: [] for col in self.columns}
+        for chunk in self.chunks():
+            for col in self.columns:
+                data[col].extend(chunk[col].tolist())
+        return data
+
+    def extend(self, rows):
+        # Readers see either none or all of the rows
+        with self._lock:
+            for row in rows:
+                self._append(row)
+
+    def _seal(self):
+        self._add_chunk(pd.DataFrame(self._tail, columns=self.columns))
+        self._tail = {col: [] for col in self.columns}
+        self._tail_len = 0
+
+    def chunks(self):
+        """Yield the log as DataFrames of at most ``chunk_size`` rows."""
+        with self._lock:
+            chunks = list(self._chunks)
+            tail = {col: list(values) for col, values in self._tail.items()} if self._tail_len else None
+        yield from chunks
+        if tail:
+            yield pd.DataFrame(tail, columns=self.columns)
+
+    def to_frame(self):
+        # The log only grows, so a cached frame of the current length is still valid
+        frame = self._frame
+        if frame is None or len(frame) != len(self):
+            frames = list(self.chunks())
+            if frames:
+                frame = pd.concat(frames, ignore_index=True)
+            else:
+                frame = pd.DataFrame(columns=self.columns)
+            self._frame = frame
+        return frame
+
+    def tail(self, n=5):
+        with self._lock:
+            if self._tail_len >= n or not self._chunks:
+                frame = pd.DataFrame(self._tail, columns=self.columns).tail(n)
+                frame.index = range(len(self) - len(frame), len(self))
+                return frame
+        return self.to_frame().tail(n)
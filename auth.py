@@ -0,0 +1,147 @@
+"""Password hashing, the credential file and login session tokens.
+
+Passwords are stored as salted PBKDF2-SHA256 hashes, which are deliberately
+slow to compute. A successful login issues a random session token; later
+requests present the token and are checked against an in-memory cache, so
+the hash is only computed once per login rather than on every rerun.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+HASH_ITERATIONS = 200_000
+
+# Demo accounts; only the hashes are kept here (the passwords are the ones
+# shown on the login page)
+DEFAULT_USERS = {
+    'nurse1': {'role': 'Nurse', 'name': 'Sister Priya', 'hash': 'pbkdf2_sha256$200000$VNZpBrUhp5XG4mXD0dTupQ==$IlzDL3jQ//1rnUdMMOJD3MNKJ6uNu2zdZG+GLZRVlZQ='},
+    'doctor1': {'role': 'Doctor', 'name': 'Dr. Sharma', 'hash': 'pbkdf2_sha256$200000$oi0KcCTStf8K0y399cjepw==$pjOHx9UIUmzXV6I03NmIyp9lvWNRJHmrikTa7adi1nc='},
+    'admin1': {'role': 'Admin', 'name': 'Hospital Admin1', 'hash': 'pbkdf2_sha256$200000$6oiY63uzpb88DClOYPMWqA==$IY/3KHq8SzPn6yxhnQVi43YKqaUEmSn2GpLuDxdL55Q='},
+    'nurse2': {'role': 'Nurse', 'name': 'Sister P.Kaur', 'hash': 'pbkdf2_sha256$200000$xpuiSxYH7vtivmMU6CJ6dw==$cv18cqJON1RnmQ3P3WAKvv6iOdAp7dHyJSCtEj2jktE='},
+    'doctor2': {'role': 'Doctor', 'name': 'Dr. S.K.Thakur', 'hash': 'pbkdf2_sha256$200000$LiPoYZbZJ606dEV4avSeog==$3xVcr36XVNFHiASaC40fmbvwAoEpoKhLIjSv41ReNnM='},
+    'admin2': {'role': 'Admin', 'name': 'Hospital Admin2', 'hash': 'pbkdf2_sha256$200000$1Z0pBh+U/kvxVRh72yL27Q==$HT5rANtLTx10FcKsUXHI60yBIVxSdqlFI90Pl4hniKU='},
+    'nurse3': {'role': 'Nurse', 'name': 'Sister Shefali', 'hash': 'pbkdf2_sha256$200000$wpaI7U6+4+R4X5fo9O0vrA==$rf12b2/FqPSwa5x8NQ6b42XDbtAbW2In9E84V/CqiZw='},
+    'doctor3': {'role': 'Doctor', 'name': 'Dr. A.K.Gupta', 'hash': 'pbkdf2_sha256$200000$eGoTYpODLm54eIjlW85gOQ==$lzESRjc7VLlLWQ9ERjoR7i0qDV8qEAYaA3fFaFiEZXo='},
+    'admin3': {'role': 'Admin', 'name': 'Hospital Admin3', 'hash': 'pbkdf2_sha256$200000$u2xzvDr3FKgyr4489NlPdQ==$FKkHxQnjj8d5jPGSEiGvj0jPKG4cjN1/6lndZxD8/dg='},
+}
+
+
+def hash_password(password, salt=None, iterations=HASH_ITERATIONS):
+    salt = salt or os.urandom(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return '$'.join(['pbkdf2_sha256', str(iterations),
+                     base64.b64encode(salt).decode('ascii'), base64.b64encode(digest).decode('ascii')])
+
+
+def verify_password(password, encoded):
+    algorithm, iterations, salt, digest = encoded.split('$')
+    if algorithm != 'pbkdf2_sha256':
+        return False
+    expected = hash_password(password, base64.b64decode(salt), int(iterations))
+    return hmac.compare_digest(expected.split('$')[3], digest)
+
+
+class CredentialStore:
+    """Users and password hashes in a JSON file, created from
+    DEFAULT_USERS the first time.
+
+    ``max_concurrent_hashes`` bounds how many password checks run at once,
+    so a burst of logins can't take every core away from the sessions that
+    are already logged in. hashlib releases the GIL while hashing, so other
+    threads keep running while checks are in progress.
+    """
+
+    def __init__(self, path, max_concurrent_hashes=None):
+        self.path = path
+        self._slots = threading.BoundedSemaphore(max_concurrent_hashes or os.cpu_count() or 1)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.users = json.load(f)
+        else:
+            self.users = {username: dict(user) for username, user in DEFAULT_USERS.items()}
+            self._save()
+        # Checked when the username is unknown, so a miss takes as long as a hit
+        self._dummy_hash = hash_password(secrets.token_hex(8))
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.users, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def authenticate(self, username, password):
+        """The user's record (without the hash) if the password matches, else None."""
+        user = self.users.get(username)
+        with self._slots:
+            ok = verify_password(password, user['hash'] if user else self._dummy_hash)
+        if not (ok and user):
+            return None
+        return {'username': username, 'role': user['role'], 'name': user['name']}
+
+    def set_password(self, username, password):
+        self.users[username]['hash'] = hash_password(password)
+        self._save()
+
+
+class SessionStore:
+    """Login sessions keyed by token, with a fixed lifetime, an idle
+    timeout and LRU eviction.
+
+    Only a SHA-256 of each token is kept, so the cache contents can't be
+    replayed as tokens. A session ends ``ttl_seconds`` after login, or
+    earlier once unused for ``idle_seconds``. When ``max_sessions`` is
+    reached the least recently used session is dropped.
+    """
+
+    def __init__(self, ttl_seconds=8 * 3600, idle_seconds=30 * 60, max_sessions=10_000):
+        self.ttl_seconds = ttl_seconds
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def issue(self, user):
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[self._key(token)] = (user, now + self.ttl_seconds, now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return token
+
+    def get(self, token):
+        """The user for a live token, or None if it is unknown, expired or
+        has been idle too long. Each call counts as use."""
+        if not token:
+            return None
+        key = self._key(token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return None
+            user, expires_at, last_used = entry
+            if expires_at < now or last_used + self.idle_seconds < now:
+                del self._sessions[key]
+                return None
+            self._sessions[key] = (user, expires_at, now)
+            self._sessions.move_to_end(key)
+            return user
+
+    def revoke(self, token):
+        with self._lock:
+            self._sessions.pop(self._key(token), None)
@@ -0,0 +1,323 @@
+import random
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import datetime
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+BED_COLUMNS = ['Bed ID', 'Ward', 'Status', 'Patient']
+STAY_COLUMNS = ['Bed ID', 'Ward', 'Patient', 'Start', 'End']
+
+# End of a stay with no planned discharge
+OPEN_END = datetime.max
+
+_start = itemgetter(0)
+
+
+class _Node:
+    __slots__ = ('key', 'end', 'patient', 'priority', 'left', 'right', 'max_end')
+
+    def __init__(self, key, end, patient):
+        self.key = key
+        self.end = end
+        self.patient = patient
+        self.priority = random.random()
+        self.left = self.right = None
+        self.max_end = end
+
+
+def _update(node):
+    node.max_end = node.end
+    for child in (node.left, node.right):
+        if child is not None and child.max_end > node.max_end:
+            node.max_end = child.max_end
+
+
+def _rotate_right(node):
+    top = node.left
+    node.left, top.right = top.right, node
+    _update(node)
+    _update(top)
+    return top
+
+
+def _rotate_left(node):
+    top = node.right
+    node.right, top.left = top.left, node
+    _update(node)
+    _update(top)
+    return top
+
+
+class IntervalTree:
+    """[start, end) intervals in a treap ordered by (start, bed), where
+    every node also holds the latest end in its subtree.
+
+    Inserts and removals are O(log n) expected. An overlap query skips any
+    subtree whose latest end is before the window and any right subtree
+    starting after it, so it costs O(log n + k) for k matches.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, start, end, bed, patient=''):
+        def insert(node):
+            if node is None:
+                return _Node((start, bed), end, patient)
+            if (start, bed) < node.key:
+                node.left = insert(node.left)
+                if node.left.priority > node.priority:
+                    return _rotate_right(node)
+            else:
+                node.right = insert(node.right)
+                if node.right.priority > node.priority:
+                    return _rotate_left(node)
+            _update(node)
+            return node
+
+        self._root = insert(self._root)
+        self._size += 1
+
+    def remove(self, start, bed):
+        """Remove the interval of ``bed`` starting at ``start``; returns its
+        (end, patient), or None if there is none."""
+        key = (start, bed)
+        removed = []
+
+        def remove(node):
+            if node is None:
+                return None
+            if key < node.key:
+                node.left = remove(node.left)
+            elif key > node.key:
+                node.right = remove(node.right)
+            else:
+                if not removed:
+                    removed.append((node.end, node.patient))
+                if node.left is None:
+                    return node.right
+                if node.right is None:
+                    return node.left
+                # Rotate the node down past its higher-priority child
+                if node.left.priority > node.right.priority:
+                    node = _rotate_right(node)
+                    node.right = remove(node.right)
+                else:
+                    node = _rotate_left(node)
+                    node.left = remove(node.left)
+            _update(node)
+            return node
+
+        self._root = remove(self._root)
+        if removed:
+            self._size -= 1
+            return removed[0]
+        return None
+
+    def overlapping(self, start, end):
+        """(start, end, bed, patient) of every interval overlapping [start, end)."""
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.left)
+            if node.key[0] < end:
+                if node.end > start:
+                    found.append((node.key[0], node.end, node.key[1], node.patient))
+                stack.append(node.right)
+        return found
+
+
+def _covered(times, origin, lo, hi):
+    """For each bucket [lo, hi) (seconds from ``origin``), the sum over
+    ``times`` of the part of the bucket after the time. Start times minus
+    end times gives the bed time taken. Sorting and prefix sums make each
+    bucket two binary searches."""
+    t = np.sort((pd.DatetimeIndex(times).asi8 - pd.Timestamp(origin).value) / 1e9)
+    cumulative = np.concatenate(([0.0], np.cumsum(t)))
+    i = np.searchsorted(t, lo)
+    j = np.searchsorted(t, hi)
+    return i * (hi - lo) + (j - i) * hi - (cumulative[j] - cumulative[i])
+
+
+class BedBoard:
+    """Bed assignments as time intervals, with an interval tree per ward.
+
+    Each bed's stays are also kept sorted by start, so a new stay is
+    checked against only its neighbours (O(log stays)) under one lock; two
+    stays can never overlap on a bed. Each ward keeps its stay starts and
+    ends in sorted lists too, so the number of beds taken at a moment is
+    two binary searches (a bed holds at most one stay at a time).
+    """
+
+    def __init__(self):
+        self._ward_of = {}
+        self._ward_beds = defaultdict(list)
+        self._trees = defaultdict(IntervalTree)
+        self._starts = defaultdict(list)
+        self._ends = defaultdict(list)
+        self._stays = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ward_of)
+
+    def wards(self):
+        return sorted(self._ward_beds)
+
+    def beds(self, ward):
+        return list(self._ward_beds.get(ward, []))
+
+    def add_bed(self, bed, ward):
+        with self._lock:
+            if bed in self._ward_of:
+                return False
+            self._ward_of[bed] = ward
+            insort(self._ward_beds[ward], bed)
+            return True
+
+    def _fits(self, bed, start, end):
+        stays = self._stays[bed]
+        i = bisect_right(stays, start, key=_start)
+        if i and stays[i - 1][1] > start:
+            return False
+        return i == len(stays) or stays[i][0] >= end
+
+    def _add_stay(self, bed, patient, start, end):
+        ward = self._ward_of[bed]
+        insort(self._stays[bed], (start, end, patient))
+        self._trees[ward].insert(start, end, bed, patient)
+        insort(self._starts[ward], start)
+        insort(self._ends[ward], end)
+
+    def assign(self, bed, patient, start, end=None):
+        """Put ``patient`` in ``bed`` from ``start`` until ``end`` (open if
+        None). Returns False if the bed is unknown or taken at any point of
+        that time."""
+        end = end or OPEN_END
+        if end <= start:
+            return False
+        with self._lock:
+            if bed not in self._ward_of or not self._fits(bed, start, end):
+                return False
+            self._add_stay(bed, patient, start, end)
+            return True
+
+    def allocate(self, ward, patient, start, end=None):
+        """Assign the first bed of ``ward`` that is free for the whole stay;
+        returns its ID, or None if every bed is taken at some point."""
+        end = end or OPEN_END
+        if end <= start:
+            return None
+        with self._lock:
+            # Checking beds in order stops at the first free one, a few
+            # binary searches on a busy ward instead of listing them all
+            for bed in self._ward_beds.get(ward, []):
+                if self._fits(bed, start, end):
+                    self._add_stay(bed, patient, start, end)
+                    return bed
+            return None
+
+    def discharge(self, bed, at):
+        """End the stay in ``bed`` that covers ``at``, at ``at``. Returns
+        False if the bed is empty then."""
+        with self._lock:
+            stays = self._stays.get(bed, [])
+            i = bisect_right(stays, at, key=_start) - 1
+            if i < 0 or stays[i][1] <= at:
+                return False
+            start, end, patient = stays[i]
+            ward = self._ward_of[bed]
+            self._trees[ward].remove(start, bed)
+            self._ends[ward].pop(bisect_left(self._ends[ward], end))
+            del stays[i]
+            if at > start:
+                stays.insert(i, (start, at, patient))
+                self._trees[ward].insert(start, at, bed, patient)
+                insort(self._ends[ward], at)
+            else:
+                self._starts[ward].pop(bisect_left(self._starts[ward], start))
+            return True
+
+    def occupied_count(self, ward, at):
+        """Beds of ``ward`` taken at ``at``, in O(log stays)."""
+        return bisect_right(self._starts[ward], at) - bisect_right(self._ends[ward], at)
+
+    def free_count(self, ward=None, at=None):
+        at = at or datetime.now()
+        wards = [ward] if ward is not None else list(self._ward_beds)
+        return sum(len(self._ward_beds[w]) - self.occupied_count(w, at) for w in wards)
+
+    def _free(self, ward, start, end):
+        busy = {bed for _, _, bed, _ in self._trees[ward].overlapping(start, end)}
+        return [bed for bed in self._ward_beds.get(ward, []) if bed not in busy]
+
+    def free_beds(self, ward=None, start=None, end=None):
+        """Beds free for all of [start, end), by ward. ``start`` defaults to
+        now and ``end`` to one minute after it."""
+        start = start or datetime.now()
+        end = end or start + pd.Timedelta(minutes=1)
+        wards = [ward] if ward is not None else self.wards()
+        with self._lock:
+            return {w: self._free(w, start, end) for w in wards}
+
+    def stays(self, ward, start, end):
+        """Stays in ``ward`` overlapping [start, end), as STAY_COLUMNS."""
+        with self._lock:
+            found = self._trees[ward].overlapping(start, end)
+        rows = [(bed, ward, patient, s, None if e == OPEN_END else e) for s, e, bed, patient in found]
+        return pd.DataFrame(sorted(rows), columns=STAY_COLUMNS)
+
+    def occupancy(self, start, end, freq='D', ward=None):
+        """Share of bed time taken per ``freq`` bucket of [start, end), one
+        column per ward. Only the stays overlapping the window are read."""
+        edges = pd.date_range(start, end, freq=freq)
+        if len(edges) == 0 or edges[-1] < end:
+            edges = edges.append(pd.DatetimeIndex([end]))
+        # Seconds from ``start``; stays are clipped to the window
+        seconds = (edges.asi8 - edges.asi8[0]) / 1e9
+        lo, hi = seconds[:-1], seconds[1:]
+        columns = {}
+        for w in ([ward] if ward is not None else self.wards()):
+            with self._lock:
+                stays = self._trees[w].overlapping(start, end)
+            taken = np.zeros(len(lo))
+            if stays:
+                taken = _covered([max(row[0], start) for row in stays], start, lo, hi) \
+                    - _covered([min(row[1], end) for row in stays], start, lo, hi)
+            columns[w] = taken / ((hi - lo) * max(len(self._ward_beds[w]), 1)) * 100
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(edges[:-1], name='Period'))
+
+    def status_frame(self, at=None):
+        """Every bed with its status and patient at ``at``, as BED_COLUMNS."""
+        at = at or datetime.now()
+        rows = []
+        with self._lock:
+            for bed, ward in self._ward_of.items():
+                stays = self._stays.get(bed, [])
+                i = bisect_right(stays, at, key=_start) - 1
+                patient = stays[i][2] if i >= 0 and stays[i][1] > at else None
+                rows.append((bed, ward, 'Available' if patient is None else 'Occupied', patient or ''))
+        return pd.DataFrame(rows, columns=BED_COLUMNS)
+
+    @classmethod
+    def from_frame(cls, beds, since=None):
+        """A board from a BED_COLUMNS frame; occupied beds get an open stay
+        from ``since`` (default now)."""
+        since = since or datetime.now()
+        board = cls()
+        for bed, ward, status, patient in beds[BED_COLUMNS].itertuples(index=False):
+            board.add_bed(bed, ward)
+            if status == 'Occupied':
+                board.assign(bed, patient, since)
+        return board
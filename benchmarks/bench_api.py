@@ -0,0 +1,127 @@
+"""Load test for the inventory JSON API.
+
+Starts the API in a child process against a throwaway database, then opens
+many keep-alive connections from an asyncio client and sends requests as
+fast as each connection gets answers. Reports requests/s and latency for
+item reads, single usage posts and batched usage posts.
+
+    python benchmarks/bench_api.py --connections 64 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_concurrency import make_inventory
+from stats import percentile
+
+ITEMS = 200
+STOCK = 10_000_000
+
+
+def serve(data_dir, port, ready):
+    import api
+    from auth import CredentialStore, SessionStore
+    from inventory_db import InventoryDB
+
+    async def main():
+        db = InventoryDB(data_dir, seed=make_inventory(ITEMS, STOCK))
+        credentials = CredentialStore(os.path.join(data_dir, 'users.json'))
+        api.make_app(db, credentials, SessionStore()).listen(port, '127.0.0.1')
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+async def request(reader, writer, method, path, body=None, token=None):
+    payload = json.dumps(body).encode() if body is not None else b''
+    headers = [f'{method} {path} HTTP/1.1', 'Host: localhost', f'Content-Length: {len(payload)}']
+    if token:
+        headers.append(f'Authorization: Bearer {token}')
+    writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode() + payload)
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = int(next(line.split(b':')[1] for line in head.split(b'\r\n') if line.lower().startswith(b'content-length')))
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def scenario(port, token, connections, total, make_request):
+    latencies = []
+    remaining = [total]
+
+    async def client(seed):
+        rng = random.Random(seed)
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            method, path, body = make_request(rng)
+            started = time.perf_counter()
+            status, _ = await request(reader, writer, method, path, body, token)
+            assert status == 200, status
+            latencies.append(time.perf_counter() - started)
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(connections)))
+    return time.perf_counter() - started, latencies
+
+
+async def run_client(port, connections, total, batch_size):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    _, login = await request(reader, writer, 'POST', '/api/login', {'username': 'nurse1', 'password': 'nurse123'})
+    writer.close()
+    token = login['token']
+    item_ids = [f'ITM{i:05}' for i in range(ITEMS)]
+
+    def usage(rng):
+        return {'item': rng.choice(item_ids), 'quantity': rng.randint(1, 5), 'department': 'ICU'}
+
+    scenarios = [
+        ('GET  /api/items/<id>', 1, lambda rng: ('GET', f'/api/items/{rng.choice(item_ids)}', None)),
+        ('POST /api/usage', 1, lambda rng: ('POST', '/api/usage', usage(rng))),
+        (f'POST /api/usage/batch x{batch_size}', batch_size,
+         lambda rng: ('POST', '/api/usage/batch', {'records': [usage(rng) for _ in range(batch_size)]})),
+    ]
+    for name, records, make_request in scenarios:
+        count = total if records == 1 else max(1, total // records)
+        elapsed, latencies = await scenario(port, token, connections, count, make_request)
+        print(f'{name:<28} {count / elapsed:>8,.0f} req/s {count * records / elapsed:>9,.0f} records/s   '
+              f'p50 {statistics.median(latencies) * 1000:6.1f} ms  p95 {percentile(latencies, 0.95) * 1000:6.1f} ms')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=100)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='api_bench_')
+    port = free_port()
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=serve, args=(data_dir, port, ready), daemon=True)
+    server.start()
+    ready.wait(60)
+    try:
+        asyncio.run(run_client(port, args.connections, args.requests, args.batch))
+    finally:
+        server.terminate()
+        server.join()
+        shutil.rmtree(data_dir)
@@ -0,0 +1,129 @@
+"""Stress test for concurrent stock decrements against one shared InventoryDB.
+
+Simulates many clinicians recording usage at the same time (one thread per
+user, like Streamlit sessions) and checks that stock never goes negative,
+that every successful decrement was logged exactly once, and that a
+reopened database replays to the same quantities. Before the load it
+replays one race step by step: a second session commits in the middle of
+a stock read, which must not let the first oversell.
+
+    python benchmarks/bench_concurrency.py --users 300 --ops 50 --items 20
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from inventory_db import InventoryDB
+
+
+def make_inventory(items, stock):
+    return pd.DataFrame({
+        'Item_ID': [f'ITM{i:05}' for i in range(items)],
+        'Item_Name': [f'Item {i}' for i in range(items)],
+        'Category': ['Supply'] * items,
+        'Quantity': [stock] * items,
+        'Min_Stock': [stock // 10] * items,
+        'Unit': ['Piece'] * items,
+        'Expiry_Date': ['2030-01-01'] * items,
+        'Location': ['Medical Store'] * items,
+        'Last_Updated': ['2025-01-01 00:00'] * items
+    })
+
+
+class _Interleaved(list):
+    """Row versions that run ``between`` the first time a version is read,
+    i.e. in the middle of ``InventoryStore.read``."""
+
+    def __init__(self, versions, between):
+        super().__init__(versions)
+        self.between = between
+
+    def __getitem__(self, pos):
+        between, self.between = self.between, None
+        if between is not None:
+            between()
+        return super().__getitem__(pos)
+
+
+def check_interleaving():
+    data_dir = tempfile.mkdtemp(prefix='inventory_race_')
+    db = InventoryDB(data_dir, seed=make_inventory(1, 10))
+    seq = db.journal.seq
+
+    # B takes 8 while A is reading; A then asks for 5 of what is now 2
+    db.store._versions = _Interleaved(db.store._versions, lambda: db.record_usage('Item 0', 8, 'B', 'ICU'))
+    ok, remaining = db.record_usage('Item 0', 5, 'A', 'ICU')
+    assert (ok, remaining) == (False, 2), f'oversold: A was told {ok}, {remaining}'
+
+    # A usage the stock can't cover is neither applied nor journalled
+    assert not db._commit('usage', {'Date_Time': '2025-01-01 00:00:00', 'Item_ID': 'ITM00000', 'Item_Name': 'Item 0',
+                                    'Quantity_Used': 3, 'Used_By': 'C', 'Department': 'ICU', 'Remarks': ''})
+    assert db.store.get('Item 0', 'Quantity') == db.lots.total('ITM00000') == 2
+    assert len(db.usage_log) == 1 and db.journal.seq == seq + 1, 'rejected usage was written'
+    db.journal.close()
+    shutil.rmtree(data_dir)
+    print('interleaved read: no oversell')
+
+
+def run(users, ops, items, stock, seed=0):
+    data_dir = tempfile.mkdtemp(prefix='inventory_bench_')
+    db = InventoryDB(data_dir, seed=make_inventory(items, stock))
+    names = db.store.names()
+    successes = [0] * users
+    start_barrier = threading.Barrier(users)
+
+    def user(index):
+        rng = random.Random(seed + index)
+        start_barrier.wait()
+        for _ in range(ops):
+            ok, _ = db.record_usage(rng.choice(names), rng.randint(1, 5), f'user{index}', 'ICU')
+            successes[index] += ok
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    db.journal.flush()
+
+    quantities = db.store.df['Quantity']
+    used = db.usage_log.to_frame()['Quantity_Used'].sum()
+    assert (quantities >= 0).all(), 'stock went negative'
+    assert len(db.usage_log) == sum(successes), 'usage log does not match successful decrements'
+    assert items * stock - quantities.sum() == used, 'stock and usage log disagree'
+    lot_totals = [db.lots.total(item_id) for item_id in db.store.df['Item_ID']]
+    assert lot_totals == quantities.tolist(), 'lots and item quantities disagree'
+
+    # One process per data directory: let a background snapshot finish first
+    db.journal.close()
+    reopened = InventoryDB(data_dir)
+    assert reopened.store.df['Quantity'].tolist() == quantities.tolist(), 'replay does not match memory'
+    reopened.journal.close()
+    shutil.rmtree(data_dir)
+
+    attempts = users * ops
+    print(f'{users} users x {ops} ops on {items} items: {attempts / elapsed:,.0f} ops/s, '
+          f'{sum(successes)} committed, {attempts - sum(successes)} rejected for stock, '
+          f'{db.conflicts} version conflicts retried')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=300)
+    parser.add_argument('--ops', type=int, default=50)
+    parser.add_argument('--items', type=int, default=20)
+    parser.add_argument('--stock', type=int, default=1000)
+    args = parser.parse_args()
+    check_interleaving()
+    run(args.users, args.ops, args.items, args.stock)
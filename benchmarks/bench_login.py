@@ -0,0 +1,82 @@
+"""Login burst benchmark for the credential and session stores.
+
+Simulates a shift change: many users log in at the same moment (one thread
+per user, like Streamlit sessions) while already logged-in sessions keep
+rerunning and presenting their session token. Reports login throughput and
+latency, and how long the token checks of the other sessions took while
+the burst was in progress.
+
+    python benchmarks/bench_login.py --logins 300 --active 50
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from auth import CredentialStore, SessionStore
+from stats import percentile
+
+
+def run(logins, active):
+    data_dir = tempfile.mkdtemp(prefix='auth_bench_')
+    credentials = CredentialStore(os.path.join(data_dir, 'users.json'))
+    # Every benchmark user gets the demo nurse's password (and its hash cost)
+    for i in range(logins):
+        credentials.users[f'user{i}'] = {'role': 'Nurse', 'name': f'User {i}', 'hash': credentials.users['nurse1']['hash']}
+    sessions = SessionStore()
+    tokens = [sessions.issue({'role': 'Nurse', 'name': f'Active {i}'}) for i in range(active)]
+
+    login_times = []
+    token_times = []
+    burst_over = threading.Event()
+    start_barrier = threading.Barrier(logins + active)
+
+    def login(username):
+        start_barrier.wait()
+        started = time.perf_counter()
+        user = credentials.authenticate(username, 'nurse123')
+        assert user is not None, f'{username} failed to log in'
+        sessions.issue(user)
+        login_times.append(time.perf_counter() - started)
+
+    def rerun(token):
+        start_barrier.wait()
+        while not burst_over.is_set():
+            started = time.perf_counter()
+            assert sessions.get(token) is not None
+            token_times.append(time.perf_counter() - started)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login, args=(f'user{i}',)) for i in range(logins)]
+    watchers = [threading.Thread(target=rerun, args=(token,)) for token in tokens]
+    started = time.perf_counter()
+    for t in threads + watchers:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    burst_over.set()
+    for t in watchers:
+        t.join()
+    shutil.rmtree(data_dir)
+
+    print(f'{logins} logins on {os.cpu_count()} cores: {logins / elapsed:,.1f} logins/s, '
+          f'latency p50 {statistics.median(login_times) * 1000:,.0f} ms, p95 {percentile(login_times, 0.95) * 1000:,.0f} ms')
+    if token_times:
+        print(f'{active} active sessions during the burst: {len(token_times)} token checks, '
+              f'p50 {statistics.median(token_times) * 1e6:,.0f} us, p95 {percentile(token_times, 0.95) * 1e6:,.0f} us, '
+              f'max {max(token_times) * 1000:,.1f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=300)
+    parser.add_argument('--active', type=int, default=50)
+    args = parser.parse_args()
+    run(args.logins, args.active)
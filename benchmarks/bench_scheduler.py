@@ -0,0 +1,104 @@
+"""Appointment scheduler benchmark at hospital scale.
+
+Books a year of appointments for every doctor (500 by default, spread
+over the departments), then measures conflict checks and bookings against
+the full calendars, free-slot suggestions for a department, and
+cancellations. Every booking goes through the same conflict check as the
+app, and the run ends by checking that no doctor is double-booked.
+
+    python benchmarks/bench_scheduler.py --doctors 500 --per-day 12
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scheduler import DAY_START, SLOT_STEP, Scheduler
+from stats import percentile
+
+DEPARTMENTS = ['Cardiology', 'Neurology', 'Orthopedics', 'Pediatrics', 'Emergency']
+FIRST_DAY = datetime(2025, 1, 1)
+
+
+def timings(name, times, unit=1e6, label='us'):
+    print(f'{name:<28} {len(times):>9,} calls  p50 {statistics.median(times) * unit:>9,.1f} {label}  '
+          f'p95 {percentile(times, 0.95) * unit:>9,.1f} {label}')
+
+
+def run(doctors, per_day, days, seed):
+    rng = random.Random(seed)
+    scheduler = Scheduler()
+    names = [f'Dr. {i:03}' for i in range(doctors)]
+    for i, name in enumerate(names):
+        scheduler.add_doctor(name, DEPARTMENTS[i % len(DEPARTMENTS)])
+
+    # Each working day a doctor gets ``per_day`` of the 16 half-hour slots
+    # of clinic hours, some of them an hour long
+    started = time.perf_counter()
+    rejected = 0
+    for day in range(days):
+        date = FIRST_DAY + timedelta(days=day)
+        if date.weekday() >= 5:
+            continue
+        opening = datetime.combine(date.date(), DAY_START)
+        for name in names:
+            for slot in rng.sample(range(16), per_day):
+                ok, _ = scheduler.book('Patient', name, opening + slot * 2 * SLOT_STEP,
+                                       timedelta(minutes=60 if rng.random() < 0.2 else 30))
+                rejected += not ok
+    elapsed = time.perf_counter() - started
+    print(f'{doctors} doctors, {days} days: {len(scheduler):,} appointments booked in {elapsed:,.1f} s '
+          f'({len(scheduler) / elapsed:,.0f}/s), {rejected:,} clashes rejected')
+
+    end = FIRST_DAY + timedelta(days=days)
+    checks, books, suggestions, cancels = [], [], [], []
+    booked = []
+    for _ in range(20_000):
+        doctor = rng.choice(names)
+        start = FIRST_DAY + timedelta(minutes=15 * rng.randrange(days * 96))
+        t = time.perf_counter()
+        scheduler.is_free(doctor, start)
+        checks.append(time.perf_counter() - t)
+    for _ in range(5_000):
+        doctor = rng.choice(names)
+        start = FIRST_DAY + timedelta(minutes=15 * rng.randrange(days * 96))
+        t = time.perf_counter()
+        ok, appointment_id = scheduler.book('Bench', doctor, start)
+        books.append(time.perf_counter() - t)
+        if ok:
+            booked.append(appointment_id)
+    for _ in range(500):
+        after = FIRST_DAY + timedelta(minutes=rng.randrange(days * 1440))
+        t = time.perf_counter()
+        slots = scheduler.next_free_slots(rng.choice(DEPARTMENTS), after, 10)
+        suggestions.append(time.perf_counter() - t)
+        assert all(s >= after and s < end + timedelta(days=90) for s, _ in slots)
+    for appointment_id in booked:
+        t = time.perf_counter()
+        scheduler.cancel(appointment_id)
+        cancels.append(time.perf_counter() - t)
+
+    timings('conflict check', checks)
+    timings('book (check + insert)', books)
+    timings('next 10 free slots', suggestions, 1e3, 'ms')
+    timings('cancel', cancels)
+
+    # No doctor's calendar may hold overlapping appointments
+    for calendar in scheduler._calendars.values():
+        assert all(e <= s for e, s in zip(calendar.ends, calendar.starts[1:])), 'double booking'
+    print('no double bookings')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--doctors', type=int, default=500)
+    parser.add_argument('--per-day', type=int, default=12, help='appointments per doctor per working day (max 16)')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(args.doctors, min(args.per_day, 16), args.days, args.seed)
@@ -0,0 +1,225 @@
+"""Seeded synthetic hospital data at benchmark scale.
+
+Every generator takes a row count and a seed and returns a DataFrame with
+the same columns the apps use, built with vectorized numpy so a million
+rows take seconds. The same (rows, seed) always gives the same frame, so
+benchmark runs on different commits see identical data.
+
+    python benchmarks/datagen.py --rows 100k --out /tmp/hospital_100k
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import metrics
+from inventory_db import PO_COLUMNS, USAGE_COLUMNS
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+# Data is generated relative to this day, not today, so it doesn't drift
+# between runs
+REFERENCE_DAY = datetime(2025, 1, 1)
+
+CATALOG = {
+    'Medicine': ['Paracetamol', 'Ceftriaxone', 'Amoxicillin', 'Metformin', 'Omeprazole', 'Insulin', 'Heparin', 'Ondansetron'],
+    'Emergency Medicine': ['Adrenaline', 'Atropine', 'Amiodarone', 'Naloxone'],
+    'Controlled Medicine': ['Morphine', 'Fentanyl', 'Midazolam', 'Ketamine'],
+    'Supply': ['Disposable Syringes', 'Surgical Gloves', 'Gauze Dressings', 'IV Cannula', 'Catheter', 'Suture Kit'],
+    'Equipment': ['Pulse Oximeter', 'BP Cuff', 'Thermometer', 'Nebulizer'],
+}
+UNITS = {'Medicine': 'Tablet', 'Emergency Medicine': 'Vial', 'Controlled Medicine': 'Vial', 'Supply': 'Piece', 'Equipment': 'Unit'}
+LOCATIONS = ['Pharmacy', 'Medical Store', 'Emergency Ward', 'ICU Store', 'OT Store']
+DEPARTMENTS = ['General Ward', 'ICU', 'Emergency', 'OT', 'OPD']
+SPECIALTIES = ['Cardiology', 'Neurology', 'Orthopedics', 'Pediatrics', 'Emergency']
+PATIENT_STATUSES = ['Admitted', 'Outpatient', 'Surgery', 'Discharged', 'Critical']
+WARDS = ['ICU', 'General', 'Pediatrics', 'Maternity', 'Surgical', 'Emergency']
+ROLES = ['Cardiologist', 'Neurologist', 'Orthopedic Surgeon', 'Pediatrician', 'Nurse', 'Anesthetist']
+SHIFTS = ['Morning', 'Evening', 'Night']
+FIRST_NAMES = ['Rahul', 'Priya', 'Akshit', 'Vedika', 'Palash', 'Kamakshi', 'Sarah', 'John', 'Emily', 'David', 'Anita', 'Bhumi']
+LAST_NAMES = ['Sharma', 'Sinha', 'Jha', 'Vishwakarma', 'Thakur', 'Yadav', 'Gupta', 'Kaur', 'Smith', 'Brown']
+
+
+def _ids(prefix, rows, width=7):
+    return np.char.add(prefix, np.char.zfill(np.arange(1, rows + 1).astype(str), width)).astype(object)
+
+
+def _names(rng, rows):
+    first = np.array(FIRST_NAMES, dtype=object)[rng.integers(0, len(FIRST_NAMES), rows)]
+    last = np.array(LAST_NAMES, dtype=object)[rng.integers(0, len(LAST_NAMES), rows)]
+    return first + ' ' + last
+
+
+def _timestamps(rng, rows, days, unit='s'):
+    """Sorted 'YYYY-MM-DD HH:MM:SS' strings (or days with ``unit='D'``)
+    spread over the ``days`` before REFERENCE_DAY."""
+    seconds = np.sort(rng.integers(0, days * 86400, rows))
+    times = np.datetime64(REFERENCE_DAY - timedelta(days=days), 's') + seconds.astype('timedelta64[s]')
+    # numpy formats these far faster than strftime
+    return np.char.replace(np.datetime_as_string(times, unit=unit), 'T', ' ').astype(object)
+
+
+def inventory(rows, seed=0):
+    """Items with unique names; about one in ten is at or below Min_Stock."""
+    rng = np.random.default_rng(seed)
+    products = [(category, name) for category, names in CATALOG.items() for name in names]
+    picks = rng.integers(0, len(products), rows)
+    categories = np.array([category for category, _ in products], dtype=object)[picks]
+    base = np.array([name for _, name in products], dtype=object)[picks]
+    min_stock = rng.integers(10, 500, rows)
+    quantity = np.where(rng.random(rows) < 0.1, rng.integers(0, min_stock + 1), min_stock * rng.integers(2, 10, rows))
+    expiry_days = rng.integers(-30, 3 * 365, rows)
+    return pd.DataFrame({
+        'Item_ID': _ids('ITM', rows),
+        'Item_Name': base + ' ' + _ids('#', rows),
+        'Category': categories,
+        'Quantity': quantity,
+        'Min_Stock': min_stock,
+        'Unit': pd.Series(categories).map(UNITS).to_numpy(),
+        'Expiry_Date': np.datetime_as_string(np.datetime64(REFERENCE_DAY, 'D') + expiry_days.astype('timedelta64[D]')).astype(object),
+        'Location': np.array(LOCATIONS, dtype=object)[rng.integers(0, len(LOCATIONS), rows)],
+        'Last_Updated': REFERENCE_DAY.strftime('%Y-%m-%d %H:%M'),
+    })
+
+
+def usage_log(rows, items, seed=0, days=365):
+    """Usage rows over the last ``days`` days, drawn from ``items`` (an
+    inventory frame). Four in five rows use the first fifth of the items,
+    like the fast movers of a real store."""
+    rng = np.random.default_rng(seed + 1)
+    fast = max(len(items) // 5, 1)
+    picks = np.where(rng.random(rows) < 0.8, rng.integers(0, fast, rows), rng.integers(0, len(items), rows))
+    return pd.DataFrame({
+        'Date_Time': _timestamps(rng, rows, days),
+        'Item_ID': items['Item_ID'].to_numpy()[picks],
+        'Item_Name': items['Item_Name'].to_numpy()[picks],
+        'Quantity_Used': rng.integers(1, 6, rows),
+        'Used_By': _names(rng, rows),
+        'Department': np.array(DEPARTMENTS, dtype=object)[rng.integers(0, len(DEPARTMENTS), rows)],
+        'Remarks': '',
+    }, columns=USAGE_COLUMNS)
+
+
+def purchase_orders(rows, items, seed=0, days=365):
+    rng = np.random.default_rng(seed + 2)
+    picks = rng.integers(0, len(items), rows)
+    statuses = np.array(['Approved', 'Pending Approval', 'Draft', 'Received'], dtype=object)
+    return pd.DataFrame({
+        'PO_ID': _ids('PO', rows),
+        'Date': _timestamps(rng, rows, days, unit='D'),
+        'Item_Name': items['Item_Name'].to_numpy()[picks],
+        'Quantity': rng.integers(10, 1000, rows),
+        'Supplier': np.array(['MedSupply Co', 'PharmaOne', 'CareDistributors'], dtype=object)[rng.integers(0, 3, rows)],
+        'Status': statuses[rng.integers(0, len(statuses), rows)],
+        'Requested_By': _names(rng, rows),
+    }, columns=PO_COLUMNS)
+
+
+def patients(rows, seed=0):
+    rng = np.random.default_rng(seed + 3)
+    return pd.DataFrame({
+        'ID': _ids('P', rows),
+        'Name': _names(rng, rows),
+        'Age': rng.integers(0, 100, rows),
+        'Department': np.array(SPECIALTIES, dtype=object)[rng.integers(0, len(SPECIALTIES), rows)],
+        'Status': np.array(PATIENT_STATUSES, dtype=object)[rng.integers(0, len(PATIENT_STATUSES), rows)],
+        'Updated': rng.integers(1, 48, rows).astype(str).astype(object) + 'h ago',
+    })
+
+
+def beds(rows, seed=0):
+    """Beds with about 80% occupancy."""
+    rng = np.random.default_rng(seed + 4)
+    occupied = rng.random(rows) < 0.8
+    return pd.DataFrame({
+        'Bed ID': _ids('B', rows),
+        'Ward': np.array(WARDS, dtype=object)[rng.integers(0, len(WARDS), rows)],
+        'Status': np.where(occupied, 'Occupied', 'Available'),
+        'Patient': np.where(occupied, _names(rng, rows), ''),
+    })
+
+
+def staff(rows, seed=0):
+    rng = np.random.default_rng(seed + 5)
+    roles = np.array(ROLES, dtype=object)[rng.integers(0, len(ROLES), rows)]
+    return pd.DataFrame({
+        'ID': _ids('S', rows),
+        'Name': np.where(roles == 'Nurse', 'Sister ', 'Dr. ') + _names(rng, rows),
+        'Role': roles,
+        'Shift': np.array(SHIFTS, dtype=object)[rng.integers(0, len(SHIFTS), rows)],
+        'Status': np.where(rng.random(rows) < 0.6, 'On Duty', 'Off Duty'),
+    })
+
+
+def hospital_events(days, seed=0):
+    """``days`` of hospital events up to REFERENCE_DAY, in
+    metrics.EVENT_COLUMNS: admissions (half of them taking a bed until
+    discharge), appointments, emergencies, revenue and shift changes."""
+    rng = np.random.default_rng(seed + 6)
+    now = REFERENCE_DAY
+    hours = pd.date_range(now - timedelta(days=days), now, freq='h')
+    daytime = (hours.hour >= 8) & (hours.hour < 20)
+    weekday = hours.dayofweek < 5
+
+    def spread(counts):
+        times = hours.repeat(counts) + pd.to_timedelta(rng.integers(0, 3600, counts.sum()), unit='s')
+        return times[times <= now]
+
+    admitted = spread(rng.poisson(np.where(daytime, 0.9, 0.3)))
+    departments = rng.choice(SPECIALTIES, len(admitted), p=[0.3, 0.25, 0.2, 0.15, 0.1])
+    in_bed = rng.random(len(admitted)) < 0.5
+    discharged = admitted[in_bed] + pd.to_timedelta(rng.integers(1, 10 * 24, in_bed.sum()), unit='h')
+    discharged = discharged[discharged <= now]
+    appointments = spread(rng.poisson(np.where(daytime & weekday, 1.4, 0.0)))
+    emergencies = spread(rng.poisson(0.15, len(hours)))
+    # Shifts change at 06:00, 14:00 and 22:00; each records the change in headcount
+    shifts = hours[hours.hour.isin([6, 14, 22])]
+    on_duty = rng.integers(80, 95, len(shifts))
+
+    frames = [
+        pd.DataFrame({'Time': admitted, 'Event': metrics.ADMISSION, 'Department': departments, 'Value': 1}),
+        pd.DataFrame({'Time': admitted, 'Event': metrics.REVENUE, 'Department': departments,
+                      'Value': rng.integers(500, 3000, len(admitted))}),
+        pd.DataFrame({'Time': admitted[in_bed], 'Event': metrics.BEDS_OCCUPIED, 'Department': '', 'Value': 1}),
+        pd.DataFrame({'Time': discharged, 'Event': metrics.BEDS_OCCUPIED, 'Department': '', 'Value': -1}),
+        pd.DataFrame({'Time': appointments, 'Event': metrics.APPOINTMENT,
+                      'Department': rng.choice(SPECIALTIES, len(appointments)), 'Value': 1}),
+        pd.DataFrame({'Time': emergencies, 'Event': metrics.EMERGENCY, 'Department': 'Emergency', 'Value': 1}),
+        pd.DataFrame({'Time': shifts, 'Event': metrics.STAFF_ON_DUTY, 'Department': '',
+                      'Value': np.diff(on_duty, prepend=0)}),
+    ]
+    return pd.concat(frames, ignore_index=True)[metrics.EVENT_COLUMNS]
+
+
+def generate(rows, seed=0):
+    """Every table at ``rows`` rows."""
+    items = inventory(rows, seed)
+    return {
+        'inventory': items,
+        'usage_log': usage_log(rows, items, seed),
+        'purchase_orders': purchase_orders(rows, items, seed),
+        'patients': patients(rows, seed),
+        'beds': beds(rows, seed),
+        'staff': staff(rows, seed),
+    }
+
+
+def parse_size(size):
+    return SIZES[size.lower()] if size.lower() in SIZES else int(size)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='1k', help=f"one of {', '.join(SIZES)} or a number")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True, help='directory to write one Parquet file per table into')
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    for name, frame in generate(parse_size(args.rows), args.seed).items():
+        frame.to_parquet(os.path.join(args.out, f'{name}.parquet'), index=False)
+        print(f'{name}: {len(frame):,} rows')
@@ -0,0 +1,234 @@
+"""Benchmark harness for the core operations at hospital scale.
+
+Generates seeded data (see datagen.py) at each requested size, opens an
+InventoryDB on it the way the app does at startup, and times the
+operations behind the dashboards without a browser. Results go to
+benchmarks/results/<timestamp>.json and are compared with the previous
+run there, so a slowdown shows up as a regression line.
+
+    python benchmarks/run.py                     # 1k and 100k rows
+    python benchmarks/run.py --sizes 1m --repeat 3
+    python benchmarks/run.py --fail-on-regression
+
+The 1m size holds the whole database in memory like the app does and
+peaks around 7 GB; the default sizes fit in 1 GB.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import datagen
+import metrics
+import report_export
+from bed_occupancy import BedBoard
+from ids import IdAllocator, Sequences, UniqueIndex
+from inventory_db import InventoryDB
+from persistence import _json_default
+from rollups import UsageRollup
+from stats import percentile
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def timed(samples, name, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    samples.setdefault(name, []).append(time.perf_counter() - started)
+    return result
+
+
+def write_snapshot(data_dir, data):
+    """Lay the generated tables out as a data folder, as if the app had
+    been running long enough to build them up."""
+    rollup = UsageRollup()
+    rollup.add_frame(data['usage_log'])
+    state = {
+        'inventory': data['inventory'].to_dict('list'),
+        'usage_log': data['usage_log'].to_dict('list'),
+        'purchase_orders': data['purchase_orders'].to_dict('list'),
+        'usage_rollup': rollup.to_dict(),
+    }
+    with open(os.path.join(data_dir, 'snapshot.json'), 'w', encoding='utf-8') as f:
+        json.dump({'seq': 0, 'state': state}, f, default=_json_default)
+
+
+def add_patient(patients, ids, index, name, age, department, status):
+    # The Add Patient form of hospital_normal.py
+    patient_id = ids.next()
+    if not index.add(patient_id):
+        return patients
+    new_row = pd.DataFrame([{
+        "ID": patient_id,
+        "Name": name, "Age": age, "Department": department,
+        "Status": status, "Updated": "Just now"
+    }])
+    return pd.concat([patients, new_row], ignore_index=True)
+
+
+def run_size(rows, seed, repeat, ops):
+    """Seconds per call of every operation at ``rows`` rows."""
+    samples = {}
+    rng = random.Random(seed)
+    data = timed(samples, 'datagen', datagen.generate, rows, seed)
+    data_dir = tempfile.mkdtemp(prefix='hospital_bench_')
+    try:
+        write_snapshot(data_dir, data)
+        # The database loads its own copy of these; keep only the tables
+        # the hospital operations use
+        data = {name: data[name] for name in ('patients', 'beds', 'staff')}
+        # Snapshots are timed on their own below, not inside the writes
+        db = timed(samples, 'inventory.open', lambda: InventoryDB(data_dir, snapshot_every=10 ** 9))
+        names = db.store.names()
+        today = datagen.REFERENCE_DAY
+        month_ago = today - timedelta(days=30)
+        # Every occupied bed has been taken for the past week
+        board = timed(samples, 'beds.open', BedBoard.from_frame, data['beds'], today - timedelta(days=7))
+        patient_ids = IdAllocator(Sequences(), 'patient', 'P')
+        timed(samples, 'patients.open_ids', patient_ids.seed, data['patients']['ID'])
+        patient_index = timed(samples, 'patients.open_index', UniqueIndex, data['patients']['ID'])
+        patient_block = patient_ids.block()
+        # Two years of overview events, the same at every size
+        events = datagen.hospital_events(2 * 366, seed)
+        hospital_metrics = metrics.HourlyMetrics()
+        timed(samples, 'overview.open_metrics', hospital_metrics.add_frame, events)
+
+        for _ in range(repeat):
+            timed(samples, 'inventory.search', db.store.search_items, 'paracetamol')
+            timed(samples, 'inventory.category_filter', lambda: db.store.df[db.store.df['Category'] == 'Medicine'])
+            timed(samples, 'inventory.low_stock', db.store.low_stock_items)
+            timed(samples, 'inventory.expiry_30d', lambda: db.lots.expiring_between(end=(today + timedelta(days=30)).strftime('%Y-%m-%d')))
+            for _ in range(ops):
+                timed(samples, 'inventory.record_usage', db.record_usage, rng.choice(names), 1, 'bench', 'ICU')
+            for _ in range(max(ops // 10, 1)):
+                cart = rng.sample(names, min(10, len(names)))
+                timed(samples, 'inventory.record_usage_cart10', db.record_usage_batch, cart, [1] * len(cart), 'bench', 'OT')
+            timed(samples, 'reports.by_department_30d', db.usage_rollup.by_department, month_ago)
+            timed(samples, 'reports.top_items_30d', db.usage_rollup.top_items, 5, month_ago)
+            path, _ = timed(samples, 'reports.export_csv_30d', report_export.export_usage, db.usage_log, 'CSV', month_ago.date(), today.date())
+            os.remove(path)
+
+            patients = data['patients']
+            timed(samples, 'patients.filter', lambda: patients[(patients['Department'] == 'Cardiology') & (patients['Status'] == 'Admitted')])
+            for i in range(ops // 10 or 1):
+                patients = timed(samples, 'patients.add', add_patient, patients, patient_block, patient_index, f'Bench Patient {i}', 40, 'Cardiology', 'Admitted')
+            timed(samples, 'hospital.metrics', lambda: (len(data['beds'].query('Status == "Available"')),
+                                                        len(data['staff'].query('Status == "On Duty"'))))
+
+            timed(samples, 'overview.summary_year', hospital_metrics.summary, 'This Year', today)
+            timed(samples, 'overview.trend_year', hospital_metrics.trend, 'This Year', today)
+
+            timed(samples, 'beds.free_now', board.free_count, None, today)
+            timed(samples, 'beds.free_window', board.free_beds, 'ICU', today + timedelta(hours=14), today + timedelta(hours=20))
+            timed(samples, 'beds.occupancy_7d', board.occupancy, today - timedelta(days=7), today)
+            for _ in range(ops // 10 or 1):
+                start = today + timedelta(hours=rng.randrange(24 * 30))
+                timed(samples, 'beds.allocate', board.allocate, rng.choice(datagen.WARDS), 'bench', start, start + timedelta(hours=6))
+
+        timed(samples, 'inventory.snapshot', lambda: db.journal.snapshot(*db._capture()))
+        db.journal.close()
+    finally:
+        shutil.rmtree(data_dir)
+    return samples
+
+
+def summarize(samples):
+    return {name: {
+        'runs': len(times),
+        'median_ms': round(statistics.median(times) * 1000, 4),
+        'p95_ms': round(percentile(times, 0.95) * 1000, 4),
+        'min_ms': round(min(times) * 1000, 4),
+    } for name, times in samples.items()}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def previous_results(results_dir, exclude):
+    paths = sorted(p for p in glob.glob(os.path.join(results_dir, '*.json')) if p != exclude)
+    if not paths:
+        return None, None
+    with open(paths[-1], encoding='utf-8') as f:
+        return paths[-1], json.load(f)
+
+
+def compare(current, previous, tolerance, min_change_ms=0.1):
+    """Print every operation's median against the previous run; returns the
+    (size, operation) pairs that got slower than ``tolerance`` allows."""
+    regressions = []
+    for size, ops in current['results'].items():
+        before = previous['results'].get(size, {})
+        for name, stats in ops.items():
+            if name == 'datagen' or name not in before:
+                continue
+            old, new = before[name]['median_ms'], stats['median_ms']
+            change = (new - old) / old if old else 0.0
+            slower = change > tolerance and new - old > min_change_ms
+            if slower:
+                regressions.append((size, name))
+            print(f'{size:>6} {name:<30} {old:>11,.3f} -> {new:>11,.3f} ms  {change:>+7.1%}{"  REGRESSION" if slower else ""}')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=['1k', '100k'], help=f"any of {', '.join(datagen.SIZES)} or row counts")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5, help='passes over the read operations')
+    parser.add_argument('--ops', type=int, default=100, help='writes per pass')
+    parser.add_argument('--results-dir', default=RESULTS_DIR)
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed median slowdown before flagging, as a fraction')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    current = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'ops': args.ops,
+        'results': {},
+    }
+    for size in args.sizes:
+        rows = datagen.parse_size(size)
+        print(f'--- {size} ({rows:,} rows)')
+        stats = summarize(run_size(rows, args.seed, args.repeat, args.ops))
+        current['results'][size] = stats
+        for name, s in stats.items():
+            print(f'{name:<30} median {s["median_ms"]:>11,.3f} ms  p95 {s["p95_ms"]:>11,.3f} ms  ({s["runs"]} runs)')
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=1)
+    print(f'Results written to {path}')
+
+    previous_path, previous = previous_results(args.results_dir, path)
+    if previous is not None:
+        print(f'--- compared with {os.path.basename(previous_path)} (commit {previous.get("commit")})')
+        regressions = compare(current, previous, args.tolerance)
+        if regressions:
+            print(f'{len(regressions)} operations slower than {args.tolerance:.0%} over the previous run')
+            if args.fail_on_regression:
+                sys.exit(1)
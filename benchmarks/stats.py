@@ -0,0 +1,7 @@
+"""Latency statistics shared by the benchmarks."""
+
+
+def percentile(values, p):
+    """The value below which a fraction ``p`` of ``values`` fall (nearest rank)."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
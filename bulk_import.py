@@ -0,0 +1,113 @@
+"""Streaming bulk import of inventory catalogs from CSV or Parquet.
+
+The file is read in chunks, each chunk is validated with vectorized checks
+and the valid rows are upserted into the inventory as one batch per chunk,
+so memory use is bounded by the chunk size rather than the file size.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import pandas as pd
+
+CATEGORIES = ['Medicine', 'Supply', 'Emergency Medicine', 'Controlled Medicine', 'Equipment']
+UNITS = ['Tablet', 'Capsule', 'Vial', 'Ampoule', 'Bottle', 'Piece', 'Pair', 'Packet', 'Pack', 'Box',
+         'Tube', 'Bag', 'Roll', 'Kit', 'Unit', 'Sachet', 'Strip', 'Set']
+COLUMNS = ['Item_ID', 'Item_Name', 'Category', 'Quantity', 'Min_Stock', 'Unit', 'Expiry_Date', 'Location']
+ITEM_ID_PATTERN = r'[A-Za-z0-9][A-Za-z0-9_-]*'
+
+# Only this many rejected rows are kept for display; the rest are counted
+MAX_REJECTED_ROWS = 1000
+
+
+@dataclass
+class ImportReport:
+    inserted: int = 0
+    updated: int = 0
+    rejected_count: int = 0
+    rejected: list = field(default_factory=list)
+
+    def rejected_frame(self):
+        if not self.rejected:
+            return pd.DataFrame(columns=COLUMNS + ['Row', 'Reason'])
+        return pd.concat(self.rejected, ignore_index=True)
+
+
+def read_chunks(source, filename, chunk_size=10_000):
+    """Yield DataFrames of at most ``chunk_size`` rows with every column as text."""
+    if str(filename).lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas().astype('string').astype(object)
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+
+def validate_chunk(chunk, store):
+    """Split a raw chunk into (valid rows ready to upsert, rejected rows with a Reason)."""
+    missing = [col for col in COLUMNS if col not in chunk.columns]
+    if missing:
+        rejected = chunk.copy()
+        rejected['Reason'] = f"Missing columns: {', '.join(missing)}"
+        return pd.DataFrame(columns=COLUMNS), rejected
+
+    chunk = chunk[COLUMNS].apply(lambda col: col.fillna('').astype(str).str.strip())
+    quantity = pd.to_numeric(chunk['Quantity'], errors='coerce')
+    min_stock = pd.to_numeric(chunk['Min_Stock'], errors='coerce')
+    expiry = pd.to_datetime(chunk['Expiry_Date'], format='ISO8601', errors='coerce')
+    unit = chunk['Unit'].str.title()
+
+    # An existing name may only be reused by the item that already owns it
+    name_pos = store.lookup(chunk['Item_Name'], by='Item_Name')
+    id_pos = store.lookup(chunk['Item_ID'])
+
+    # Checks in priority order; each row is reported with the first one it fails
+    checks = [
+        (~chunk['Item_ID'].str.fullmatch(ITEM_ID_PATTERN), 'Invalid Item_ID'),
+        (chunk['Item_Name'] == '', 'Missing Item_Name'),
+        (name_pos.notna() & (name_pos != id_pos), 'Item_Name already used by another Item_ID'),
+        (name_pos.isna() & (chunk.groupby('Item_Name')['Item_ID'].transform('nunique') > 1), 'Item_Name repeated with different Item_IDs'),
+        (~chunk['Category'].isin(CATEGORIES), 'Unknown Category'),
+        (quantity.isna() | (quantity < 0) | (quantity % 1 != 0), 'Quantity must be a whole number >= 0'),
+        (min_stock.isna() | (min_stock < 0) | (min_stock % 1 != 0), 'Min_Stock must be a whole number >= 0'),
+        (~unit.isin(UNITS), 'Unknown Unit'),
+        (expiry.isna(), 'Expiry_Date must be an ISO date (YYYY-MM-DD)'),
+    ]
+    reason = pd.Series('', index=chunk.index)
+    for failed, message in reversed(checks):
+        reason = reason.mask(failed.fillna(True), message)
+    bad = reason != ''
+
+    valid = chunk[~bad].copy()
+    valid['Quantity'] = quantity[~bad].astype(int)
+    valid['Min_Stock'] = min_stock[~bad].astype(int)
+    valid['Unit'] = unit[~bad]
+    valid['Expiry_Date'] = expiry[~bad].dt.strftime('%Y-%m-%d')
+    valid['Last_Updated'] = datetime.now().strftime('%Y-%m-%d %H:%M')
+
+    rejected = chunk[bad].copy()
+    rejected['Reason'] = reason[bad]
+    return valid, rejected
+
+
+def import_items(db, source, filename, chunk_size=10_000):
+    """Stream ``source`` into ``db`` and return an ImportReport."""
+    report = ImportReport()
+    row_offset = 0
+    for chunk in read_chunks(source, filename, chunk_size):
+        chunk.index = range(row_offset, row_offset + len(chunk))
+        row_offset += len(chunk)
+        valid, rejected = validate_chunk(chunk, db.store)
+        if len(valid):
+            updated, inserted = db.upsert_items(valid)
+            report.updated += updated
+            report.inserted += inserted
+        if len(rejected):
+            report.rejected_count += len(rejected)
+            kept = sum(len(r) for r in report.rejected)
+            if kept < MAX_REJECTED_ROWS:
+                # Matches the line number in a CSV file, where line 1 is the header
+                rejected.insert(0, 'Row', rejected.index + 2)
+                report.rejected.append(rejected.head(MAX_REJECTED_ROWS - kept))
+    return report
+
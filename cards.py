@@ -0,0 +1,84 @@
+import html
+from bisect import bisect_left, bisect_right
+
+import streamlit as st
+
+# Cards drawn per page of a card list
+PAGE_SIZE = 20
+
+
+class KeysetIndex:
+    """Row labels of a frame in display order, for keyset pagination.
+
+    Rows are sorted once by ``(by column, row position)``, so every key is
+    unique. A page is found by bisecting for the key of the last card on
+    the previous page, which costs the same on page 1 and page 500 and
+    stays put when rows are added before it. Without ``by`` the frame's
+    own row order is used.
+    """
+
+    def __init__(self, df, by=None, descending=False):
+        values = df[by].tolist() if by is not None else [0] * len(df)
+        self._keys = sorted(zip(values, range(len(df))))
+        self._labels = [df.index[position] for _, position in self._keys]
+        self.descending = descending
+
+    def __len__(self):
+        return len(self._keys)
+
+    def page(self, after=None, size=PAGE_SIZE):
+        """(labels, cursors, start) for the ``size`` rows that follow the
+        cursor ``after``, or the first rows without one. ``cursors`` holds
+        the key of each row on the page and ``start`` the position of the
+        first one in the list."""
+        if self.descending:
+            end = len(self._keys) if after is None else bisect_left(self._keys, after)
+            begin = max(end - size, 0)
+            return self._labels[begin:end][::-1], self._keys[begin:end][::-1], len(self._keys) - end
+        begin = 0 if after is None else bisect_right(self._keys, after)
+        end = begin + size
+        return self._labels[begin:end], self._keys[begin:end], begin
+
+
+def _escape(row):
+    return {name: html.escape(str(value)) for name, value in row.items()}
+
+
+def render_cards(df, card):
+    """All rows of ``df`` as one markdown element. ``card`` formats one row
+    (a dict of HTML-escaped values) as an HTML snippet."""
+    if df.empty:
+        return
+    # Unindented and without blank lines, the cards stay one HTML block
+    # instead of turning into markdown code blocks
+    st.markdown('\n'.join(card(_escape(row)).strip() for row in df.to_dict('records')), unsafe_allow_html=True)
+
+
+def card_page(df, key, card, by=None, descending=False, page_size=PAGE_SIZE, version=None):
+    """One page of ``df`` as cards with Previous/Next buttons.
+
+    The sorted index is kept in session state and rebuilt only when ``df``
+    is a different frame, or ``version`` changes for callers that build a
+    new frame every run. Returns the rows shown.
+    """
+    cached = st.session_state.get(f"{key}_index")
+    if cached is None or cached[1] != version or (version is None and cached[0] is not df):
+        cached = st.session_state[f"{key}_index"] = (df, version, KeysetIndex(df, by, descending))
+        st.session_state[f"{key}_cursors"] = []
+    index = cached[2]
+    # Cursors of the pages before this one; the last is where it starts
+    cursors = st.session_state.setdefault(f"{key}_cursors", [])
+    labels, keys, start = index.page(cursors[-1] if cursors else None, page_size)
+    page = df.loc[labels]
+    render_cards(page, card)
+
+    if len(index) > page_size:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        if col1.button("◀ Previous", key=f"{key}_prev", disabled=not cursors):
+            cursors.pop()
+            st.rerun()
+        col2.caption(f"Showing {start + 1}-{start + len(labels)} of {len(index)}")
+        if col3.button("Next ▶", key=f"{key}_next", disabled=start + len(labels) >= len(index)):
+            cursors.append(keys[-1])
+            st.rerun()
+    return page
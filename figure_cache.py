@@ -0,0 +1,69 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def content_hash(*parts):
+    """Digest of frames, series and plain values. Frames hash by their
+    values, index, column names and dtypes, so a rebuilt frame with the
+    same content gets the same digest."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            columns = part.dtypes.items() if isinstance(part, pd.DataFrame) else [(part.name, part.dtype)]
+            digest.update(repr(list(columns)).encode())
+        else:
+            digest.update(repr(part).encode())
+        # Keeps ('ab', 'c') apart from ('a', 'bc')
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Built Plotly figures, keyed by builder and a content hash of its
+    inputs, evicting the least recently used beyond ``max_entries``.
+
+    Building a figure with plotly express takes tens of milliseconds;
+    hashing a small frame takes well under one. Cached figures are shared
+    between sessions, so builders must apply all their layout themselves
+    and callers must not change the figure they get back.
+    """
+
+    def __init__(self, app, max_entries=32):
+        self.app = app
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figures)
+
+    def figure(self, build, *args, **options):
+        """``build(*args, **options)``, or the figure it returned for
+        inputs with the same content."""
+        key = (build.__qualname__, content_hash(*args, *sorted(options.items())))
+        with self._lock:
+            fig = self._figures.get(key)
+            if fig is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return fig
+        # Built outside the lock; two sessions missing at once both build
+        # and the second result wins, which is harmless
+        fig = build(*args, **options)
+        with self._lock:
+            self.misses += 1
+            self._figures[key] = fig
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
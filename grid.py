@@ -0,0 +1,41 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+LOW_STOCK_CSS = 'background-color: #ffcccc'
+NEAR_MIN_STOCK_CSS = 'background-color: #fff3cd'
+
+# Above this many rows the inventory grid is split into pages
+PAGE_SIZE = 200
+
+
+def stock_level_styles(df):
+    """CSS for every cell of ``df``, red at or below Min_Stock and amber up
+    to 1.5x Min_Stock, computed with one array comparison per threshold."""
+    qty = df['Quantity'].to_numpy()
+    min_stock = df['Min_Stock'].to_numpy()
+    row_css = np.select([qty <= min_stock, qty <= min_stock * 1.5], [LOW_STOCK_CSS, NEAR_MIN_STOCK_CSS], default='')
+    return pd.DataFrame(np.repeat(row_css[:, None], len(df.columns), axis=1), index=df.index, columns=df.columns)
+
+
+def style_stock_levels(df):
+    return df.style.apply(stock_level_styles, axis=None)
+
+
+def paginate(df, page, page_size=PAGE_SIZE):
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def stock_grid(df, key, height=400, page_size=PAGE_SIZE):
+    """Show ``df`` with stock-level colouring. Large tables get a page
+    selector and only the visible page is styled."""
+    if len(df) > page_size:
+        pages = math.ceil(len(df) / page_size)
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+        start = (page - 1) * page_size
+        st.caption(f"Showing rows {start + 1}-{min(start + page_size, len(df))} of {len(df)}")
+        df = paginate(df, page, page_size)
+    st.dataframe(style_stock_levels(df), use_container_width=True, height=height)
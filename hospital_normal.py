@@ -1,177 +1,336 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-from datetime import datetime
-
-# --- PAGE SETUP ---
-st.set_page_config(
-    page_title="MediCare+ Dashboard",
-    page_icon="🏥",
-    layout="wide"
-)
-
-# --- CUSTOM CSS ---
-st.markdown("""
-<style>
-    body {background-color: #f5f6fa;}
-    .metric-box {
-        background-color: #fff;
-        border-radius: 12px;
-        padding: 16px;
-        box-shadow: 0 2px 6px rgba(0,0,0,0.1);
-        text-align: center;
-    }
-    .patient-card {
-        background: #fff;
-        padding: 10px 14px;
-        border-radius: 10px;
-        margin-bottom: 6px;
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        color: #000; /* Make text black */
-    }
-    .patient-info {
-        text-align: left;
-        font-weight: 500;
-    }
-    .status {
-        display: inline-block;
-        padding: 3px 10px;
-        border-radius: 10px;
-        font-size: 12px;
-        font-weight: 600;
-        text-align: center;
-        min-width: 80px;
-    }
-    .admitted {background-color: #dbeafe; color: #1e3a8a;}
-    .outpatient {background-color: #d1fae5; color: #065f46;}
-    .surgery {background-color: #ede9fe; color: #5b21b6;}
-    .discharged {background-color: #f3f4f6; color: #374151;}
-    .critical {background-color: #fee2e2; color: #991b1b;}
-</style>
-""", unsafe_allow_html=True)
-
-# --- INITIAL DATA ---
-def init_data():
-    """Initialize the default session data only once."""
-    if "patients" not in st.session_state:
-        st.session_state.patients = pd.DataFrame([
-            {"ID": "P001", "Name": "Rahul Sharma", "Age": 45, "Department": "Cardiology", "Status": "Admitted", "Updated": "2h ago"},
-            {"ID": "P002", "Name": "Akshit Sinha", "Age": 32, "Department": "Neurology", "Status": "Outpatient", "Updated": "3h ago"},
-            {"ID": "P003", "Name": "Palash Sinha", "Age": 58, "Department": "Orthopedics", "Status": "Surgery", "Updated": "4h ago"},
-            {"ID": "P004", "Name": "Kamakshi Vishwakarma", "Age": 28, "Department": "Pediatrics", "Status": "Discharged", "Updated": "5h ago"},
-            {"ID": "P005", "Name": "Vedika Jha", "Age": 51, "Department": "Emergency", "Status": "Critical", "Updated": "1h ago"}
-        ])
-    if "appointments" not in st.session_state:
-        st.session_state.appointments = pd.DataFrame([
-            {"Patient": "Rahul Sharma", "Doctor": "Dr. A.K. Thakur", "Time": "10:00 AM", "Department": "Cardiology"},
-            {"Patient": "Akshit Sinha", "Doctor": "Dr. Sarah Sinha", "Time": "11:30 AM", "Department": "Neurology"},
-            {"Patient": "Palash Sinha", "Doctor": "Dr. Bhumi Yadav", "Time": "2:00 PM", "Department": "Orthopedics"}
-        ])
-    if "beds" not in st.session_state:
-        st.session_state.beds = pd.DataFrame([
-            {"Bed ID": "B101", "Ward": "ICU", "Status": "Occupied", "Patient": "Rahul Sharma"},
-            {"Bed ID": "B102", "Ward": "ICU", "Status": "Available", "Patient": ""},
-            {"Bed ID": "B201", "Ward": "General", "Status": "Occupied", "Patient": "Akshit Sinha"}
-        ])
-    if "staff" not in st.session_state:
-        st.session_state.staff = pd.DataFrame([
-            {"ID": "S001", "Name": "Dr. A.K. Thakur", "Role": "Cardiologist", "Shift": "Morning", "Status": "On Duty"},
-            {"ID": "S002", "Name": "Dr. Bhumi Yadav", "Role": "Orthopedic Surgeon", "Shift": "Evening", "Status": "On Duty"},
-            {"ID": "S003", "Name": "Dr. Anita Vishwakarma", "Role": "Pediatrician", "Shift": "Night", "Status": "Off Duty"}
-        ])
-
-init_data()
-
-# --- SIDEBAR NAVIGATION ---
-st.sidebar.title("🏥 MediCare+")
-page = st.sidebar.radio(
-    "Navigate",
-    ["📊 Overview", "👥 Patients", "📅 Appointments", "🛏️ Beds", "👨‍⚕️ Staff"]
-)
-
-# --- PAGE: OVERVIEW ---
-if page == "📊 Overview":
-    st.title("📊 Hospital Overview")
-    st.caption(f"📅 {datetime.now().strftime('%A, %B %d, %Y')}")
-
-    # Metrics
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Patients", len(st.session_state.patients))
-    col2.metric("Available Beds", len(st.session_state.beds.query('Status == "Available"')))
-    col3.metric("Appointments", len(st.session_state.appointments))
-    col4.metric("Staff On Duty", len(st.session_state.staff.query('Status == "On Duty"')))
-
-    # Charts
-    left, right = st.columns([2, 1])
-    with left:
-        st.subheader("Weekly Trends")
-        data = pd.DataFrame({
-            "Day": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
-            "Patients": [40, 45, 52, 48, 60, 55, 38],
-            "Appointments": [30, 35, 38, 32, 40, 28, 25]
-        })
-        fig = px.line(data, x="Day", y=["Patients", "Appointments"], markers=True, template="plotly_white")
-        st.plotly_chart(fig, use_container_width=True)
-
-    with right:
-        st.subheader("Department Breakdown")
-        dept_counts = st.session_state.patients["Department"].value_counts()
-        fig = px.pie(values=dept_counts.values, names=dept_counts.index, hole=0.4)
-        st.plotly_chart(fig, use_container_width=True)
-
-    # Recent Patients
-    st.subheader("🧾 Recent Patients")
-    for _, row in st.session_state.patients.head().iterrows():
-        st.markdown(
-            f"""
-            <div class='patient-card'>
-                <div class='patient-info'>
-                    <b>{row['Name']}</b> ({row['Age']} yrs) - {row['Department']}
-                </div>
-                <div>
-                    <span class='status {row['Status'].lower()}'>{row['Status']}</span>
-                </div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-
-# --- PAGE: PATIENTS ---
-elif page == "👥 Patients":
-    st.title("👥 Patient Management")
-
-    tabs = st.tabs(["📋 All Patients", "➕ Add Patient"])
-    with tabs[0]:
-        st.dataframe(st.session_state.patients, use_container_width=True)
-    with tabs[1]:
-        with st.form("new_patient"):
-            name = st.text_input("Name")
-            age = st.number_input("Age", 0, 120)
-            dept = st.selectbox("Department", ["Cardiology", "Neurology", "Orthopedics", "Pediatrics", "Emergency"])
-            status = st.selectbox("Status", ["Admitted", "Outpatient", "Surgery", "Discharged", "Critical"])
-            submitted = st.form_submit_button("Add Patient")
-            if submitted and name:
-                new_row = pd.DataFrame([{
-                    "ID": f"P{len(st.session_state.patients)+1:03}",
-                    "Name": name, "Age": age, "Department": dept,
-                    "Status": status, "Updated": "Just now"
-                }])
-                st.session_state.patients = pd.concat([st.session_state.patients, new_row], ignore_index=True)
-                st.success(f"✅ Added patient: {name}")
-
-# --- PAGE: APPOINTMENTS ---
-elif page == "📅 Appointments":
-    st.title("📅 Appointment Management")
-    st.dataframe(st.session_state.appointments, use_container_width=True)
-
-# --- PAGE: BEDS ---
-elif page == "🛏️ Beds":
-    st.title("🛏️ Bed Management")
-    st.dataframe(st.session_state.beds, use_container_width=True)
-
-# --- PAGE: STAFF ---
-elif page == "👨‍⚕️ Staff":
-    st.title("👨‍⚕️ Staff Management")
-    st.dataframe(st.session_state.staff, use_container_width=True)
+import os
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import datetime, timedelta
+import cards
+from bed_occupancy import BedBoard
+from scheduler import Scheduler
+import metrics
+from figure_cache import FigureCache
+from ids import IdAllocator, SequenceFile, UniqueIndex
+import profiling
+
+# --- PAGE SETUP ---
+st.set_page_config(
+    page_title="MediCare+ Dashboard",
+    page_icon="🏥",
+    layout="wide"
+)
+
+# --- CUSTOM CSS ---
+st.markdown("""
+<style>
+    body {background-color: #f5f6fa;}
+    .metric-box {
+        background-color: #fff;
+        border-radius: 12px;
+        padding: 16px;
+        box-shadow: 0 2px 6px rgba(0,0,0,0.1);
+        text-align: center;
+    }
+    .patient-card {
+        background: #fff;
+        padding: 10px 14px;
+        border-radius: 10px;
+        margin-bottom: 6px;
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        color: #000; /* Make text black */
+    }
+    .patient-info {
+        text-align: left;
+        font-weight: 500;
+    }
+    .status {
+        display: inline-block;
+        padding: 3px 10px;
+        border-radius: 10px;
+        font-size: 12px;
+        font-weight: 600;
+        text-align: center;
+        min-width: 80px;
+    }
+    .admitted {background-color: #dbeafe; color: #1e3a8a;}
+    .outpatient {background-color: #d1fae5; color: #065f46;}
+    .surgery {background-color: #ede9fe; color: #5b21b6;}
+    .discharged {background-color: #f3f4f6; color: #374151;}
+    .critical {background-color: #fee2e2; color: #991b1b;}
+</style>
+""", unsafe_allow_html=True)
+
+# --- PROFILING ---
+# Section timings; DASHBOARD_PROFILE=1 adds copy and memory counts (there is no
+# login here, so ?profile=1 is ignored)
+@st.cache_resource
+def get_profiler():
+    return profiling.Profiler('hospital')
+
+profiler = get_profiler()
+profile_run = profiling.requested()
+
+def timed(name):
+    return profiler.section(name, profile_run)
+
+# --- CHARTS ---
+# Figures are rebuilt only when their data changes
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache('hospital')
+
+figures = get_figure_cache()
+
+def trend_figure(data):
+    return px.line(data, x="Period", y=["Patients", "Appointments"], markers=True, template="plotly_white")
+
+def department_figure(dept_counts):
+    return px.pie(values=dept_counts.values, names=dept_counts.index, hole=0.4)
+
+# --- IDS ---
+# Patient numbers come from a counter on disk, handed to each session a
+# block at a time, so two sessions can never number a patient the same
+DATA_DIR = os.environ.get('HOSPITAL_DATA_DIR', 'data')
+
+@st.cache_resource
+def get_patient_ids():
+    return IdAllocator(SequenceFile(os.path.join(DATA_DIR, 'hospital_ids.json')), 'patient', 'P')
+
+patient_ids = get_patient_ids()
+
+# --- SHARED SCHEDULE ---
+# One scheduler for every session, so a booking is checked against all of
+# them under the scheduler's lock and a doctor can't be booked twice
+@st.cache_resource
+def get_scheduler():
+    # Today's appointments, half an hour each
+    return Scheduler.from_frame(pd.DataFrame([
+        {"Patient": "Rahul Sharma", "Doctor": "Dr. A.K. Thakur", "Time": "10:00 AM", "Department": "Cardiology"},
+        {"Patient": "Akshit Sinha", "Doctor": "Dr. Sarah Sinha", "Time": "11:30 AM", "Department": "Neurology"},
+        {"Patient": "Palash Sinha", "Doctor": "Dr. Bhumi Yadav", "Time": "2:00 PM", "Department": "Orthopedics"}
+    ]), datetime.now().date(), departments={"Dr. Anita Vishwakarma": "Pediatrics"})
+
+scheduler = get_scheduler()
+
+# Likewise one bed board, so a bed can't be given to two patients from
+# different sessions and occupancy counts everyone's stays
+@st.cache_resource
+def get_bed_board():
+    return BedBoard.from_frame(pd.DataFrame([
+        {"Bed ID": "B101", "Ward": "ICU", "Status": "Occupied", "Patient": "Rahul Sharma"},
+        {"Bed ID": "B102", "Ward": "ICU", "Status": "Available", "Patient": ""},
+        {"Bed ID": "B201", "Ward": "General", "Status": "Occupied", "Patient": "Akshit Sinha"}
+    ]))
+
+bed_board = get_bed_board()
+
+# --- INITIAL DATA ---
+def init_data():
+    """Initialize the default session data only once."""
+    if "patients" not in st.session_state:
+        st.session_state.patients = pd.DataFrame([
+            {"ID": "P001", "Name": "Rahul Sharma", "Age": 45, "Department": "Cardiology", "Status": "Admitted", "Updated": "2h ago"},
+            {"ID": "P002", "Name": "Akshit Sinha", "Age": 32, "Department": "Neurology", "Status": "Outpatient", "Updated": "3h ago"},
+            {"ID": "P003", "Name": "Palash Sinha", "Age": 58, "Department": "Orthopedics", "Status": "Surgery", "Updated": "4h ago"},
+            {"ID": "P004", "Name": "Kamakshi Vishwakarma", "Age": 28, "Department": "Pediatrics", "Status": "Discharged", "Updated": "5h ago"},
+            {"ID": "P005", "Name": "Vedika Jha", "Age": 51, "Department": "Emergency", "Status": "Critical", "Updated": "1h ago"}
+        ])
+    if "patient_ids" not in st.session_state:
+        patient_ids.seed(st.session_state.patients["ID"])
+        st.session_state.patient_ids = patient_ids.block()
+        st.session_state.patient_index = UniqueIndex(st.session_state.patients["ID"])
+    if "staff" not in st.session_state:
+        st.session_state.staff = pd.DataFrame([
+            {"ID": "S001", "Name": "Dr. A.K. Thakur", "Role": "Cardiologist", "Shift": "Morning", "Status": "On Duty"},
+            {"ID": "S002", "Name": "Dr. Bhumi Yadav", "Role": "Orthopedic Surgeon", "Shift": "Evening", "Status": "On Duty"},
+            {"ID": "S003", "Name": "Dr. Anita Vishwakarma", "Role": "Pediatrician", "Shift": "Night", "Status": "Off Duty"}
+        ])
+    if "metrics" not in st.session_state:
+        st.session_state.metrics = session_metrics(st.session_state.patients, scheduler.frame())
+
+def session_metrics(patients, appointments):
+    """Admission and appointment events of this session's data, for the trends."""
+    now = datetime.now()
+    hospital_metrics = metrics.HourlyMetrics()
+    for _, row in patients.iterrows():
+        # "Updated" reads like "2h ago"
+        hours_ago = int(row["Updated"].split("h")[0]) if row["Updated"][0].isdigit() else 0
+        hospital_metrics.add(now - timedelta(hours=hours_ago), metrics.ADMISSION, row["Department"])
+    for _, row in appointments.iterrows():
+        hospital_metrics.add(row["Start"], metrics.APPOINTMENT, row["Department"])
+    return hospital_metrics
+
+init_data()
+
+def patient_card(row):
+    return f"""
+        <div class='patient-card'>
+            <div class='patient-info'>
+                <b>{row['Name']}</b> ({row['Age']} yrs) - {row['Department']}
+            </div>
+            <div>
+                <span class='status {row['Status'].lower()}'>{row['Status']}</span>
+            </div>
+        </div>
+    """
+
+# --- SIDEBAR NAVIGATION ---
+st.sidebar.title("🏥 MediCare+")
+page = st.sidebar.radio(
+    "Navigate",
+    ["📊 Overview", "👥 Patients", "📅 Appointments", "🛏️ Beds", "👨‍⚕️ Staff"]
+)
+
+# --- PAGE: OVERVIEW ---
+if page == "📊 Overview":
+    st.title("📊 Hospital Overview")
+    st.caption(f"📅 {datetime.now().strftime('%A, %B %d, %Y')}")
+    time_range = st.selectbox("Time Range", metrics.TIME_RANGES, index=metrics.TIME_RANGES.index("This Week"))
+
+    # Metrics
+    with timed("overview.metrics"):
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total Patients", len(st.session_state.patients))
+        col2.metric("Available Beds", bed_board.free_count())
+        col3.metric("Appointments", len(scheduler))
+        col4.metric("Staff On Duty", len(st.session_state.staff.query('Status == "On Duty"')))
+
+    # Charts
+    left, right = st.columns([2, 1])
+    with left:
+        st.subheader(f"Trends: {time_range}")
+        with timed("overview.trend_chart"):
+            data = st.session_state.metrics.trend(time_range)
+            st.plotly_chart(figures.figure(trend_figure, data), use_container_width=True)
+
+    with right:
+        st.subheader("Department Breakdown")
+        with timed("overview.department_chart"):
+            dept_counts = st.session_state.patients["Department"].value_counts()
+            st.plotly_chart(figures.figure(department_figure, dept_counts), use_container_width=True)
+
+    # Recent Patients, newest first, one page of cards per element
+    st.subheader("🧾 Recent Patients")
+    with timed("overview.patient_cards"):
+        cards.card_page(st.session_state.patients, "recent_patients", patient_card, descending=True, page_size=5)
+
+# --- PAGE: PATIENTS ---
+elif page == "👥 Patients":
+    st.title("👥 Patient Management")
+
+    tabs = st.tabs(["📋 All Patients", "➕ Add Patient"])
+    with tabs[0]:
+        with timed("patients.table"):
+            st.dataframe(st.session_state.patients, use_container_width=True)
+    with tabs[1]:
+        with st.form("new_patient"):
+            name = st.text_input("Name")
+            age = st.number_input("Age", 0, 120)
+            dept = st.selectbox("Department", ["Cardiology", "Neurology", "Orthopedics", "Pediatrics", "Emergency"])
+            status = st.selectbox("Status", ["Admitted", "Outpatient", "Surgery", "Discharged", "Critical"])
+            submitted = st.form_submit_button("Add Patient")
+            if submitted and name:
+                with timed("patients.add"):
+                    patient_id = st.session_state.patient_ids.next()
+                    added = st.session_state.patient_index.add(patient_id)
+                    if added:
+                        new_row = pd.DataFrame([{
+                            "ID": patient_id,
+                            "Name": name, "Age": age, "Department": dept,
+                            "Status": status, "Updated": "Just now"
+                        }])
+                        st.session_state.patients = pd.concat([st.session_state.patients, new_row], ignore_index=True)
+                        st.session_state.metrics.add(datetime.now(), metrics.ADMISSION, dept)
+                if added:
+                    st.success(f"✅ Added patient: {name} ({patient_id})")
+                else:
+                    st.error(f"❌ Patient ID {patient_id} is already taken, please add the patient again")
+
+# --- PAGE: APPOINTMENTS ---
+elif page == "📅 Appointments":
+    st.title("📅 Appointment Management")
+
+    tabs = st.tabs(["📋 Schedule", "➕ Book Appointment", "🕒 Free Slots"])
+    with tabs[0]:
+        with timed("appointments.table"):
+            st.dataframe(scheduler.frame(), use_container_width=True, hide_index=True)
+    with tabs[1]:
+        col1, col2 = st.columns(2)
+        dept = col1.selectbox("Department", scheduler.departments(), key="book_department")
+        doctor = col2.selectbox("Doctor", scheduler.doctors(dept), key="book_doctor")
+        col1, col2, col3 = st.columns(3)
+        day = col1.date_input("Date", key="book_day")
+        start_time = col2.time_input("Time", key="book_time", step=900)
+        minutes = col3.selectbox("Duration (min)", [15, 30, 45, 60, 90], index=1)
+        patient = st.text_input("Patient", key="book_patient")
+        if st.button("Book Appointment", disabled=not patient):
+            start = datetime.combine(day, start_time)
+            with timed("appointments.book"):
+                ok, result = scheduler.book(patient, doctor, start, timedelta(minutes=minutes))
+            if ok:
+                st.session_state.metrics.add(start, metrics.APPOINTMENT, dept)
+                st.success(f"✅ Booked {patient} with {doctor} at {start:%d %b %H:%M} ({result})")
+            else:
+                st.error(f"❌ {result}")
+    with tabs[2]:
+        col1, col2, col3 = st.columns(3)
+        dept = col1.selectbox("Department", scheduler.departments(), key="slots_department")
+        minutes = col2.selectbox("Duration (min)", [15, 30, 45, 60, 90], index=1, key="slots_minutes")
+        count = col3.number_input("Slots", 1, 50, 5)
+        with timed("appointments.free_slots"):
+            slots = scheduler.next_free_slots(dept, datetime.now(), count, timedelta(minutes=minutes))
+        st.dataframe(pd.DataFrame(slots, columns=["Start", "Doctor"]), use_container_width=True, hide_index=True)
+
+# --- PAGE: BEDS ---
+elif page == "🛏️ Beds":
+    st.title("🛏️ Bed Management")
+
+    tabs = st.tabs(["🛏️ Bed Board", "🔎 Find a Bed", "📈 Occupancy"])
+    with tabs[0]:
+        with timed("beds.board"):
+            st.dataframe(bed_board.status_frame(), use_container_width=True)
+    with tabs[1]:
+        if "bed_message" in st.session_state:
+            st.success(st.session_state.pop("bed_message"))
+        # Defaults set once, so the inputs don't reset as the clock moves
+        now = datetime.now().replace(second=0, microsecond=0)
+        st.session_state.setdefault("bed_day", now.date())
+        st.session_state.setdefault("bed_time", now.time())
+        col1, col2, col3 = st.columns(3)
+        ward = col1.selectbox("Ward", bed_board.wards())
+        day = col2.date_input("From", key="bed_day")
+        start_time = col3.time_input("At", key="bed_time")
+        hours = st.slider("Hours needed", 1, 72, 6)
+        start = datetime.combine(day, start_time)
+        end = start + timedelta(hours=hours)
+        with timed("beds.free_window"):
+            free = bed_board.free_beds(ward, start, end)[ward]
+        st.caption(f"{len(free)} of {len(bed_board.beds(ward))} beds in {ward} free from {start:%d %b %H:%M} to {end:%d %b %H:%M}")
+        if free:
+            st.write(", ".join(free))
+        patient = st.text_input("Patient")
+        if st.button("Allocate Bed", disabled=not free or not patient):
+            bed = bed_board.allocate(ward, patient, start, end)
+            if bed:
+                st.session_state.bed_message = f"✅ {patient} allocated to {bed}"
+                st.rerun()
+            st.error("No bed is free for the whole stay any more")
+    with tabs[2]:
+        now = datetime.now()
+        with timed("beds.occupancy"):
+            occupancy = bed_board.occupancy(now - timedelta(days=7), now, freq="D")
+        st.caption("Share of bed time taken per day, last 7 days")
+        st.line_chart(occupancy, y_label="% occupied")
+
+# --- PAGE: STAFF ---
+elif page == "👨‍⚕️ Staff":
+    st.title("👨‍⚕️ Staff Management")
+    st.dataframe(st.session_state.staff, use_container_width=True)
+
+# --- PROFILING PANEL ---
+# Drawn last so it includes this run's sections
+if profile_run:
+    with st.sidebar:
+        st.markdown("---")
+        st.subheader("⏱️ Profiling")
+        profiling.show_panel(profiler)
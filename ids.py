@@ -0,0 +1,154 @@
+import json
+import os
+import re
+import threading
+
+
+class Sequences:
+    """Named counters that hand out numbers in blocks.
+
+    ``reserve`` moves a counter past a whole block under one lock and
+    calls ``save(name, last)`` before the block is returned, so a number
+    that has been handed out is never handed out again, even after a
+    restart. Numbers left over in a block that is never used up are
+    skipped rather than reused, so IDs can have gaps.
+    """
+
+    def __init__(self, counters=None, save=None):
+        self.counters = dict(counters or {})
+        self._save = save
+        self._lock = threading.RLock()
+
+    def last(self, name):
+        return self.counters.get(name, 0)
+
+    def advance(self, name, last):
+        """Make sure the next number of ``name`` is above ``last``."""
+        with self._lock:
+            if last > self.last(name):
+                self.counters[name] = last
+
+    def reserve(self, name, count=1):
+        """The (first, last) numbers of a new block of ``count``."""
+        with self._lock:
+            first = self.last(name) + 1
+            last = first + count - 1
+            if self._save is not None:
+                self._save(name, last)
+            self.advance(name, last)
+            return first, last
+
+    def to_dict(self):
+        # No lock: a snapshot taken while ``save`` waits on its writer's
+        # lock must not wait on this one in turn
+        return dict(self.counters)
+
+
+class SequenceFile(Sequences):
+    """Sequences kept in a JSON file, which is replaced atomically (and
+    fsync'd) once per reserved block."""
+
+    def __init__(self, path):
+        self.path = path
+        counters = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                counters = json.load(f)
+        super().__init__(counters, save=self._write)
+
+    def _write(self, name, last):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(dict(self.counters, **{name: last}), f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+class IdAllocator:
+    """IDs like ``P001`` from one counter of ``sequences``.
+
+    Each writer (a session, or the API thread) takes its own IdBlock and
+    draws IDs from it; the shared counter, and its lock, are only touched
+    once every ``block_size`` IDs. The number is zero-padded to ``width``
+    digits and simply grows past it (P999, P1000), so IDs never wrap.
+    """
+
+    def __init__(self, sequences, name, prefix, width=3, block_size=50, first=1):
+        self.sequences = sequences
+        self.name = name
+        self.prefix = prefix
+        self.width = width
+        self.block_size = block_size
+        self._pattern = re.compile(re.escape(prefix) + r'(\d+)$')
+        sequences.advance(name, first - 1)
+
+    def format(self, number):
+        return f"{self.prefix}{number:0{self.width}}"
+
+    def number(self, value):
+        """The number in an ID of this allocator, or None."""
+        match = self._pattern.match(str(value))
+        return int(match.group(1)) if match else None
+
+    def seed(self, existing):
+        """Move the counter past IDs that were made without it."""
+        numbers = [n for n in map(self.number, existing) if n is not None]
+        if numbers:
+            self.sequences.advance(self.name, max(numbers))
+
+    def reserve(self):
+        return self.sequences.reserve(self.name, self.block_size)
+
+    def block(self):
+        return IdBlock(self)
+
+
+class IdBlock:
+    """IDs of the blocks reserved for one writer, drawn in order. The
+    lock only matters when one block is shared between threads."""
+
+    def __init__(self, allocator):
+        self.allocator = allocator
+        self._next, self._last = 1, 0
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            if self._next > self._last:
+                self._next, self._last = self.allocator.reserve()
+            number = self._next
+            self._next += 1
+        return self.allocator.format(number)
+
+
+class UniqueIndex:
+    """Set of the keys of a table; ``add`` rejects a key that is already
+    there, so an insert can be checked in O(1) before it is written."""
+
+    def __init__(self, keys=()):
+        self._keys = set(keys)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._keys))
+
+    def add(self, key):
+        """True if ``key`` was added, False if it was already present."""
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def discard(self, key):
+        with self._lock:
+            self._keys.discard(key)
@@ -0,0 +1,383 @@
+import atexit
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from append_log import AppendLog
+from ids import IdAllocator, Sequences, UniqueIndex
+from inventory_store import InventoryStore
+from location_stock import LocationStock
+from lots import LotBook
+from persistence import Journal
+from rollups import UsageRollup
+
+INVENTORY_COLUMNS = {
+    'Item_ID': 'object', 'Item_Name': 'object', 'Category': 'object', 'Quantity': 'int64',
+    'Min_Stock': 'int64', 'Unit': 'object', 'Expiry_Date': 'object', 'Location': 'object',
+    'Last_Updated': 'object',
+}
+USAGE_COLUMNS = ['Date_Time', 'Item_ID', 'Item_Name', 'Quantity_Used', 'Used_By', 'Department', 'Remarks']
+PO_COLUMNS = ['PO_ID', 'Date', 'Item_Name', 'Quantity', 'Supplier', 'Status', 'Requested_By']
+
+DATA_DIR = os.environ.get('INVENTORY_DATA_DIR', 'data')
+
+
+class InventoryDB:
+    """Inventory, usage log and purchase orders backed by a journal on disk.
+
+    Every write goes through one of the public methods below, which apply
+    the change in memory and append it to the journal. On startup the
+    latest snapshot is loaded and only the journal tail is replayed.
+
+    Stock is held in lots (see LotBook). An item's Quantity is the sum of
+    its lots and its Expiry_Date is that of its earliest-expiring lot. The
+    same stock is also split across locations (see LocationStock); usage
+    is drawn from the recording department first, then from the item's
+    Location, then from wherever holds the most.
+
+    One instance is shared by every Streamlit session in the process.
+    Stock decrements are optimistic: the quantity and row version are read
+    and checked without a lock, and the commit is rejected (and retried) if
+    another session changed the row in between. Only the commit itself,
+    which has to append to the single journal anyway, is serialized.
+
+    PO numbers come from a journaled counter in blocks (see ids.py), so
+    they stay unique across sessions and restarts, and an index of the
+    PO IDs rejects a duplicate before it is written.
+    """
+
+    def __init__(self, path=DATA_DIR, seed=None, snapshot_every=1000):
+        self.snapshot_every = snapshot_every
+        self.conflicts = 0
+        self._lock = threading.RLock()
+        self.journal = Journal(path)
+        state, records = self.journal.recover()
+
+        if state is not None:
+            inventory = pd.DataFrame(state['inventory'])
+            if inventory.empty:
+                # Column types of an empty frame don't survive the JSON round trip
+                inventory = inventory.astype({c: t for c, t in INVENTORY_COLUMNS.items() if c in inventory})
+            self.store = InventoryStore(inventory)
+            self.usage_log = AppendLog.from_state(state['usage_log'], self.journal.read_segment)
+            self.purchase_orders = AppendLog.from_state(state['purchase_orders'], self.journal.read_segment)
+            if 'usage_rollup' in state:
+                self.usage_rollup = UsageRollup.from_dict(state['usage_rollup'])
+            else:
+                # Snapshot written before rollups existed
+                self.usage_rollup = UsageRollup()
+                for chunk in self.usage_log.chunks():
+                    self.usage_rollup.add_frame(chunk)
+            if 'lots' in state:
+                self.lots = LotBook.from_dict(state['lots'])
+            else:
+                self.lots = LotBook.from_inventory(self.store.df)
+            if 'location_stock' in state:
+                self.location_stock = LocationStock.from_dict(state['location_stock'], self.store)
+            else:
+                self.location_stock = LocationStock.from_inventory(self.store.df)
+        else:
+            if seed is None:
+                seed = pd.DataFrame(columns=list(INVENTORY_COLUMNS)).astype(INVENTORY_COLUMNS)
+            self.store = InventoryStore(seed)
+            self.usage_log = AppendLog(USAGE_COLUMNS)
+            self.purchase_orders = AppendLog(PO_COLUMNS)
+            self.usage_rollup = UsageRollup()
+            self.lots = LotBook.from_inventory(self.store.df)
+            self.location_stock = LocationStock.from_inventory(self.store.df)
+
+        self.sequences = Sequences(state.get('sequences') if state is not None else None,
+                                   save=self._save_sequence)
+        self.po_ids = IdAllocator(self.sequences, 'purchase_order', 'PO', width=4, first=1001)
+        self.po_index = UniqueIndex(self.purchase_orders.to_dict()['PO_ID'])
+
+        for record in records:
+            self._apply(record['op'], record['data'])
+
+        # POs numbered before the counter existed
+        self.po_ids.seed(self.po_index)
+        self._po_block = self.po_ids.block()
+
+        if state is None:
+            self.journal.snapshot(*self._capture())
+        atexit.register(self.journal.close)
+
+    @property
+    def revision(self):
+        """Number of the last committed change; views computed from the
+        data stay valid until it moves."""
+        return self.journal.seq
+
+    def _capture(self):
+        """(state, segments) for Journal.snapshot, taken under the lock.
+
+        The logs hand over their sealed chunks, which never change, and
+        the inventory frame is copied, so turning it all into JSON can
+        happen in the background without holding up commits.
+        """
+        usage_log, usage_segments = self.usage_log.capture('usage_log')
+        purchase_orders, po_segments = self.purchase_orders.capture('purchase_orders')
+        state = {
+            'inventory': self.store.df.copy(),
+            'usage_log': usage_log,
+            'purchase_orders': purchase_orders,
+            'usage_rollup': self.usage_rollup.to_dict(),
+            'lots': self.lots.to_dict(),
+            'location_stock': self.location_stock.to_dict(self.store.df['Item_ID'].tolist()),
+            'sequences': self.sequences.to_dict(),
+        }
+        return state, {**usage_segments, **po_segments}
+
+    def _apply(self, op, data):
+        """Apply a change in memory. Returns False, having changed nothing,
+        if a usage would take an item below zero or a new item's ID or
+        name is taken."""
+        if op == 'usage':
+            if not self._consume(data):
+                return False
+            self.usage_log.append(data)
+            self.usage_rollup.add(data)
+        elif op == 'usage_batch':
+            totals = {}
+            for row in data['rows']:
+                totals[row['Item_ID']] = totals.get(row['Item_ID'], 0) + row['Quantity_Used']
+            if any(self.store.get(item_id, 'Quantity') < quantity for item_id, quantity in totals.items()):
+                return False
+            for row in data['rows']:
+                self._consume(row)
+            self.usage_log.extend(data['rows'])
+            for row in data['rows']:
+                self.usage_rollup.add(row)
+        elif op == 'add_item':
+            if not self.store.add_item(data):
+                return False
+            self._sync_stock(data['Item_ID'], data['Last_Updated'])
+        elif op == 'upsert_items':
+            items = pd.DataFrame(data['items'])
+            self.store.upsert_items(items)
+            for item_id, updated_at in zip(items['Item_ID'], items['Last_Updated']):
+                self._sync_stock(item_id, updated_at)
+        elif op == 'update_item':
+            pos = self.store.position(data['key'])
+            old_home = str(self.store.df.at[pos, 'Location'])
+            self.store.update(data['key'], **data['values'])
+            new_home = str(self.store.df.at[pos, 'Location'])
+            held = self.location_stock.available(pos, old_home)
+            if new_home != old_home and held:
+                # The item's home moved; the stock kept there moves with it
+                self.location_stock.transfer(pos, old_home, new_home, held)
+            if 'Quantity' in data['values'] or 'Expiry_Date' in data['values']:
+                self._sync_stock(self.store.get(data['key'], 'Item_ID'), data['values']['Last_Updated'])
+        elif op == 'receive_lot':
+            item_id = data['Item_ID']
+            self.lots.receive(item_id, data['Lot_No'], data['Quantity'], data['Expiry_Date'])
+            self.store.update(item_id, Quantity=self.store.get(item_id, 'Quantity') + data['Quantity'],
+                              Last_Updated=data['Received_At'])
+            self._sync_expiry(item_id, data['Received_At'])
+            pos = self.store.position(item_id)
+            self.location_stock.add(pos, str(self.store.df.at[pos, 'Location']), data['Quantity'])
+        elif op == 'transfer':
+            self.location_stock.transfer(self.store.position(data['Item_ID']), data['From'], data['To'], data['Quantity'])
+        elif op == 'set_par':
+            self.location_stock.set_par(self.store.position(data['Item_ID']), data['Location'], data['Par_Level'])
+        elif op == 'purchase_order':
+            self.purchase_orders.append(data)
+            self.po_index.add(data['PO_ID'])
+        elif op == 'reserve_ids':
+            self.sequences.advance(data['Sequence'], data['Last'])
+        return True
+
+    def _consume(self, usage):
+        ok, _ = self.store.consume(usage['Item_ID'], usage['Quantity_Used'], updated_at=usage['Date_Time'][:16])
+        if not ok:
+            return False
+        self.lots.consume(usage['Item_ID'], usage['Quantity_Used'])
+        pos = self.store.position(usage['Item_ID'])
+        self.location_stock.draw(pos, usage['Quantity_Used'], first=(usage['Department'], str(self.store.df.at[pos, 'Location'])))
+        self._sync_expiry(usage['Item_ID'], usage['Date_Time'][:16])
+        return True
+
+    def _sync_stock(self, item_id, updated_at):
+        # Quantity or expiry was set directly on the item; make the lots and
+        # locations agree
+        pos = self.store.position(item_id)
+        quantity = self.store.df.at[pos, 'Quantity']
+        self.lots.adjust_to(item_id, quantity, self.store.df.at[pos, 'Expiry_Date'])
+        self.location_stock.set_total(pos, quantity, str(self.store.df.at[pos, 'Location']))
+        self._sync_expiry(item_id, updated_at)
+
+    def _sync_expiry(self, item_id, updated_at):
+        earliest = self.lots.earliest_expiry(item_id)
+        if earliest is not None and earliest != str(self.store.get(item_id, 'Expiry_Date'))[:10]:
+            self.store.update(item_id, Expiry_Date=earliest, Last_Updated=updated_at)
+
+    def _commit(self, op, data, expected=None):
+        """Apply and journal a change. ``expected`` is an optional
+        (position, version) pair; the commit is rejected if that row has
+        been written since it was read. Nothing is journalled when the
+        change itself is rejected (see _apply)."""
+        with self._lock:
+            if expected is not None and self.store.version(expected[0]) != expected[1]:
+                return False
+            if not self._apply(op, data):
+                return False
+            self.journal.append(op, data)
+            if self.journal.records_since_snapshot >= self.snapshot_every and not self.journal.snapshotting:
+                self.journal.snapshot(*self._capture(), background=True)
+            return True
+
+    def record_usage(self, item, quantity, used_by, department, remarks=''):
+        """Returns (ok, quantity_after); nothing is written when stock is short."""
+        while True:
+            pos, current_qty, version = self.store.read(item)
+            if current_qty < quantity:
+                return False, current_qty
+            committed = self._commit('usage', {
+                'Date_Time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'Item_ID': self.store.df.at[pos, 'Item_ID'],
+                'Item_Name': self.store.df.at[pos, 'Item_Name'],
+                'Quantity_Used': quantity,
+                'Used_By': used_by,
+                'Department': department,
+                'Remarks': remarks
+            }, expected=(pos, version))
+            if committed:
+                return True, current_qty - quantity
+            self.conflicts += 1
+
+    def record_usage_batch(self, items, quantities, used_by, department, remarks=''):
+        """Record several items used together, all or nothing.
+
+        Every line is checked in one vectorized pass and the whole batch is
+        one journal record, so either every decrement and log row is
+        written or none is. Lines for the same item are added together.
+        Returns (True, DataFrame of Item_Name / Quantity_Used / Remaining)
+        or (False, DataFrame of the lines that failed with a Problem).
+        """
+        items, entered = list(items), list(quantities)
+        quantities = pd.to_numeric(pd.Series(entered, dtype=object), errors='coerce').to_numpy(dtype=float)
+        positions = self.store.positions(items)
+        valid = (positions >= 0) & (quantities >= 1) & (quantities % 1 == 0)
+
+        with self._lock:
+            pos, line_item = np.unique(positions[valid], return_inverse=True)
+            totals = np.bincount(line_item, weights=quantities[valid], minlength=len(pos)).astype(int)
+            available = self.store.df['Quantity'].to_numpy()[pos]
+            short = np.isin(positions, pos[totals > available]) & valid
+
+            if not valid.all() or short.any() or not items:
+                failed = ~valid | short
+                problem = np.where(positions < 0, 'Unknown item',
+                                   np.where(~valid, 'Quantity must be a whole number >= 1', 'Insufficient stock'))
+                on_hand = pd.Series(self.store.df['Quantity'].to_numpy()[np.maximum(positions, 0)]).where(positions >= 0)
+                return False, pd.DataFrame({
+                    'Item': np.array(items, dtype=object)[failed],
+                    'Quantity': np.array(entered, dtype=object)[failed],
+                    'Available': on_hand[failed].astype('Int64').reset_index(drop=True),
+                    'Problem': problem[failed],
+                })
+
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            item_ids = self.store.df['Item_ID'].to_numpy()[pos]
+            names = self.store.df['Item_Name'].to_numpy()[pos]
+            self._commit('usage_batch', {'rows': [{
+                'Date_Time': now,
+                'Item_ID': item_id,
+                'Item_Name': name,
+                'Quantity_Used': int(quantity),
+                'Used_By': used_by,
+                'Department': department,
+                'Remarks': remarks
+            } for item_id, name, quantity in zip(item_ids, names, totals)]})
+        return True, pd.DataFrame({'Item_Name': names, 'Quantity_Used': totals, 'Remaining': available - totals})
+
+    def add_item(self, item):
+        """Returns False, without writing, if the Item_ID or Item_Name is
+        already in use."""
+        return self._commit('add_item', item)
+
+    def upsert_items(self, items):
+        """Insert or overwrite a batch of items in one journal record.
+        Returns (updated, inserted)."""
+        with self._lock:
+            item_ids = items['Item_ID'].drop_duplicates()
+            updated = int(self.store.lookup(item_ids).notna().sum())
+            self._commit('upsert_items', {'items': items.to_dict('list')})
+        return updated, len(item_ids) - updated
+
+    def update_item(self, key, **values):
+        """Set columns of an item. A new Location takes the stock held at
+        the old one along with it; stock out on the wards stays there."""
+        values.setdefault('Last_Updated', datetime.now().strftime('%Y-%m-%d %H:%M'))
+        self._commit('update_item', {'key': key, 'values': values})
+
+    def receive_lot(self, item, lot_no, quantity, expiry):
+        """Add stock to a lot of ``item``. Returns False, without writing,
+        if that lot number is already held with a different expiry."""
+        with self._lock:
+            item_id = self.store.get(item, 'Item_ID')
+            existing = self.lots.item_lots(item_id)
+            clash = existing[(existing['Lot_No'] == lot_no) & (existing['Expiry_Date'] != str(expiry)[:10])]
+            if len(clash):
+                return False
+            self._commit('receive_lot', {
+                'Received_At': datetime.now().strftime('%Y-%m-%d %H:%M'),
+                'Item_ID': item_id,
+                'Lot_No': lot_no,
+                'Quantity': int(quantity),
+                'Expiry_Date': str(expiry)[:10],
+            })
+        return True
+
+    def transfer_stock(self, item, source, target, quantity, moved_by):
+        """Move stock of ``item`` between locations in one journal record.
+        Returns False, without writing, if ``quantity`` is not a whole
+        number above zero or ``source`` holds too little."""
+        if isinstance(quantity, bool) or not isinstance(quantity, (int, np.integer)) or quantity <= 0:
+            return False
+        with self._lock:
+            pos = self.store.position(item)
+            if source == target or self.location_stock.available(pos, source) < quantity:
+                return False
+            self._commit('transfer', {
+                'Date_Time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'Item_ID': self.store.df.at[pos, 'Item_ID'],
+                'From': source,
+                'To': target,
+                'Quantity': int(quantity),
+                'Moved_By': moved_by,
+            })
+        return True
+
+    def set_par_level(self, item, location, par_level):
+        self._commit('set_par', {
+            'Item_ID': self.store.get(item, 'Item_ID'),
+            'Location': location,
+            'Par_Level': int(par_level),
+        })
+
+    def _save_sequence(self, name, last):
+        self._commit('reserve_ids', {'Sequence': name, 'Last': last})
+
+    def create_purchase_order(self, item_name, quantity, supplier, status, requested_by, ids=None):
+        """Returns the new PO's ID, or None if that ID is already taken.
+        ``ids`` is the caller's own IdBlock (see ids.py); without one, a
+        block shared by all such callers is used."""
+        # Drawn before taking the lock: a new block commits its reservation
+        po_id = (ids or self._po_block).next()
+        with self._lock:
+            if po_id in self.po_index:
+                return None
+            self._commit('purchase_order', {
+                'PO_ID': po_id,
+                'Date': datetime.now().strftime('%Y-%m-%d'),
+                'Item_Name': item_name,
+                'Quantity': quantity,
+                'Supplier': supplier,
+                'Status': status,
+                'Requested_By': requested_by
+            })
+        return po_id
@@ -1,441 +1,759 @@
-import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
-import json
-
-# Page configuration
-st.set_page_config(page_title="Hospital Inventory System", page_icon="🏥", layout="wide")
-
-# Initialize session state
-if 'logged_in' not in st.session_state:
-    st.session_state.logged_in = False
-if 'user_role' not in st.session_state:
-    st.session_state.user_role = None
-if 'username' not in st.session_state:
-    st.session_state.username = None
-
-# Initialize inventory data in session state
-if 'inventory' not in st.session_state:
-    st.session_state.inventory = pd.DataFrame({
-        'Item_ID': ['MED001', 'MED002', 'SUP001', 'SUP002', 'SUP003', 'MED003', 'SUP004', 'MED004'],
-        'Item_Name': ['Paracetamol 500mg', 'Injection Ceftriaxone', 'Disposable Syringes', 'Surgical Gloves', 
-                      'Gauze Dressings', 'Injection Adrenaline', 'IV Cannula', 'Morphine 10mg'],
-        'Category': ['Medicine', 'Medicine', 'Supply', 'Supply', 'Supply', 'Emergency Medicine', 'Supply', 'Controlled Medicine'],
-        'Quantity': [500, 120, 1500, 2000, 800, 50, 600, 30],
-        'Min_Stock': [200, 50, 500, 800, 300, 20, 200, 10],
-        'Unit': ['Tablet', 'Vial', 'Piece', 'Pair', 'Packet', 'Vial', 'Piece', 'Vial'],
-        'Expiry_Date': ['2026-05-15', '2025-12-20', '2027-01-10', '2026-08-25', '2026-03-30', '2025-11-30', '2027-02-15', '2026-06-10'],
-        'Location': ['Pharmacy', 'Pharmacy', 'Medical Store', 'Medical Store', 'Medical Store', 'Emergency Ward', 'Medical Store', 'Pharmacy'],
-        'Last_Updated': [datetime.now().strftime('%Y-%m-%d %H:%M')] * 8
-    })
-
-if 'usage_log' not in st.session_state:
-    st.session_state.usage_log = pd.DataFrame(columns=['Date_Time', 'Item_ID', 'Item_Name', 'Quantity_Used', 'Used_By', 'Department', 'Remarks'])
-
-if 'purchase_orders' not in st.session_state:
-    st.session_state.purchase_orders = pd.DataFrame(columns=['PO_ID', 'Date', 'Item_Name', 'Quantity', 'Supplier', 'Status', 'Requested_By'])
-
-# User credentials (in real app, use secure database)
-users = {
-    'nurse1': {'password': 'nurse123', 'role': 'Nurse', 'name': 'Sister Priya'},
-    'doctor1': {'password': 'doc123', 'role': 'Doctor', 'name': 'Dr. Sharma'},
-    'admin1': {'password': 'admin123', 'role': 'Admin', 'name': 'Hospital Admin1'},
-    'nurse2': {'password': 'nurse122', 'role': 'Nurse', 'name': 'Sister P.Kaur'},
-    'doctor2': {'password': 'doc122', 'role': 'Doctor', 'name': 'Dr. S.K.Thakur'},
-    'admin2': {'password': 'admin122', 'role': 'Admin', 'name': 'Hospital Admin2'},
-    'nurse3': {'password': 'nurse121', 'role': 'Nurse', 'name': 'Sister Shefali'},
-    'doctor3': {'password': 'doc121', 'role': 'Doctor', 'name': 'Dr. A.K.Gupta'},
-    'admin3': {'password': 'admin121', 'role': 'Admin', 'name': 'Hospital Admin3'}
-}
-
-def login_page():
-    st.title("🏥 Hospital Inventory Management System")
-    st.markdown("---")
-    
-    col1, col2, col3 = st.columns([1, 2, 1])
-    
-    with col2:
-        st.subheader("🔐 Login")
-        username = st.text_input("Username", placeholder="Enter your username")
-        password = st.text_input("Password", type="password", placeholder="Enter your password")
-        
-        st.info("""
-        **Demo Credentials:**
-        - Nurse: `nurse1` / `nurse123`
-        - Doctor: `doctor1` / `doc123`
-        - Admin: `admin1` / `admin123`
-        """)
-        
-        if st.button("Login", type="primary", use_container_width=True):
-            if username in users and users[username]['password'] == password:
-                st.session_state.logged_in = True
-                st.session_state.user_role = users[username]['role']
-                st.session_state.username = users[username]['name']
-                st.rerun()
-            else:
-                st.error("❎ Invalid username or password")
-
-def logout():
-    st.session_state.logged_in = False
-    st.session_state.user_role = None
-    st.session_state.username = None
-    st.rerun()
-
-def nurse_dashboard():
-    st.title("👩‍⚕️ Nurse Dashboard")
-    st.write(f"Welcome, **{st.session_state.username}**")
-    
-    tab1, tab2, tab3 = st.tabs(["📦 View Inventory", "📝 Record Usage", "⚠️ Low Stock Alerts"])
-    
-    with tab1:
-        st.subheader("Current Inventory")
-        
-        # Search and filter
-        col1, col2 = st.columns([2, 1])
-        with col1:
-            search = st.text_input("🔍 Search items", placeholder="Search by item name...")
-        with col2:
-            category_filter = st.selectbox("Filter by Category", ['All'] + list(st.session_state.inventory['Category'].unique()))
-        
-        # Filter data
-        filtered_df = st.session_state.inventory.copy()
-        if search:
-            filtered_df = filtered_df[filtered_df['Item_Name'].str.contains(search, case=False)]
-        if category_filter != 'All':
-            filtered_df = filtered_df[filtered_df['Category'] == category_filter]
-        
-        # Display inventory with color coding
-        def highlight_low_stock(row):
-            if row['Quantity'] <= row['Min_Stock']:
-                return ['background-color: #ffcccc'] * len(row)
-            elif row['Quantity'] <= row['Min_Stock'] * 1.5:
-                return ['background-color: #fff3cd'] * len(row)
-            return [''] * len(row)
-        
-        st.dataframe(
-            filtered_df.style.apply(highlight_low_stock, axis=1),
-            use_container_width=True,
-            height=400
-        )
-    
-    with tab2:
-        st.subheader("Record Item Usage")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            item_to_use = st.selectbox("Select Item", st.session_state.inventory['Item_Name'].tolist())
-            quantity_used = st.number_input("Quantity Used", min_value=1, value=1)
-            department = st.selectbox("Department", ['General Ward', 'ICU', 'Emergency', 'OT', 'OPD'])
-        
-        with col2:
-            remarks = st.text_area("Remarks (Optional)", placeholder="Enter any notes...")
-        
-        if st.button("Record Usage", type="primary"):
-            item_row = st.session_state.inventory[st.session_state.inventory['Item_Name'] == item_to_use]
-            if not item_row.empty:
-                current_qty = item_row['Quantity'].values[0]
-                if current_qty >= quantity_used:
-                    # Update inventory
-                    st.session_state.inventory.loc[st.session_state.inventory['Item_Name'] == item_to_use, 'Quantity'] -= quantity_used
-                    st.session_state.inventory.loc[st.session_state.inventory['Item_Name'] == item_to_use, 'Last_Updated'] = datetime.now().strftime('%Y-%m-%d %H:%M')
-                    
-                    # Log usage
-                    new_log = pd.DataFrame({
-                        'Date_Time': [datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-                        'Item_ID': [item_row['Item_ID'].values[0]],
-                        'Item_Name': [item_to_use],
-                        'Quantity_Used': [quantity_used],
-                        'Used_By': [st.session_state.username],
-                        'Department': [department],
-                        'Remarks': [remarks]
-                    })
-                    st.session_state.usage_log = pd.concat([st.session_state.usage_log, new_log], ignore_index=True)
-                    
-                    st.success(f"✅ Usage recorded! Remaining quantity: {current_qty - quantity_used}")
-                    st.rerun()
-                else:
-                    st.error(f"❌ Insufficient stock! Available: {current_qty}")
-    
-    with tab3:
-        st.subheader("⚠️ Low Stock Alerts")
-        low_stock = st.session_state.inventory[st.session_state.inventory['Quantity'] <= st.session_state.inventory['Min_Stock']]
-        
-        if not low_stock.empty:
-            st.error(f"🚨 {len(low_stock)} items are at or below minimum stock level!")
-            st.dataframe(low_stock[['Item_Name', 'Quantity', 'Min_Stock', 'Location']], use_container_width=True)
-        else:
-            st.success("✅ All items are adequately stocked!")
-
-def doctor_dashboard():
-    st.title("👨‍⚕️ Doctor Dashboard")
-    st.write(f"Welcome, **{st.session_state.username}**")
-    
-    tab1, tab2, tab3 = st.tabs(["📦 View Inventory", "📝 Record Usage", "📋 Request Orders"])
-    
-    with tab1:
-        st.subheader("Current Inventory - Priority Items")
-        
-        # Focus on emergency and essential items
-        priority_categories = ['Emergency Medicine', 'Controlled Medicine', 'Medicine']
-        priority_items = st.session_state.inventory[st.session_state.inventory['Category'].isin(priority_categories)]
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Emergency Medicines", len(st.session_state.inventory[st.session_state.inventory['Category'] == 'Emergency Medicine']))
-        with col2:
-            st.metric("Controlled Medicines", len(st.session_state.inventory[st.session_state.inventory['Category'] == 'Controlled Medicine']))
-        
-        st.dataframe(priority_items, use_container_width=True, height=350)
-    
-    with tab2:
-        st.subheader("Record Usage")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            item_to_use = st.selectbox("Select Item", st.session_state.inventory['Item_Name'].tolist())
-            quantity_used = st.number_input("Quantity", min_value=1, value=1)
-        
-        with col2:
-            department = st.selectbox("Department", ['ICU', 'Emergency', 'OT', 'General Ward', 'OPD'])
-            remarks = st.text_input("Patient ID / Remarks", placeholder="Enter patient details...")
-        
-        if st.button("Record Usage", type="primary"):
-            item_row = st.session_state.inventory[st.session_state.inventory['Item_Name'] == item_to_use]
-            if not item_row.empty:
-                current_qty = item_row['Quantity'].values[0]
-                if current_qty >= quantity_used:
-                    st.session_state.inventory.loc[st.session_state.inventory['Item_Name'] == item_to_use, 'Quantity'] -= quantity_used
-                    st.session_state.inventory.loc[st.session_state.inventory['Item_Name'] == item_to_use, 'Last_Updated'] = datetime.now().strftime('%Y-%m-%d %H:%M')
-                    
-                    new_log = pd.DataFrame({
-                        'Date_Time': [datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-                        'Item_ID': [item_row['Item_ID'].values[0]],
-                        'Item_Name': [item_to_use],
-                        'Quantity_Used': [quantity_used],
-                        'Used_By': [st.session_state.username],
-                        'Department': [department],
-                        'Remarks': [remarks]
-                    })
-                    st.session_state.usage_log = pd.concat([st.session_state.usage_log, new_log], ignore_index=True)
-                    
-                    st.success(f"✅ Usage recorded! Remaining: {current_qty - quantity_used}")
-                    st.rerun()
-                else:
-                    st.error(f"❌ Insufficient stock! Available: {current_qty}")
-    
-    with tab3:
-        st.subheader("Request Purchase Order")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            item_name = st.text_input("Item Name", placeholder="Enter item name")
-            quantity = st.number_input("Quantity Needed", min_value=1, value=10)
-        
-        with col2:
-            urgency = st.selectbox("Urgency", ['Normal', 'Urgent', 'Emergency'])
-            reason = st.text_area("Reason for Request", placeholder="Why is this needed?")
-        
-        if st.button("Submit Request", type="primary"):
-            po_id = f"PO{len(st.session_state.purchase_orders) + 1001}"
-            new_po = pd.DataFrame({
-                'PO_ID': [po_id],
-                'Date': [datetime.now().strftime('%Y-%m-%d')],
-                'Item_Name': [item_name],
-                'Quantity': [quantity],
-                'Supplier': ['Pending'],
-                'Status': [f'{urgency} - Pending Approval'],
-                'Requested_By': [st.session_state.username]
-            })
-            st.session_state.purchase_orders = pd.concat([st.session_state.purchase_orders, new_po], ignore_index=True)
-            st.success(f"✅ Purchase request {po_id} submitted successfully!")
-
-def admin_dashboard():
-    st.title("🏥 Admin Dashboard - Inventory Management")
-    st.write(f"Welcome, **{st.session_state.username}**")
-    
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "➕ Add Items", "📦 Manage Stock", "🛒 Purchase Orders", "📈 Reports"])
-    
-    with tab1:
-        st.subheader("Inventory Overview")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total Items", len(st.session_state.inventory))
-        with col2:
-            low_stock_count = len(st.session_state.inventory[st.session_state.inventory['Quantity'] <= st.session_state.inventory['Min_Stock']])
-            st.metric("Low Stock Items", low_stock_count, delta=f"-{low_stock_count}", delta_color="inverse")
-        with col3:
-            st.metric("Total Usage Logs", len(st.session_state.usage_log))
-        with col4:
-            st.metric("Pending Orders", len(st.session_state.purchase_orders[st.session_state.purchase_orders['Status'].str.contains('Pending', na=False)]))
-        
-        st.markdown("---")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("⚠️ Critical Low Stock")
-            critical = st.session_state.inventory[st.session_state.inventory['Quantity'] <= st.session_state.inventory['Min_Stock']]
-            if not critical.empty:
-                st.dataframe(critical[['Item_Name', 'Quantity', 'Min_Stock']], use_container_width=True)
-            else:
-                st.success("No critical items!")
-        
-        with col2:
-            st.subheader("🔜 Expiring Soon (30 days)")
-            st.session_state.inventory['Expiry_Date'] = pd.to_datetime(st.session_state.inventory['Expiry_Date'])
-            expiring = st.session_state.inventory[
-                st.session_state.inventory['Expiry_Date'] <= datetime.now() + timedelta(days=30)
-            ]
-            if not expiring.empty:
-                st.dataframe(expiring[['Item_Name', 'Quantity', 'Expiry_Date']], use_container_width=True)
-            else:
-                st.success("No items expiring soon!")
-    
-    with tab2:
-        st.subheader("Add New Item to Inventory")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            new_item_id = st.text_input("Item ID", placeholder="e.g., MED005")
-            new_item_name = st.text_input("Item Name", placeholder="e.g., Injection Insulin")
-            new_category = st.selectbox("Category", ['Medicine', 'Supply', 'Emergency Medicine', 'Controlled Medicine', 'Equipment'])
-            new_quantity = st.number_input("Initial Quantity", min_value=0, value=100)
-        
-        with col2:
-            new_min_stock = st.number_input("Minimum Stock Level", min_value=0, value=20)
-            new_unit = st.text_input("Unit", placeholder="e.g., Vial, Piece, Tablet")
-            new_expiry = st.date_input("Expiry Date")
-            new_location = st.text_input("Storage Location", placeholder="e.g., Pharmacy, Medical Store")
-        
-        if st.button("Add Item", type="primary"):
-            new_item = pd.DataFrame({
-                'Item_ID': [new_item_id],
-                'Item_Name': [new_item_name],
-                'Category': [new_category],
-                'Quantity': [new_quantity],
-                'Min_Stock': [new_min_stock],
-                'Unit': [new_unit],
-                'Expiry_Date': [new_expiry.strftime('%Y-%m-%d')],
-                'Location': [new_location],
-                'Last_Updated': [datetime.now().strftime('%Y-%m-%d %H:%M')]
-            })
-            st.session_state.inventory = pd.concat([st.session_state.inventory, new_item], ignore_index=True)
-            st.success(f"✅ Item '{new_item_name}' added successfully!")
-    
-    with tab3:
-        st.subheader("Manage Current Stock")
-        
-        # Select item to update
-        item_to_update = st.selectbox("Select Item to Update", st.session_state.inventory['Item_Name'].tolist())
-        
-        if item_to_update:
-            item_data = st.session_state.inventory[st.session_state.inventory['Item_Name'] == item_to_update].iloc[0]
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.info(f"Current Quantity: **{item_data['Quantity']}** {item_data['Unit']}")
-                new_qty = st.number_input("Update Quantity", min_value=0, value=int(item_data['Quantity']))
-            
-            with col2:
-                st.info(f"Min Stock: **{item_data['Min_Stock']}**")
-                new_min = st.number_input("Update Min Stock", min_value=0, value=int(item_data['Min_Stock']))
-            
-            with col3:
-                st.info(f"Location: **{item_data['Location']}**")
-                new_loc = st.text_input("Update Location", value=item_data['Location'])
-            
-            if st.button("Update Stock", type="primary"):
-                st.session_state.inventory.loc[st.session_state.inventory['Item_Name'] == item_to_update, 'Quantity'] = new_qty
-                st.session_state.inventory.loc[st.session_state.inventory['Item_Name'] == item_to_update, 'Min_Stock'] = new_min
-                st.session_state.inventory.loc[st.session_state.inventory['Item_Name'] == item_to_update, 'Location'] = new_loc
-                st.session_state.inventory.loc[st.session_state.inventory['Item_Name'] == item_to_update, 'Last_Updated'] = datetime.now().strftime('%Y-%m-%d %H:%M')
-                st.success("✅ Stock updated successfully!")
-                st.rerun()
-    
-    with tab4:
-        st.subheader("Purchase Orders Management")
-        
-        col1, col2 = st.columns([2, 1])
-        with col1:
-            st.write("**Create New Purchase Order**")
-            po_item = st.text_input("Item Name", key="po_item")
-            po_qty = st.number_input("Quantity", min_value=1, value=100, key="po_qty")
-        with col2:
-            po_supplier = st.text_input("Supplier Name", key="po_supplier")
-            if st.button("Create PO", type="primary"):
-                po_id = f"PO{len(st.session_state.purchase_orders) + 1001}"
-                new_po = pd.DataFrame({
-                    'PO_ID': [po_id],
-                    'Date': [datetime.now().strftime('%Y-%m-%d')],
-                    'Item_Name': [po_item],
-                    'Quantity': [po_qty],
-                    'Supplier': [po_supplier],
-                    'Status': ['Approved'],
-                    'Requested_By': [st.session_state.username]
-                })
-                st.session_state.purchase_orders = pd.concat([st.session_state.purchase_orders, new_po], ignore_index=True)
-                st.success(f"✅ Purchase Order {po_id} created!")
-        
-        st.markdown("---")
-        st.write("**All Purchase Orders**")
-        if not st.session_state.purchase_orders.empty:
-            st.dataframe(st.session_state.purchase_orders, use_container_width=True)
-        else:
-            st.info("No purchase orders yet")
-    
-    with tab5:
-        st.subheader("Usage Reports & Analytics")
-        
-        if not st.session_state.usage_log.empty:
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.write("**Usage by Department**")
-                dept_usage = st.session_state.usage_log.groupby('Department')['Quantity_Used'].sum().reset_index()
-                st.dataframe(dept_usage, use_container_width=True)
-            
-            with col2:
-                st.write("**Top 5 Most Used Items**")
-                top_items = st.session_state.usage_log.groupby('Item_Name')['Quantity_Used'].sum().nlargest(5).reset_index()
-                st.dataframe(top_items, use_container_width=True)
-            
-            st.markdown("---")
-            st.write("**Recent Usage Log**")
-            st.dataframe(st.session_state.usage_log.tail(10), use_container_width=True)
-            
-            # Download reports
-            if st.button("📥 Download Full Usage Report"):
-                csv = st.session_state.usage_log.to_csv(index=False)
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name=f"usage_report_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv"
-                )
-        else:
-            st.info("No usage data available yet")
-
-# Main app logic
-if not st.session_state.logged_in:
-    login_page()
-else:
-    # Sidebar
-    with st.sidebar:
-        st.image("https://cdn-icons-png.flaticon.com/512/3063/3063155.png", width=100)
-        st.title("Navigation")
-        st.write(f"**Role:** {st.session_state.user_role}")
-        st.write(f"**User:** {st.session_state.username}")
-        st.markdown("---")
-        
-        if st.button("🚪 Logout", use_container_width=True):
-            logout()
-        
-    
-    # Route to appropriate dashboard
-    if st.session_state.user_role == 'Nurse':
-        nurse_dashboard()
-    elif st.session_state.user_role == 'Doctor':
-        doctor_dashboard()
-    elif st.session_state.user_role == 'Admin':
-
-        admin_dashboard()
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+import functools
+import json
+import os
+from inventory_db import DATA_DIR, InventoryDB
+from auth import CredentialStore, SessionStore
+import api
+from grid import stock_grid
+import bulk_import
+import report_export
+from forecast import DemandForecaster, draft_purchase_orders
+import profiling
+
+# Page configuration
+st.set_page_config(page_title="Hospital Inventory System", page_icon="🏥", layout="wide")
+
+# Initialize session state
+if 'logged_in' not in st.session_state:
+    st.session_state.logged_in = False
+if 'user_role' not in st.session_state:
+    st.session_state.user_role = None
+if 'username' not in st.session_state:
+    st.session_state.username = None
+if 'session_token' not in st.session_state:
+    st.session_state.session_token = None
+
+# Shared inventory database, loaded from disk once per server process
+@st.cache_resource
+def get_db():
+    return InventoryDB(seed=pd.DataFrame({
+        'Item_ID': ['MED001', 'MED002', 'SUP001', 'SUP002', 'SUP003', 'MED003', 'SUP004', 'MED004'],
+        'Item_Name': ['Paracetamol 500mg', 'Injection Ceftriaxone', 'Disposable Syringes', 'Surgical Gloves', 
+                      'Gauze Dressings', 'Injection Adrenaline', 'IV Cannula', 'Morphine 10mg'],
+        'Category': ['Medicine', 'Medicine', 'Supply', 'Supply', 'Supply', 'Emergency Medicine', 'Supply', 'Controlled Medicine'],
+        'Quantity': [500, 120, 1500, 2000, 800, 50, 600, 30],
+        'Min_Stock': [200, 50, 500, 800, 300, 20, 200, 10],
+        'Unit': ['Tablet', 'Vial', 'Piece', 'Pair', 'Packet', 'Vial', 'Piece', 'Vial'],
+        'Expiry_Date': ['2026-05-15', '2025-12-20', '2027-01-10', '2026-08-25', '2026-03-30', '2025-11-30', '2027-02-15', '2026-06-10'],
+        'Location': ['Pharmacy', 'Pharmacy', 'Medical Store', 'Medical Store', 'Medical Store', 'Emergency Ward', 'Medical Store', 'Pharmacy'],
+        'Last_Updated': [datetime.now().strftime('%Y-%m-%d %H:%M')] * 8
+    }))
+
+db = get_db()
+
+# Each session numbers its POs from its own block of IDs
+if 'po_ids' not in st.session_state:
+    st.session_state.po_ids = db.po_ids.block()
+
+DEPARTMENTS = ['General Ward', 'ICU', 'Emergency', 'OT', 'OPD']
+
+# Forecast state is kept across reruns so each refit only adds new days
+@st.cache_resource
+def get_forecaster():
+    return DemandForecaster()
+
+forecaster = get_forecaster()
+
+# Credentials and login sessions, shared by every browser tab
+@st.cache_resource
+def get_auth():
+    return CredentialStore(os.path.join(DATA_DIR, 'users.json')), SessionStore()
+
+credentials, sessions = get_auth()
+
+# The JSON API for scanners and ward systems runs inside this process when
+# INVENTORY_API_PORT is set, so it shares the database and login sessions
+@st.cache_resource
+def get_api():
+    return api.start_in_background(db, credentials, sessions, int(os.environ['INVENTORY_API_PORT']))
+
+if os.environ.get('INVENTORY_API_PORT'):
+    get_api()
+
+# Section timings, with copy and memory counts in profiling mode
+# (DASHBOARD_PROFILE=1, or ?profile=1 for a logged-in Admin)
+@st.cache_resource
+def get_profiler():
+    return profiling.Profiler('inventory')
+
+profiler = get_profiler()
+
+def timed(name):
+    return profiler.section(name, profiling.requested(st.query_params, st.session_state.user_role == 'Admin'))
+
+def timed_fragment(func):
+    """Run a tab as a fragment: its widgets rerun only the tab, not the
+    whole page. Every run's render time is recorded under the tab's name."""
+    @st.fragment
+    @functools.wraps(func)
+    def fragment():
+        with timed(func.__name__) as timing:
+            func()
+        if st.session_state.get('show_render_times'):
+            st.caption(f"⏱️ {func.__name__} rendered in {timing['seconds'] * 1000:.1f} ms")
+    return fragment
+
+def rerun_page(key, message):
+    """Rerun the whole page after a change other tabs show, keeping the
+    confirmation for the tab's next run."""
+    st.session_state[f"{key}_message"] = message
+    st.rerun()
+
+def show_message(key):
+    message = st.session_state.pop(f"{key}_message", None)
+    if message:
+        st.success(message)
+
+# Views computed from the data are cached until the next committed change
+# (db.revision), so a tab reruns without recomputing what hasn't changed
+@st.cache_data(max_entries=16)
+def overview_data(revision):
+    purchase_orders = db.purchase_orders.to_frame()
+    return {
+        'total_items': len(db.store.df),
+        'low_stock_count': len(db.store.alerts.low_stock),
+        'usage_logs': len(db.usage_log),
+        'pending_orders': int(purchase_orders['Status'].str.contains('Pending', na=False).sum()),
+        'critical': db.store.low_stock_items()[['Item_Name', 'Quantity', 'Min_Stock']],
+    }
+
+@st.cache_data(max_entries=16)
+def expiring_soon(revision, today, days=30):
+    end = (datetime.strptime(today, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+    expiring = db.lots.expiring_between(end=end)
+    if not expiring.empty:
+        expiring.insert(0, 'Item_Name', db.store.df['Item_Name'].to_numpy()[db.store.lookup(expiring['Item_ID']).astype(int)])
+    return expiring[['Item_Name', 'Lot_No', 'Quantity', 'Expiry_Date']] if not expiring.empty else expiring
+
+@st.cache_data(max_entries=16)
+def reorder_suggestions(revision, today):
+    forecaster.update(db.usage_rollup, db.store.names())
+    drafts = draft_purchase_orders(forecaster.plan(db.store.df))
+    if not db.purchase_orders.empty:
+        # Skip items that already have a draft waiting
+        po_df = db.purchase_orders.to_frame()
+        drafts = drafts[~drafts['Item_Name'].isin(po_df.loc[po_df['Status'] == 'Draft', 'Item_Name'])]
+    return drafts
+
+@st.cache_data(max_entries=64)
+def usage_report(revision, today, period):
+    period_days = {'All Time': None, 'Today': 0, 'Last 7 Days': 6, 'Last 30 Days': 29}[period]
+    period_start = None if period_days is None else datetime.strptime(today, '%Y-%m-%d') - timedelta(days=period_days)
+    return db.usage_rollup.by_department(start=period_start), db.usage_rollup.top_items(5, start=period_start)
+
+def start_session(user):
+    st.session_state.logged_in = True
+    st.session_state.user_role = user['role']
+    st.session_state.username = user['name']
+    st.session_state.session_token = sessions.issue(user)
+
+def end_session():
+    if st.session_state.session_token:
+        sessions.revoke(st.session_state.session_token)
+    st.session_state.logged_in = False
+    st.session_state.user_role = None
+    st.session_state.username = None
+    st.session_state.session_token = None
+
+# The session token is kept in this tab's session state only, never in the
+# URL, so it can't leak through browser history, server logs or a copied
+# link. Every rerun checks it against the session cache (no password hash),
+# which logs the tab out once the token has expired or been revoked
+if st.session_state.logged_in and not sessions.get(st.session_state.session_token):
+    end_session()
+    st.session_state.session_expired = True
+
+# Older versions put the token in the URL; never honour one from an old link
+if 'session' in st.query_params:
+    del st.query_params['session']
+
+def login_page():
+    st.title("🏥 Hospital Inventory Management System")
+    st.markdown("---")
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col2:
+        st.subheader("🔐 Login")
+        username = st.text_input("Username", placeholder="Enter your username")
+        password = st.text_input("Password", type="password", placeholder="Enter your password")
+        
+        st.info("""
+        **Demo Credentials:**
+        - Nurse: `nurse1` / `nurse123`
+        - Doctor: `doctor1` / `doc123`
+        - Admin: `admin1` / `admin123`
+        """)
+        
+        if st.session_state.pop('session_expired', False):
+            st.warning("⏰ Your session has expired. Please log in again.")
+        
+        if st.button("Login", type="primary", use_container_width=True):
+            user = credentials.authenticate(username, password)
+            if user:
+                start_session(user)
+                st.rerun()
+            else:
+                st.error("❎ Invalid username or password")
+
+def logout():
+    end_session()
+    st.rerun()
+
+def usage_cart(key, departments):
+    """Record every item used in a procedure with one submit.
+
+    The lines are edited inside a form, so nothing reruns until the whole
+    cart is submitted; it is then checked and committed as one batch. The
+    lines are only cleared once the batch is recorded, by moving the
+    editor to a fresh key; a rejected cart stays as entered.
+    """
+    st.markdown("---")
+    st.write("**🛒 Procedure Cart - record several items at once**")
+    result = st.session_state.pop(f"{key}_cart_result", None)
+    if result is not None:
+        st.success(f"✅ Recorded usage of {len(result)} items")
+        st.dataframe(result, use_container_width=True, hide_index=True)
+    cart = st.session_state.setdefault(f"{key}_cart_number", 0)
+    
+    with st.form(f"{key}_cart"):
+        lines = st.data_editor(
+            pd.DataFrame({'Item': pd.Series(dtype=object), 'Quantity': pd.Series(dtype='Int64')}),
+            num_rows="dynamic",
+            column_config={
+                'Item': st.column_config.SelectboxColumn("Item", options=db.store.names(), required=True),
+                'Quantity': st.column_config.NumberColumn("Quantity", min_value=1, step=1, required=True),
+            },
+            hide_index=True,
+            use_container_width=True,
+            key=f"{key}_cart_lines_{cart}",
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            department = st.selectbox("Department", departments, key=f"{key}_cart_department")
+        with col2:
+            remarks = st.text_input("Patient ID / Remarks", key=f"{key}_cart_remarks_{cart}")
+        submitted = st.form_submit_button("Record All Items", type="primary")
+    
+    if submitted:
+        lines = lines.dropna()
+        if lines.empty:
+            st.warning("Add at least one item with a quantity")
+        else:
+            ok, result = db.record_usage_batch(lines['Item'], lines['Quantity'], st.session_state.username, department, remarks)
+            if ok:
+                st.session_state[f"{key}_cart_result"] = result
+                st.session_state.pop(f"{key}_cart_lines_{cart}", None)
+                st.session_state.pop(f"{key}_cart_remarks_{cart}", None)
+                st.session_state[f"{key}_cart_number"] = cart + 1
+                st.rerun()
+            else:
+                st.error("❌ Nothing was recorded. Fix these lines and submit again:")
+                st.dataframe(result, use_container_width=True, hide_index=True)
+
+@timed_fragment
+def nurse_inventory():
+    st.subheader("Current Inventory")
+    
+    # Search and filter
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        search = st.text_input("🔍 Search items", placeholder="Search by item name...")
+    with col2:
+        category_filter = st.selectbox("Filter by Category", ['All'] + list(db.store.df['Category'].unique()))
+    
+    # Filter data
+    with timed("nurse_inventory.filter"):
+        filtered_df = db.store.search_items(search) if search else db.store.df
+        if category_filter != 'All':
+            filtered_df = filtered_df[filtered_df['Category'] == category_filter]
+    
+    # Display inventory with color coding
+    with timed("nurse_inventory.grid"):
+        stock_grid(filtered_df, key="nurse_inventory")
+
+@timed_fragment
+def nurse_usage():
+    st.subheader("Record Item Usage")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        item_to_use = st.selectbox("Select Item", db.store.names())
+        quantity_used = st.number_input("Quantity Used", min_value=1, value=1)
+        department = st.selectbox("Department", DEPARTMENTS)
+    
+    with col2:
+        remarks = st.text_area("Remarks (Optional)", placeholder="Enter any notes...")
+    
+    if st.button("Record Usage", type="primary"):
+        if item_to_use in db.store:
+            ok, remaining = db.record_usage(item_to_use, quantity_used, st.session_state.username, department, remarks)
+            if ok:
+                st.success(f"✅ Usage recorded! Remaining quantity: {remaining}")
+                st.rerun()
+            else:
+                st.error(f"❌ Insufficient stock! Available: {remaining}")
+    
+    usage_cart("nurse", DEPARTMENTS)
+
+@timed_fragment
+def nurse_low_stock():
+    st.subheader("⚠️ Low Stock Alerts")
+    low_stock = db.store.low_stock_items()
+    
+    if not low_stock.empty:
+        st.error(f"🚨 {len(low_stock)} items are at or below minimum stock level!")
+        st.dataframe(low_stock[['Item_Name', 'Quantity', 'Min_Stock', 'Location']], use_container_width=True)
+    else:
+        st.success("✅ All items are adequately stocked!")
+
+def nurse_dashboard():
+    st.title("👩‍⚕️ Nurse Dashboard")
+    st.write(f"Welcome, **{st.session_state.username}**")
+    
+    tab1, tab2, tab3 = st.tabs(["📦 View Inventory", "📝 Record Usage", "⚠️ Low Stock Alerts"])
+    
+    with tab1:
+        nurse_inventory()
+    
+    with tab2:
+        nurse_usage()
+    
+    with tab3:
+        nurse_low_stock()
+
+@timed_fragment
+def doctor_inventory():
+    st.subheader("Current Inventory - Priority Items")
+    
+    # Focus on emergency and essential items
+    priority_categories = ['Emergency Medicine', 'Controlled Medicine', 'Medicine']
+    priority_items = db.store.df[db.store.df['Category'].isin(priority_categories)]
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Emergency Medicines", len(db.store.df[db.store.df['Category'] == 'Emergency Medicine']))
+    with col2:
+        st.metric("Controlled Medicines", len(db.store.df[db.store.df['Category'] == 'Controlled Medicine']))
+    
+    st.dataframe(priority_items, use_container_width=True, height=350)
+
+@timed_fragment
+def doctor_usage():
+    st.subheader("Record Usage")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        item_to_use = st.selectbox("Select Item", db.store.names())
+        quantity_used = st.number_input("Quantity", min_value=1, value=1)
+    
+    with col2:
+        department = st.selectbox("Department", ['ICU', 'Emergency', 'OT', 'General Ward', 'OPD'])
+        remarks = st.text_input("Patient ID / Remarks", placeholder="Enter patient details...")
+    
+    if st.button("Record Usage", type="primary"):
+        if item_to_use in db.store:
+            ok, remaining = db.record_usage(item_to_use, quantity_used, st.session_state.username, department, remarks)
+            if ok:
+                st.success(f"✅ Usage recorded! Remaining: {remaining}")
+                st.rerun()
+            else:
+                st.error(f"❌ Insufficient stock! Available: {remaining}")
+    
+    usage_cart("doctor", ['ICU', 'Emergency', 'OT', 'General Ward', 'OPD'])
+
+@timed_fragment
+def doctor_orders():
+    st.subheader("Request Purchase Order")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        item_name = st.text_input("Item Name", placeholder="Enter item name")
+        quantity = st.number_input("Quantity Needed", min_value=1, value=10)
+    
+    with col2:
+        urgency = st.selectbox("Urgency", ['Normal', 'Urgent', 'Emergency'])
+        reason = st.text_area("Reason for Request", placeholder="Why is this needed?")
+    
+    if st.button("Submit Request", type="primary"):
+        po_id = db.create_purchase_order(item_name, quantity, 'Pending', f'{urgency} - Pending Approval', st.session_state.username,
+                                         ids=st.session_state.po_ids)
+        if po_id:
+            st.success(f"✅ Purchase request {po_id} submitted successfully!")
+        else:
+            st.error("❌ Could not number the request, please submit it again")
+
+def doctor_dashboard():
+    st.title("👨‍⚕️ Doctor Dashboard")
+    st.write(f"Welcome, **{st.session_state.username}**")
+    
+    tab1, tab2, tab3 = st.tabs(["📦 View Inventory", "📝 Record Usage", "📋 Request Orders"])
+    
+    with tab1:
+        doctor_inventory()
+    
+    with tab2:
+        doctor_usage()
+    
+    with tab3:
+        doctor_orders()
+
+@timed_fragment
+def admin_overview():
+    st.subheader("Inventory Overview")
+    with timed("admin_overview.data"):
+        overview = overview_data(db.revision)
+        expiring = expiring_soon(db.revision, datetime.now().strftime('%Y-%m-%d'))
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Items", overview['total_items'])
+    with col2:
+        low_stock_count = overview['low_stock_count']
+        st.metric("Low Stock Items", low_stock_count, delta=f"-{low_stock_count}", delta_color="inverse")
+    with col3:
+        st.metric("Total Usage Logs", overview['usage_logs'])
+    with col4:
+        st.metric("Pending Orders", overview['pending_orders'])
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("⚠️ Critical Low Stock")
+        critical = overview['critical']
+        if not critical.empty:
+            st.dataframe(critical, use_container_width=True)
+        else:
+            st.success("No critical items!")
+    
+    with col2:
+        st.subheader("🔜 Expiring Soon (30 days)")
+        if not expiring.empty:
+            st.dataframe(expiring, use_container_width=True)
+        else:
+            st.success("No items expiring soon!")
+
+@timed_fragment
+def admin_add_items():
+    st.subheader("Add New Item to Inventory")
+    show_message("add_item")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        new_item_id = st.text_input("Item ID", placeholder="e.g., MED005")
+        new_item_name = st.text_input("Item Name", placeholder="e.g., Injection Insulin")
+        new_category = st.selectbox("Category", ['Medicine', 'Supply', 'Emergency Medicine', 'Controlled Medicine', 'Equipment'])
+        new_quantity = st.number_input("Initial Quantity", min_value=0, value=100)
+    
+    with col2:
+        new_min_stock = st.number_input("Minimum Stock Level", min_value=0, value=20)
+        new_unit = st.text_input("Unit", placeholder="e.g., Vial, Piece, Tablet")
+        new_expiry = st.date_input("Expiry Date")
+        new_location = st.text_input("Storage Location", placeholder="e.g., Pharmacy, Medical Store")
+    
+    if st.button("Add Item", type="primary"):
+        added = db.add_item({
+            'Item_ID': new_item_id,
+            'Item_Name': new_item_name,
+            'Category': new_category,
+            'Quantity': new_quantity,
+            'Min_Stock': new_min_stock,
+            'Unit': new_unit,
+            'Expiry_Date': new_expiry.strftime('%Y-%m-%d'),
+            'Location': new_location,
+            'Last_Updated': datetime.now().strftime('%Y-%m-%d %H:%M')
+        })
+        if added:
+            rerun_page("add_item", f"✅ Item '{new_item_name}' added successfully!")
+        st.error(f"❌ An item with ID '{new_item_id}' or name '{new_item_name}' already exists")
+    
+    st.markdown("---")
+    st.subheader("Bulk Import")
+    st.caption(f"CSV or Parquet with columns: {', '.join(bulk_import.COLUMNS)}. Existing Item IDs are updated.")
+    catalog_file = st.file_uploader("Catalog file", type=['csv', 'parquet'])
+    
+    if catalog_file is not None and st.button("Import Items", type="primary"):
+        report = bulk_import.import_items(db, catalog_file, catalog_file.name)
+        message = f"✅ Imported {report.inserted} new and {report.updated} updated items"
+        if not report.rejected_count:
+            rerun_page("add_item", message)
+        # Keep the rejected rows on screen; other tabs catch up on the next full run
+        st.success(message)
+        if report.rejected_count:
+            st.error(f"❌ {report.rejected_count} rows rejected")
+            rejected = report.rejected_frame()
+            if report.rejected_count > len(rejected):
+                st.caption(f"Showing the first {len(rejected)} rejected rows")
+            st.dataframe(rejected, use_container_width=True)
+
+@timed_fragment
+def admin_manage_stock():
+    st.subheader("Manage Current Stock")
+    
+    # Select item to update
+    item_to_update = st.selectbox("Select Item to Update", db.store.names())
+    
+    if item_to_update:
+        item_data = db.store.get_row(item_to_update)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.info(f"Current Quantity: **{item_data['Quantity']}** {item_data['Unit']}")
+            new_qty = st.number_input("Update Quantity", min_value=0, value=int(item_data['Quantity']))
+        
+        with col2:
+            st.info(f"Min Stock: **{item_data['Min_Stock']}**")
+            new_min = st.number_input("Update Min Stock", min_value=0, value=int(item_data['Min_Stock']))
+        
+        with col3:
+            st.info(f"Location: **{item_data['Location']}**")
+            new_loc = st.text_input("Update Location", value=item_data['Location'])
+            st.caption("Stock held at the current location moves with it; use Transfer for stock elsewhere.")
+        
+        if st.button("Update Stock", type="primary"):
+            db.update_item(item_to_update, Quantity=new_qty, Min_Stock=new_min, Location=new_loc)
+            st.success("✅ Stock updated successfully!")
+            st.rerun()
+        
+        st.markdown("---")
+        st.write("**Lots (used first-expiry-first-out)**")
+        item_lots = db.lots.item_lots(item_data['Item_ID'])
+        if not item_lots.empty:
+            st.dataframe(item_lots[['Lot_No', 'Quantity', 'Expiry_Date']], use_container_width=True)
+        else:
+            st.info("No stock on hand")
+        
+        st.write("**Stock by Location**")
+        st.dataframe(db.location_stock.item_levels(db.store.position(item_to_update)), use_container_width=True)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            lot_no = st.text_input("Lot / Batch Number", key="lot_no")
+        with col2:
+            lot_qty = st.number_input("Quantity Received", min_value=1, value=100, key="lot_qty")
+        with col3:
+            lot_expiry = st.date_input("Lot Expiry Date", key="lot_expiry")
+        
+        if st.button("Receive Lot"):
+            if not lot_no.strip():
+                st.error("❌ Enter a lot number")
+            elif db.receive_lot(item_to_update, lot_no.strip(), lot_qty, lot_expiry.strftime('%Y-%m-%d')):
+                st.success(f"✅ Received {lot_qty} {item_data['Unit']} into lot {lot_no.strip()}")
+                st.rerun()
+            else:
+                st.error("❌ This lot is already held with a different expiry date")
+
+@timed_fragment
+def admin_purchase_orders():
+    st.subheader("Purchase Orders Management")
+    show_message("po")
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.write("**Create New Purchase Order**")
+        po_item = st.text_input("Item Name", key="po_item")
+        po_qty = st.number_input("Quantity", min_value=1, value=100, key="po_qty")
+    with col2:
+        po_supplier = st.text_input("Supplier Name", key="po_supplier")
+        if st.button("Create PO", type="primary"):
+            po_id = db.create_purchase_order(po_item, po_qty, po_supplier, 'Approved', st.session_state.username,
+                                             ids=st.session_state.po_ids)
+            if po_id:
+                rerun_page("po", f"✅ Purchase Order {po_id} created!")
+            else:
+                st.error("❌ Could not number the order, please create it again")
+    
+    st.markdown("---")
+    st.write("**Forecast-Based Reorder Suggestions**")
+    with timed("admin_purchase_orders.forecast"):
+        drafts = reorder_suggestions(db.revision, datetime.now().strftime('%Y-%m-%d'))
+    st.caption(f"Daily demand forecast from usage up to {forecaster.last_day or 'today'}, "
+               f"{forecaster.lead_time_days}-day lead time, {forecaster.cover_days} days of cover")
+    if not drafts.empty:
+        st.dataframe(drafts, use_container_width=True)
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Create Draft POs"):
+                for item_name, qty in zip(drafts['Item_Name'], drafts['Suggested_Order']):
+                    db.create_purchase_order(item_name, int(qty), 'To be assigned', 'Draft', st.session_state.username,
+                                             ids=st.session_state.po_ids)
+                rerun_page("po", f"✅ Created {len(drafts)} draft purchase orders")
+        with col2:
+            if st.button("Set Min Stock to Reorder Point"):
+                for item_id, reorder_point in zip(drafts['Item_ID'], drafts['Reorder_Point']):
+                    db.update_item(item_id, Min_Stock=int(reorder_point))
+                rerun_page("po", "✅ Min stock levels updated")
+    else:
+        st.info("No items are at their forecast reorder point")
+    
+    st.markdown("---")
+    st.write("**All Purchase Orders**")
+    if not db.purchase_orders.empty:
+        st.dataframe(db.purchase_orders.to_frame(), use_container_width=True)
+    else:
+        st.info("No purchase orders yet")
+
+@timed_fragment
+def admin_reports():
+    st.subheader("Usage Reports & Analytics")
+    
+    if not db.usage_log.empty:
+        period = st.selectbox("Period", ['All Time', 'Today', 'Last 7 Days', 'Last 30 Days'], key="report_period")
+        with timed("admin_reports.groupbys"):
+            dept_usage, top_items = usage_report(db.revision, datetime.now().strftime('%Y-%m-%d'), period)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.write("**Usage by Department**")
+            st.dataframe(dept_usage, use_container_width=True)
+        
+        with col2:
+            st.write("**Top 5 Most Used Items**")
+            st.dataframe(top_items, use_container_width=True)
+        
+        st.markdown("---")
+        st.write("**Recent Usage Log**")
+        st.dataframe(db.usage_log.tail(10), use_container_width=True)
+        
+        # Download reports
+        st.markdown("---")
+        st.write("**Export Usage Report**")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            date_range = st.date_input("Date Range", value=(), key="export_dates")
+        with col2:
+            export_departments = st.multiselect("Departments", DEPARTMENTS, key="export_departments")
+        with col3:
+            export_format = st.selectbox("Format", list(report_export.FORMATS), key="export_format")
+        
+        if st.button("📥 Download Full Usage Report"):
+            # While a range is being picked the widget holds only its start date
+            start = date_range[0] if date_range else None
+            end = date_range[-1] if date_range else None
+            path, rows = report_export.export_usage(db.usage_log, export_format, start, end, export_departments)
+            suffix, mime = report_export.FORMATS[export_format]
+            with open(path, 'rb') as f:
+                st.download_button(
+                    label=f"Download {export_format} ({rows} rows)",
+                    data=f,
+                    file_name=f"usage_report_{datetime.now().strftime('%Y%m%d')}{suffix}",
+                    mime=mime
+                )
+            os.remove(path)
+    else:
+        st.info("No usage data available yet")
+
+@timed_fragment
+def admin_ward_stock():
+    st.subheader("Stock by Location")
+    locations = db.location_stock.locations
+    all_locations = list(dict.fromkeys(locations + DEPARTMENTS))
+    ward = st.selectbox("Location", all_locations, key="ward")
+    names = db.store.df['Item_Name'].to_numpy()
+    
+    positions, ward_qty, ward_par = db.location_stock.location_levels(ward)
+    if len(positions):
+        st.dataframe(pd.DataFrame({'Item_Name': names[positions], 'Quantity': ward_qty, 'Par_Level': ward_par}),
+                     use_container_width=True)
+    else:
+        st.info(f"No stock held at {ward}")
+    
+    st.write(f"**⚠️ Below Par at {ward}**")
+    low_pos, shortfall = db.location_stock.low_stock(ward)
+    if len(low_pos):
+        best, surplus, able = db.location_stock.cover_shortfall(ward, low_pos, shortfall)
+        st.dataframe(pd.DataFrame({
+            'Item_Name': names[low_pos],
+            'Shortfall': shortfall,
+            'Best Source': [locations[row] if n > 0 else '-' for row, n in zip(best, surplus)],
+            'Available There': surplus,
+            'Locations Able to Cover': able,
+        }), use_container_width=True)
+    else:
+        st.success("Nothing below par here")
+    
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Transfer Stock**")
+        transfer_item = st.selectbox("Item", db.store.names(), key="transfer_item")
+        source = st.selectbox("From", all_locations, key="transfer_from")
+        target = st.selectbox("To", all_locations, index=all_locations.index(ward), key="transfer_to")
+        transfer_qty = st.number_input("Quantity", min_value=1, value=10, key="transfer_qty")
+        if st.button("Transfer", type="primary"):
+            if db.transfer_stock(transfer_item, source, target, transfer_qty, st.session_state.username):
+                st.success(f"✅ Moved {transfer_qty} {transfer_item} from {source} to {target}")
+                st.rerun()
+            else:
+                st.error(f"❌ {source} holds only {db.location_stock.available(db.store.position(transfer_item), source)} of {transfer_item}")
+    with col2:
+        st.write(f"**Set Par Level at {ward}**")
+        par_item = st.selectbox("Item", db.store.names(), key="par_item")
+        par_level = st.number_input("Par Level", min_value=0, value=20, key="par_level")
+        if st.button("Set Par Level"):
+            db.set_par_level(par_item, ward, par_level)
+            st.success(f"✅ Par level for {par_item} at {ward} set to {par_level}")
+            st.rerun()
+
+def admin_dashboard():
+    st.title("🏥 Admin Dashboard - Inventory Management")
+    st.write(f"Welcome, **{st.session_state.username}**")
+    
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 Overview", "➕ Add Items", "📦 Manage Stock", "🛒 Purchase Orders", "📈 Reports", "🏥 Ward Stock"])
+    
+    with tab1:
+        admin_overview()
+    
+    with tab2:
+        admin_add_items()
+    
+    with tab3:
+        admin_manage_stock()
+    
+    with tab4:
+        admin_purchase_orders()
+    
+    with tab5:
+        admin_reports()
+    
+    with tab6:
+        admin_ward_stock()
+
+# Main app logic
+if not st.session_state.logged_in:
+    login_page()
+else:
+    # Sidebar
+    with st.sidebar:
+        st.image("https://cdn-icons-png.flaticon.com/512/3063/3063155.png", width=100)
+        st.title("Navigation")
+        st.write(f"**Role:** {st.session_state.user_role}")
+        st.write(f"**User:** {st.session_state.username}")
+        st.markdown("---")
+        
+        if st.button("🚪 Logout", use_container_width=True):
+            logout()
+
+        if st.session_state.user_role == 'Admin':
+            st.markdown("---")
+            st.toggle("Show render times", value=profiling.requested(st.query_params, allowed=True), key="show_render_times")
+
+    # Route to appropriate dashboard
+    if st.session_state.user_role == 'Nurse':
+        nurse_dashboard()
+    elif st.session_state.user_role == 'Doctor':
+        doctor_dashboard()
+    elif st.session_state.user_role == 'Admin':
+
+        admin_dashboard()
+    
+    if st.session_state.user_role == 'Admin' and st.session_state.get('show_render_times'):
+        # Drawn after the tabs so it includes this run; each tab's own caption
+        # also updates when only that tab reruns
+        with st.sidebar:
+            profiling.show_panel(profiler)
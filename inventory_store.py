@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from alert_index import AlertIndex
+from search_index import SearchIndex
+
+
+class InventoryStore:
+    """Inventory table with hash indexes on Item_ID and Item_Name.
+
+    Rows live in a DataFrame with a plain 0..n-1 index so that a lookup in
+    either dict gives the row label directly and reads/writes go through
+    ``DataFrame.at`` instead of a boolean mask over the whole column.
+
+    Each row also carries a version number that is bumped on every write,
+    so callers can read a row, validate it without holding a lock and then
+    only commit if the version is still the one they read.
+
+    ``alerts`` tracks low-stock rows and is refreshed on every write, so
+    the low-stock view never has to scan the table, and ``search``
+    indexes item names for the inventory search box.
+    """
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self._versions = [0] * len(self.df)
+        self._rebuild_index()
+        self.alerts = AlertIndex()
+        if len(self.df):
+            for pos, (qty, min_stock) in enumerate(zip(self.df['Quantity'], self.df['Min_Stock'])):
+                self.alerts.refresh(pos, qty, min_stock)
+        self.search = SearchIndex()
+        for pos, name in enumerate(self.df['Item_Name']):
+            self.search.add(pos, name)
+
+    def _rebuild_index(self):
+        self._by_id = {item_id: pos for pos, item_id in enumerate(self.df['Item_ID'])}
+        self._by_name = {name: pos for pos, name in enumerate(self.df['Item_Name'])}
+
+    def __len__(self):
+        return len(self.df)
+
+    def __contains__(self, key):
+        return key in self._by_id or key in self._by_name
+
+    def position(self, key):
+        # Item IDs win over names so "MED001" never resolves to an item named "MED001"
+        if key in self._by_id:
+            return self._by_id[key]
+        return self._by_name[key]
+
+    def get(self, key, column):
+        return self.df.at[self.position(key), column]
+
+    def read(self, key):
+        """Returns (position, quantity, version) for an optimistic update."""
+        pos = self.position(key)
+        # Version first: writers bump it after the quantity, so a write
+        # landing in between makes the version stale, never the quantity
+        version = self._versions[pos]
+        return pos, self.df.at[pos, 'Quantity'], version
+
+    def version(self, pos):
+        return self._versions[pos]
+
+    def get_row(self, key):
+        return self.df.iloc[self.position(key)]
+
+    def names(self):
+        return list(self._by_name)
+
+    def positions(self, keys):
+        """Row positions for a list of IDs or names (IDs win), -1 where unknown."""
+        by_id, by_name = self._by_id, self._by_name
+        return np.array([by_id.get(key, by_name.get(key, -1)) for key in keys], dtype=int)
+
+    def lookup(self, keys, by='Item_ID'):
+        """Row positions for a Series of IDs or names, NaN where unknown."""
+        return keys.map(self._by_id if by == 'Item_ID' else self._by_name)
+
+    def _refresh_alerts(self, pos):
+        self.alerts.refresh(pos, self.df.at[pos, 'Quantity'], self.df.at[pos, 'Min_Stock'])
+
+    def low_stock_items(self):
+        return self.df.iloc[sorted(self.alerts.low_stock)]
+
+    def search_items(self, query):
+        return self.df.iloc[self.search.search(query)]
+
+    def update(self, key, **values):
+        pos = self.position(key)
+        values.setdefault('Last_Updated', datetime.now().strftime('%Y-%m-%d %H:%M'))
+        for column, value in values.items():
+            self.df.at[pos, column] = value
+        self._versions[pos] += 1
+        self._refresh_alerts(pos)
+        if 'Item_Name' in values:
+            self._by_name = {name: p for name, p in self._by_name.items() if p != pos}
+            self._by_name[values['Item_Name']] = pos
+            self.search.add(pos, values['Item_Name'])
+
+    def consume(self, key, quantity, updated_at=None):
+        """Decrement stock if enough is available. Returns (ok, quantity_after)."""
+        pos = self.position(key)
+        current_qty = self.df.at[pos, 'Quantity']
+        if current_qty < quantity:
+            return False, current_qty
+        self.df.at[pos, 'Quantity'] = current_qty - quantity
+        self.df.at[pos, 'Last_Updated'] = updated_at or datetime.now().strftime('%Y-%m-%d %H:%M')
+        self._versions[pos] += 1
+        self._refresh_alerts(pos)
+        return True, current_qty - quantity
+
+    def add_item(self, item):
+        """Append a new item. Returns False, changing nothing, if its ID
+        or name is already taken."""
+        if item['Item_ID'] in self._by_id or item['Item_Name'] in self._by_name:
+            return False
+        pos = len(self.df)
+        self.df = pd.concat([self.df, pd.DataFrame([item])], ignore_index=True)
+        self._versions.append(0)
+        self._by_id[item['Item_ID']] = pos
+        self._by_name[item['Item_Name']] = pos
+        self._refresh_alerts(pos)
+        self.search.add(pos, item['Item_Name'])
+        return True
+
+    def upsert_items(self, items):
+        """Insert or overwrite many items at once, matched on Item_ID.
+
+        Existing rows are overwritten column by column with one vectorized
+        assignment, and new rows are appended with a single concat.
+        """
+        items = items.drop_duplicates('Item_ID', keep='last').reset_index(drop=True)
+        positions = self.lookup(items['Item_ID'])
+        existing = positions.notna().to_numpy()
+
+        updates = items[existing]
+        update_pos = positions[existing].astype(int).to_numpy()
+        if len(updates):
+            old_names = self.df['Item_Name'].to_numpy()[update_pos]
+            for column in items.columns:
+                self.df.loc[update_pos, column] = updates[column].to_numpy()
+            for pos, old_name, new_name in zip(update_pos, old_names, updates['Item_Name']):
+                if old_name != new_name and self._by_name.get(old_name) == pos:
+                    del self._by_name[old_name]
+
+        inserts = items[~existing]
+        start = len(self.df)
+        if len(inserts):
+            self.df = pd.concat([self.df, inserts], ignore_index=True)
+            self._versions.extend([0] * len(inserts))
+
+        changed = pd.concat([updates, inserts])
+        changed_pos = update_pos.tolist() + list(range(start, start + len(inserts)))
+        for pos, item_id, name, qty, min_stock in zip(
+                changed_pos, changed['Item_ID'], changed['Item_Name'],
+                changed['Quantity'], changed['Min_Stock']):
+            self._versions[pos] += 1
+            self._by_id[item_id] = pos
+            self._by_name[name] = pos
+            self.alerts.refresh(pos, qty, min_stock)
+            self.search.add(pos, name)
+        return len(updates), len(inserts)
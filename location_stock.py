@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+
+class LocationStock:
+    """Stock and par levels per (location, item) in dense numpy matrices.
+
+    Rows are locations (wards, stores, the pharmacy), columns are item
+    positions in the inventory table. An item's Quantity is the sum of its
+    column. Both dimensions grow by doubling, so adding an item or a ward
+    doesn't copy the matrices every time.
+
+    A par level of 0 means the location keeps no minimum for that item.
+    """
+
+    def __init__(self):
+        self.locations = []
+        self._index = {}
+        self._items = 0
+        self._stock = np.zeros((4, 64), dtype=np.int64)
+        self._par = np.zeros((4, 64), dtype=np.int64)
+
+    @property
+    def stock(self):
+        return self._stock[:len(self.locations), :self._items]
+
+    @property
+    def par(self):
+        return self._par[:len(self.locations), :self._items]
+
+    def _grow(self, rows, cols):
+        cap_rows, cap_cols = self._stock.shape
+        if rows <= cap_rows and cols <= cap_cols:
+            return
+        shape = (max(cap_rows, 1), max(cap_cols, 1))
+        while shape[0] < rows:
+            shape = (shape[0] * 2, shape[1])
+        while shape[1] < cols:
+            shape = (shape[0], shape[1] * 2)
+        for attr in ('_stock', '_par'):
+            grown = np.zeros(shape, dtype=np.int64)
+            old = getattr(self, attr)
+            grown[:old.shape[0], :old.shape[1]] = old
+            setattr(self, attr, grown)
+
+    def ensure_items(self, count):
+        if count > self._items:
+            self._grow(len(self.locations), count)
+            self._items = count
+
+    def location(self, name):
+        """Row for ``name``, adding the location if it is new."""
+        row = self._index.get(name)
+        if row is None:
+            row = len(self.locations)
+            self._grow(row + 1, self._items)
+            self.locations.append(name)
+            self._index[name] = row
+        return row
+
+    def add(self, pos, location, quantity):
+        self.ensure_items(pos + 1)
+        row = self.location(location)
+        self._stock[row, pos] += int(quantity)
+
+    def draw(self, pos, quantity, first=()):
+        """Take ``quantity`` of an item, from the ``first`` locations in that
+        order and then from whichever locations hold the most.
+        Returns {location: taken}."""
+        self.ensure_items(pos + 1)
+        quantity = int(quantity)
+        taken = {}
+        for name in dict.fromkeys(first):
+            row = self._index.get(name)
+            if row is None or quantity == 0:
+                continue
+            used = min(quantity, int(self._stock[row, pos]))
+            if used:
+                self._stock[row, pos] -= used
+                taken[name] = used
+                quantity -= used
+        if quantity:
+            # Rarely reached: the rest comes from the best-stocked locations
+            column = self.stock[:, pos]
+            order = np.argsort(-column, kind='stable')
+            held = column[order]
+            before = np.cumsum(held) - held
+            take = np.minimum(held, np.maximum(quantity - before, 0))
+            self._stock[order, pos] -= take
+            for row, used in zip(order, take):
+                if used:
+                    name = self.locations[row]
+                    taken[name] = taken.get(name, 0) + int(used)
+        return taken
+
+    def set_total(self, pos, total, home):
+        """Make the item's total ``total``; extra stock goes to ``home`` and
+        a reduction is drawn from ``home`` first."""
+        self.ensure_items(pos + 1)
+        change = int(total) - int(self.stock[:, pos].sum())
+        if change > 0:
+            self.add(pos, home, change)
+        elif change < 0:
+            self.draw(pos, -change, first=(home,))
+
+    def available(self, pos, location):
+        row = self._index.get(location)
+        return 0 if row is None or pos >= self._items else int(self._stock[row, pos])
+
+    def transfer(self, pos, source, target, quantity):
+        """Move stock between locations. Returns False if ``source`` holds too little."""
+        if self.available(pos, source) < quantity:
+            return False
+        row = self.location(target)
+        self._stock[self._index[source], pos] -= int(quantity)
+        self._stock[row, pos] += int(quantity)
+        return True
+
+    def set_par(self, pos, location, quantity):
+        self.ensure_items(pos + 1)
+        row = self.location(location)
+        self._par[row, pos] = int(quantity)
+
+    def item_levels(self, pos):
+        """Stock and par of one item at every location holding or stocking it."""
+        self.ensure_items(pos + 1)
+        stock, par = self.stock[:, pos], self.par[:, pos]
+        rows = np.flatnonzero((stock > 0) | (par > 0))
+        return pd.DataFrame({
+            'Location': [self.locations[row] for row in rows],
+            'Quantity': stock[rows],
+            'Par_Level': par[rows],
+        })
+
+    def location_levels(self, location):
+        """(positions, stock, par) of items held or stocked at ``location``."""
+        row = self._index.get(location)
+        if row is None:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        stock, par = self.stock[row], self.par[row]
+        positions = np.flatnonzero((stock > 0) | (par > 0))
+        return positions, stock[positions], par[positions]
+
+    def low_stock(self, location):
+        """(positions, shortfall) of items at or below their par level at ``location``."""
+        positions, stock, par = self.location_levels(location)
+        low = (par > 0) & (stock <= par)
+        return positions[low], (par - stock)[low]
+
+    def cover_shortfall(self, location, positions, needed):
+        """For each item in ``positions``, the location with the most stock
+        above its own par level, excluding ``location`` itself.
+
+        Returns (best location rows, their surplus, number of locations that
+        could cover the whole need on their own), computed for all items at
+        once over the location x item slice.
+        """
+        positions = np.asarray(positions, dtype=int)
+        self.ensure_items(positions.max() + 1 if len(positions) else 0)
+        surplus = self.stock[:, positions] - self.par[:, positions]
+        if location in self._index:
+            surplus[self._index[location]] = -1
+        if not len(surplus):
+            none = np.zeros(len(positions), dtype=int)
+            return none, none, none
+        best = surplus.argmax(axis=0)
+        best_surplus = surplus[best, np.arange(len(positions))]
+        able = (surplus >= np.asarray(needed)).sum(axis=0)
+        return best, np.maximum(best_surplus, 0), able
+
+    def to_dict(self, item_ids):
+        """Non-zero cells as [location, item id, stock, par] rows."""
+        stock, par = self.stock, self.par
+        rows, cols = np.nonzero((stock != 0) | (par != 0))
+        return {'rows': [[self.locations[r], item_ids[c], int(stock[r, c]), int(par[r, c])]
+                         for r, c in zip(rows, cols)]}
+
+    @classmethod
+    def from_dict(cls, data, store):
+        book = cls()
+        book.ensure_items(len(store))
+        for location, item_id, stock, par in data['rows']:
+            pos = store.position(item_id)
+            row = book.location(location)
+            book._stock[row, pos] = stock
+            book._par[row, pos] = par
+        return book
+
+    @classmethod
+    def from_inventory(cls, df):
+        """All of each item's stock at its Location."""
+        book = cls()
+        book.ensure_items(len(df))
+        if len(df):
+            codes, names = pd.factorize(df['Location'].astype(str))
+            for name in names:
+                book.location(name)
+            book._stock[codes, np.arange(len(df))] = df['Quantity'].to_numpy(dtype=np.int64)
+        return book
@@ -0,0 +1,138 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+import pandas as pd
+
+LOT_COLUMNS = ['Item_ID', 'Lot_No', 'Expiry_Date', 'Quantity']
+
+# Lot number given to stock that was entered without lot details
+OPENING_LOT = 'OPENING'
+
+
+class LotBook:
+    """Stock per (item, lot) with first-expiry-first-out consumption.
+
+    Each item has a min-heap of its lots keyed on expiry, so consuming
+    stock takes from the root and only touches the lots it empties
+    (O(log lots) each). All lots are also kept in one list sorted by
+    (expiry, item, lot), so expiry reports are a pair of binary searches
+    and a slice. Emptied lots are left in that list and skipped when read;
+    it is compacted once they outnumber the live ones. Expiry dates are ISO
+    strings, which sort like the dates.
+
+    Item quantities in the inventory table are the sum of that item's lots.
+    """
+
+    def __init__(self):
+        self._lots = {}
+        self._heaps = defaultdict(list)
+        self._by_expiry = []
+
+    def __len__(self):
+        return len(self._lots)
+
+    def receive(self, item_id, lot_no, quantity, expiry):
+        """Add stock to a lot, creating it if needed. Returns False if the
+        lot already exists with a different expiry."""
+        key = (item_id, lot_no)
+        expiry = str(expiry)[:10]
+        lot = self._lots.get(key)
+        if lot is not None:
+            if lot[0] != expiry:
+                return False
+            lot[1] += int(quantity)
+            return True
+        self._lots[key] = [expiry, int(quantity)]
+        heapq.heappush(self._heaps[item_id], (expiry, lot_no))
+        entry = (expiry, item_id, lot_no)
+        i = bisect_left(self._by_expiry, entry)
+        if i == len(self._by_expiry) or self._by_expiry[i] != entry:
+            # A lot emptied earlier and received again may still be listed
+            self._by_expiry.insert(i, entry)
+        return True
+
+    def _drop(self, item_id, lot_no):
+        del self._lots[(item_id, lot_no)]
+        if len(self._by_expiry) > 2 * len(self._lots) + 64:
+            self._by_expiry = sorted((expiry, item_id, lot_no) for (item_id, lot_no), (expiry, _) in self._lots.items())
+
+    def consume(self, item_id, quantity):
+        """Take ``quantity`` from the item's earliest-expiring lots.
+        Returns [(lot_no, expiry, taken), ...]."""
+        heap = self._heaps.get(item_id, [])
+        taken = []
+        quantity = int(quantity)
+        while quantity > 0 and heap:
+            expiry, lot_no = heap[0]
+            lot = self._lots[(item_id, lot_no)]
+            used = min(quantity, lot[1])
+            lot[1] -= used
+            quantity -= used
+            taken.append((lot_no, expiry, used))
+            if lot[1] == 0:
+                heapq.heappop(heap)
+                self._drop(item_id, lot_no)
+        return taken
+
+    def total(self, item_id):
+        return sum(self._lots[(item_id, lot_no)][1] for _, lot_no in self._heaps.get(item_id, ()))
+
+    def earliest_expiry(self, item_id):
+        heap = self._heaps.get(item_id)
+        return heap[0][0] if heap else None
+
+    def adjust_to(self, item_id, quantity, expiry):
+        """Bring the item's total to ``quantity``: a shortfall is written off
+        first-expiry-first, extra stock goes into a lot expiring on ``expiry``."""
+        change = int(quantity) - self.total(item_id)
+        if change < 0:
+            self.consume(item_id, -change)
+        elif change > 0:
+            expiry = str(expiry)[:10]
+            self.receive(item_id, f'ADJ-{expiry}', change, expiry)
+
+    def item_lots(self, item_id):
+        rows = sorted((expiry, lot_no) for expiry, lot_no in self._heaps.get(item_id, ()))
+        return pd.DataFrame(
+            [(item_id, lot_no, expiry, self._lots[(item_id, lot_no)][1]) for expiry, lot_no in rows],
+            columns=LOT_COLUMNS,
+        )
+
+    def expiring_between(self, start=None, end=None):
+        """Lots expiring between ``start`` and ``end`` (inclusive), earliest first."""
+        lo = bisect_left(self._by_expiry, (str(start)[:10],)) if start is not None else 0
+        hi = bisect_right(self._by_expiry, (str(end)[:10], '\uffff')) if end is not None else len(self._by_expiry)
+        rows = []
+        for expiry, item_id, lot_no in self._by_expiry[lo:hi]:
+            lot = self._lots.get((item_id, lot_no))
+            if lot is not None and lot[0] == expiry:
+                rows.append((item_id, lot_no, expiry, lot[1]))
+        return pd.DataFrame(rows, columns=LOT_COLUMNS)
+
+    def to_dict(self):
+        return {'rows': [[item_id, lot_no, expiry, quantity]
+                         for (item_id, lot_no), (expiry, quantity) in self._lots.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        book = cls()
+        for item_id, lot_no, expiry, quantity in data['rows']:
+            book._lots[(item_id, lot_no)] = [expiry, quantity]
+            book._heaps[item_id].append((expiry, lot_no))
+            book._by_expiry.append((expiry, item_id, lot_no))
+        for heap in book._heaps.values():
+            heapq.heapify(heap)
+        book._by_expiry.sort()
+        return book
+
+    @classmethod
+    def from_inventory(cls, df):
+        """One opening lot per item holding its current quantity."""
+        if not len(df):
+            return cls()
+        return cls.from_dict({'rows': [
+            [item_id, OPENING_LOT, str(expiry)[:10], int(quantity)]
+            for item_id, quantity, expiry in zip(df['Item_ID'], df['Quantity'], df['Expiry_Date'])
+            if quantity > 0
+        ]})
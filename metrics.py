@@ -0,0 +1,191 @@
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+EVENT_COLUMNS = ['Time', 'Event', 'Department', 'Value']
+
+# Counted events; Value is 1, or an amount for revenue
+ADMISSION = 'admission'
+APPOINTMENT = 'appointment'
+EMERGENCY = 'emergency'
+REVENUE = 'revenue'
+# Levels are recorded as changes (+1 when a bed is taken or a shift
+# starts, -1 when it ends); the level at a moment is the sum before it
+BEDS_OCCUPIED = 'beds_occupied'
+STAFF_ON_DUTY = 'staff_on_duty'
+
+TIME_RANGES = ['Today', 'This Week', 'This Month', 'This Year']
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+
+def hour_floor(time):
+    """Start of the hour ``time`` falls in, the key of its bucket."""
+    return time.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(time):
+    return time.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def period_start(time_range, now):
+    """Start of the calendar period ``time_range`` (one of TIME_RANGES) that ``now`` falls in."""
+    today = _day(now)
+    if time_range == 'Today':
+        return today
+    if time_range == 'This Week':
+        return today - timedelta(days=today.weekday())
+    if time_range == 'This Month':
+        return today.replace(day=1)
+    if time_range == 'This Year':
+        return today.replace(month=1, day=1)
+    raise ValueError(f"Unknown time range: {time_range}")
+
+
+def previous_start(time_range, start):
+    """Start of the period before the one starting at ``start``."""
+    if time_range == 'Today':
+        return start - DAY
+    if time_range == 'This Week':
+        return start - 7 * DAY
+    if time_range == 'This Month':
+        return (start - DAY).replace(day=1)
+    return start.replace(year=start.year - 1)
+
+
+def change(current, previous):
+    """Percentage change for a metric delta, or None without a baseline."""
+    if not previous:
+        return None
+    return (current - previous) / previous * 100
+
+
+class HourlyMetrics:
+    """Hospital event totals per (hour, event, department), plus the same
+    totals per day.
+
+    A range total adds whole days in the middle and hours only at its
+    ragged ends, so a year costs about 365 + 48 bucket lookups whatever
+    the number of events behind them. Switching the dashboard between
+    Today and This Year is a merge of buckets, not a scan of events.
+    """
+
+    def __init__(self):
+        self._hours = defaultdict(dict)
+        self._days = defaultdict(dict)
+        self._totals = Counter()
+        self._latest = None
+        self._lock = threading.Lock()
+
+    def _add(self, hour, event, department, value):
+        self._hours[event].setdefault(hour, Counter())[department] += value
+        self._days[event].setdefault(_day(hour), Counter())[department] += value
+        self._totals[event] += value
+        if self._latest is None or hour > self._latest:
+            self._latest = hour
+
+    def add(self, time, event, department='', value=1):
+        with self._lock:
+            self._add(hour_floor(time), event, department, value)
+
+    def add_frame(self, events):
+        """Fold a DataFrame with EVENT_COLUMNS in with one groupby."""
+        if events.empty:
+            return
+        grouped = events.groupby([events['Time'].dt.floor('h'), 'Event', 'Department'])['Value'].sum()
+        with self._lock:
+            for (hour, event, department), value in grouped.items():
+                self._add(hour.to_pydatetime(), event, department, value)
+
+    def _merge(self, buckets, start, end, step, into):
+        time = start
+        while time < end:
+            counts = buckets.get(time)
+            if counts:
+                into.update(counts)
+            time += step
+
+    def by_department(self, event, start, end):
+        """Totals of ``event`` per department over the hours from ``start``
+        up to ``end`` (hours partly covered count in full)."""
+        start, end = hour_floor(start), hour_floor(end - timedelta(microseconds=1)) + HOUR
+        totals = Counter()
+        with self._lock:
+            hours, days = self._hours.get(event, {}), self._days.get(event, {})
+            first_day = _day(start) if start == _day(start) else _day(start) + DAY
+            last_day = _day(end)
+            if first_day >= last_day:
+                self._merge(hours, start, end, HOUR, totals)
+            else:
+                self._merge(hours, start, first_day, HOUR, totals)
+                self._merge(days, first_day, last_day, DAY, totals)
+                self._merge(hours, last_day, end, HOUR, totals)
+        return totals
+
+    def total(self, event, start, end):
+        return sum(self.by_department(event, start, end).values())
+
+    def level(self, event, at):
+        """Sum of the changes to ``event`` up to ``at``, counting the hour
+        ``at`` falls in. Worked back from the running total, so the cost
+        grows with the time since ``at`` rather than the whole history."""
+        with self._lock:
+            total, latest = self._totals[event], self._latest
+        after = hour_floor(at - timedelta(microseconds=1)) + HOUR
+        if latest is None or after > latest:
+            return total
+        return total - self.total(event, after, latest + HOUR)
+
+    def series(self, event, start, end, freq):
+        """Totals of ``event`` per hour ('h'), day ('D') or month ('M')
+        from ``start`` to ``end``, as a Series indexed by bucket start."""
+        if freq == 'M':
+            daily = self.series(event, _day(start), end, 'D')
+            return daily.groupby(daily.index.to_period('M').to_timestamp()).sum()
+        step = HOUR if freq == 'h' else DAY
+        buckets = []
+        time = hour_floor(start) if freq == 'h' else _day(start)
+        while time < end:
+            buckets.append(time)
+            time += step
+        with self._lock:
+            counts = (self._hours if freq == 'h' else self._days).get(event, {})
+            values = [sum(counts[bucket].values()) if bucket in counts else 0 for bucket in buckets]
+        return pd.Series(values, index=pd.DatetimeIndex(buckets), dtype=float)
+
+    def summary(self, time_range, now=None):
+        """(value, baseline) per event for the period of ``time_range`` so
+        far. Counted events are compared with the same stretch of the
+        previous period (yesterday up to this time, and so on), levels with
+        their value at the period start."""
+        now = now or datetime.now()
+        start = period_start(time_range, now)
+        previous = previous_start(time_range, start)
+        # Capped for months that are shorter than this one so far
+        previous_end = min(previous + (now - start), start)
+        cards = {}
+        for event in (ADMISSION, APPOINTMENT, EMERGENCY, REVENUE):
+            current = self.total(event, start, now)
+            cards[event] = (current, self.total(event, previous, previous_end))
+        for event in (BEDS_OCCUPIED, STAFF_ON_DUTY):
+            current = self.level(event, now)
+            cards[event] = (current, self.level(event, start))
+        return cards
+
+    def trend(self, time_range, now=None):
+        """Patients, appointments, emergencies and revenue per bucket of the
+        period: hours for Today, days for a week or month, months for a year."""
+        now = now or datetime.now()
+        start = period_start(time_range, now)
+        freq = {'Today': 'h', 'This Week': 'D', 'This Month': 'D', 'This Year': 'M'}[time_range]
+        frame = pd.DataFrame({
+            'Patients': self.series(ADMISSION, start, now, freq),
+            'Appointments': self.series(APPOINTMENT, start, now, freq),
+            'Emergency': self.series(EMERGENCY, start, now, freq),
+            'Revenue': self.series(REVENUE, start, now, freq),
+        })
+        labels = {'h': '%H:00', 'D': '%a %d' if time_range == 'This Month' else '%a', 'M': '%b'}[freq]
+        frame.insert(0, 'Period', frame.index.strftime(labels))
+        return frame.reset_index(drop=True)
@@ -0,0 +1,199 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict('list')
+    return str(value)
+
+
+class Journal:
+    """Append-only write-ahead log with periodic snapshots.
+
+    Every change is written as one JSON line to ``wal.log``. Lines are
+    fsync'd in batches: every ``flush_every`` records, and by a background
+    thread at most ``flush_interval`` seconds after they were written, so
+    the end of a burst is synced even if no more writes follow. ``snapshot()`` atomically replaces
+    ``snapshot.json`` and starts a fresh log, so recovery only reads the
+    latest snapshot plus the records written after it.
+
+    A snapshot can be written in the background: the log is renamed to
+    ``wal.old`` straight away and only removed once the snapshot covering
+    it is on disk, so commits carry on meanwhile. Append-only tables are
+    passed as segments, files that never change once written, so each
+    snapshot only writes the segments that are new.
+    """
+
+    def __init__(self, path, flush_every=64, flush_interval=0.5):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.snapshot_path = os.path.join(path, 'snapshot.json')
+        self.wal_path = os.path.join(path, 'wal.log')
+        self.old_wal_path = os.path.join(path, 'wal.old')
+        self.segment_dir = os.path.join(path, 'segments')
+        self.seq = 0
+        self.records_since_snapshot = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._wal = None
+        self._writer = None
+        self._flusher = None
+        self._closed = threading.Event()
+        # Guards the log file between writers and the background flusher
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+
+    def recover(self):
+        """Return (state, records) to rebuild from; state is None on first start."""
+        state = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            state = snapshot['state']
+            self.seq = snapshot['seq']
+
+        # wal.old is left behind by a snapshot that never finished
+        records = self._read_log(self.old_wal_path) + self._read_log(self.wal_path)
+        if records:
+            self.seq = records[-1]['seq']
+        self.records_since_snapshot = len(records)
+        self._wal = open(self.wal_path, 'a', encoding='utf-8')
+        self._flusher = threading.Thread(target=self._flush_periodically, name='journal-flush', daemon=True)
+        self._flusher.start()
+        return state, records
+
+    def _read_log(self, path):
+        records = []
+        good_offset = 0
+        try:
+            f = open(path, 'r+b')
+        except FileNotFoundError:
+            return records
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash; everything after it is discarded
+                    break
+                good_offset += len(line)
+                if record['seq'] > self.seq:
+                    records.append(record)
+            if good_offset < os.fstat(f.fileno()).st_size:
+                f.truncate(good_offset)
+        return records
+
+    def read_segment(self, name):
+        with open(os.path.join(self.segment_dir, name), encoding='utf-8') as f:
+            return json.load(f)
+
+    def append(self, op, data):
+        with self._lock:
+            self.seq += 1
+            record = {'seq': self.seq, 'op': op, 'data': data}
+            self._wal.write(json.dumps(record, default=_json_default) + '\n')
+            # Hand the line to the OS right away so a process crash loses nothing;
+            # only the fsync (surviving power loss) is batched
+            self._wal.flush()
+            self._pending += 1
+            self.records_since_snapshot += 1
+            if self._pending >= self.flush_every or time.monotonic() - self._last_sync >= self.flush_interval:
+                self.flush()
+            return self.seq
+
+    def flush(self):
+        with self._lock:
+            if self._wal is None or not self._pending:
+                return
+            os.fsync(self._wal.fileno())
+            self._pending = 0
+            self._last_sync = time.monotonic()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    @property
+    def snapshotting(self):
+        return self._writer is not None and self._writer.is_alive()
+
+    def snapshot(self, state, segments=None, background=False):
+        """Save ``state`` as of the last appended record. ``segments`` maps
+        file names to frames (or dicts) of rows that never change; files
+        already written are skipped. ``state`` may hold frames too.
+
+        The caller must not append while this runs, but with
+        ``background=True`` only the log switch happens here and the
+        caller must not change anything in ``state`` or ``segments``
+        afterwards. Returns False if a background snapshot is still
+        being written.
+        """
+        if self.snapshotting:
+            if background:
+                return False
+            self._writer.join()
+        seq = self._rotate()
+        if background:
+            self._writer = threading.Thread(target=self._write_snapshot, args=(seq, state, segments or {}),
+                                            name='journal-snapshot', daemon=True)
+            self._writer.start()
+        else:
+            self._write_snapshot(seq, state, segments or {})
+        return True
+
+    def _rotate(self):
+        # Records up to self.seq go in the snapshot; new ones go to an empty log
+        with self._lock:
+            self.flush()
+            self._wal.close()
+            if os.path.exists(self.old_wal_path):
+                # An earlier snapshot never finished, so its records are still needed
+                with open(self.old_wal_path, 'ab') as old, open(self.wal_path, 'rb') as new:
+                    shutil.copyfileobj(new, old)
+                    old.flush()
+                    os.fsync(old.fileno())
+                os.remove(self.wal_path)
+            else:
+                os.replace(self.wal_path, self.old_wal_path)
+            self._wal = open(self.wal_path, 'w', encoding='utf-8')
+            self.records_since_snapshot = 0
+            return self.seq
+
+    def _write_json(self, path, data):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, default=_json_default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _write_snapshot(self, seq, state, segments):
+        os.makedirs(self.segment_dir, exist_ok=True)
+        for name, rows in segments.items():
+            path = os.path.join(self.segment_dir, name)
+            if not os.path.exists(path):
+                self._write_json(path, rows)
+        self._write_json(self.snapshot_path, {'seq': seq, 'state': state})
+        os.remove(self.old_wal_path)
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        if self._writer is not None:
+            self._writer.join()
+        with self._lock:
+            if self._wal is not None:
+                self.flush()
+                self._wal.close()
+                self._wal = None
@@ -0,0 +1,185 @@
+"""Render profiling for the Streamlit apps.
+
+Named sections of a rerun (a dashboard tab, a chart, a card loop) are
+timed with ``Profiler.section``. Timing is always on and costs two clock
+reads. In profiling mode - the DASHBOARD_PROFILE environment variable, or
+``?profile=1`` in the page URL of a page that lets the visitor ask (an
+Admin's) - each section also counts the DataFrames it created and
+deep-copied and the memory it left allocated (tracemalloc). The counting
+hooks and tracing are only in place while a profiled section runs.
+
+Samples are kept per section in a rolling window and summarised as
+p50/p95, both on the sidebar panel (``show_panel``) and as a JSON dump.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pandas.core.generic import NDFrame
+from pandas.core.internals.managers import BaseBlockManager
+
+ENV_VAR = 'DASHBOARD_PROFILE'
+QUERY_PARAM = 'profile'
+
+# Per-thread running totals (each Streamlit session runs on its own
+# thread); a section reports the difference between its start and end
+_counts = threading.local()
+_hooks_lock = threading.Lock()
+# Profiled sections running right now, across all sessions
+_active = 0
+_ndframe_init = NDFrame.__init__
+_manager_copy = BaseBlockManager.copy
+
+
+def requested(query_params=None, allowed=False):
+    """Whether profiling mode is switched on for this process, or for this
+    page when the visitor is ``allowed`` to ask for it in the URL."""
+    if os.environ.get(ENV_VAR, '').lower() not in ('', '0', 'false', 'off'):
+        return True
+    return allowed and query_params is not None and query_params.get(QUERY_PARAM, '').lower() in ('1', 'true', 'on')
+
+
+def _counting_init(self, *args, **kwargs):
+    _ndframe_init(self, *args, **kwargs)
+    if isinstance(self, pd.DataFrame):
+        _counts.frames = getattr(_counts, 'frames', 0) + 1
+
+
+def _counting_copy(self, deep=True):
+    if deep and self.ndim == 2:
+        _counts.copies = getattr(_counts, 'copies', 0) + 1
+    return _manager_copy(self, deep=deep)
+
+
+def _start_detail():
+    """Count DataFrame creations and deep copies and trace memory while
+    any profiled section runs, so other sessions pay nothing after it."""
+    global _active
+    with _hooks_lock:
+        _active += 1
+        if _active == 1:
+            NDFrame.__init__ = _counting_init
+            BaseBlockManager.copy = _counting_copy
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+
+def _stop_detail():
+    global _active
+    with _hooks_lock:
+        _active -= 1
+        if _active == 0:
+            NDFrame.__init__ = _ndframe_init
+            BaseBlockManager.copy = _manager_copy
+            tracemalloc.stop()
+
+
+class Profiler:
+    """Rolling samples of named sections, shared by every session in the
+    process.
+
+    Memory deltas are net bytes still allocated when a section ends. They
+    are process-wide, so sessions running at the same moment show up in
+    each other's numbers; the copy counts are per thread and exact.
+    """
+
+    def __init__(self, app, window=200):
+        self.app = app
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def section(self, name, detailed=False):
+        """Time the block as ``name``; the yielded dict gets its 'seconds'
+        when the block ends."""
+        if detailed:
+            _start_detail()
+            frames, copies = getattr(_counts, 'frames', 0), getattr(_counts, 'copies', 0)
+            memory = tracemalloc.get_traced_memory()[0]
+        timing = {}
+        started = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            elapsed = timing['seconds'] = time.perf_counter() - started
+            if detailed:
+                self.record(name, elapsed, getattr(_counts, 'copies', 0) - copies,
+                            getattr(_counts, 'frames', 0) - frames, tracemalloc.get_traced_memory()[0] - memory)
+                _stop_detail()
+            else:
+                self.record(name, elapsed)
+
+    def record(self, name, seconds, copies=None, frames=None, memory=None):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append((seconds, copies, frames, memory))
+
+    def reset(self):
+        """Drop all samples."""
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        """One row per section: runs, last/p50/p95 time (ms), and in
+        profiling mode the mean DataFrame copies and creations and the p50
+        memory delta (KB) per run."""
+        with self._lock:
+            samples = {name: np.array(rows, dtype=float) for name, rows in self._samples.items()}
+        rows = []
+        for name, s in samples.items():
+            ms = s[:, 0] * 1000
+            detailed = s[~np.isnan(s[:, 1])]
+            rows.append({
+                'Section': name,
+                'Runs': len(s),
+                'Last_ms': ms[-1],
+                'p50_ms': np.percentile(ms, 50),
+                'p95_ms': np.percentile(ms, 95),
+                'Copies': detailed[:, 1].mean() if len(detailed) else np.nan,
+                'Frames': detailed[:, 2].mean() if len(detailed) else np.nan,
+                'Memory_KB': np.percentile(detailed[:, 3], 50) / 1024 if len(detailed) else np.nan,
+            })
+        columns = ['Section', 'Runs', 'Last_ms', 'p50_ms', 'p95_ms', 'Copies', 'Frames', 'Memory_KB']
+        return pd.DataFrame(rows, columns=columns).round(1)
+
+    def to_dict(self):
+        summary = self.summary()
+        return {
+            'app': self.app,
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'window': self.window,
+            'sections': json.loads(summary.set_index('Section').to_json(orient='index')),
+        }
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+
+def show_panel(profiler, key='profiler'):
+    """Sidebar summary with a JSON download; numbers refresh on full reruns."""
+    summary = profiler.summary()
+    if summary.empty:
+        st.caption("No sections timed yet")
+        return
+    st.dataframe(summary, hide_index=True, use_container_width=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("JSON", json.dumps(profiler.to_dict(), indent=1),
+                           file_name=f"profile_{profiler.app}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                           mime='application/json', key=f"{key}_json")
+    with col2:
+        if st.button("Reset", key=f"{key}_reset"):
+            profiler.reset()
+            st.rerun()
@@ -0,0 +1,83 @@
+"""Chunked export of the usage log to CSV, gzip'd CSV or Parquet.
+
+Filters are applied to each chunk of the AppendLog before it is
+serialized, and each chunk is written straight to a temporary file, so the
+full report is never held in memory as one DataFrame or string.
+"""
+import gzip
+import os
+import tempfile
+from datetime import timedelta
+
+import pandas as pd
+
+FORMATS = {
+    'CSV': ('.csv', 'text/csv'),
+    'CSV (gzip)': ('.csv.gz', 'application/gzip'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def filter_chunk(chunk, start=None, end=None, departments=None):
+    """Rows of ``chunk`` used between ``start`` and ``end`` (dates, both
+    inclusive) in any of ``departments``. Date_Time is an ISO string, so
+    the range check is a plain string comparison."""
+    mask = pd.Series(True, index=chunk.index)
+    if start is not None:
+        mask &= chunk['Date_Time'] >= start.strftime('%Y-%m-%d')
+    if end is not None:
+        mask &= chunk['Date_Time'] < (end + timedelta(days=1)).strftime('%Y-%m-%d')
+    if departments:
+        mask &= chunk['Department'].isin(departments)
+    return chunk[mask]
+
+
+def iter_filtered(log, start=None, end=None, departments=None):
+    for chunk in log.chunks():
+        chunk = filter_chunk(chunk, start, end, departments)
+        if len(chunk):
+            yield chunk
+
+
+def _write_csv(chunks, f):
+    rows = 0
+    for chunk in chunks:
+        chunk.to_csv(f, header=rows == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks, path, columns):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(col, pa.int64() if col == 'Quantity_Used' else pa.string()) for col in columns])
+    rows = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        # One row group per log chunk
+        for chunk in chunks:
+            chunk = chunk.astype({col: str for col in columns if col != 'Quantity_Used'})
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+
+def export_usage(log, fmt='CSV', start=None, end=None, departments=None):
+    """Write the filtered usage log to a temporary file.
+
+    Returns (path, rows written); the caller owns the file and should
+    delete it once it has been sent.
+    """
+    suffix, _ = FORMATS[fmt]
+    fd, path = tempfile.mkstemp(prefix='usage_report_', suffix=suffix)
+    os.close(fd)
+    chunks = iter_filtered(log, start, end, departments)
+    if fmt == 'Parquet':
+        rows = _write_parquet(chunks, path, log.columns)
+    elif fmt == 'CSV (gzip)':
+        with gzip.open(path, 'wt', newline='', encoding='utf-8') as f:
+            rows = _write_csv(chunks, f)
+    else:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            rows = _write_csv(chunks, f)
+    return path, rows
@@ -0,0 +1,73 @@
+import threading
+from collections import defaultdict
+
+import pandas as pd
+
+ROLLUP_COLUMNS = ['Day', 'Department', 'Item_Name', 'Quantity_Used']
+
+
+class UsageRollup:
+    """Quantity used per (day, department, item), updated as usage is recorded.
+
+    Reports aggregate this table instead of the raw usage log, so their cost
+    depends on the number of distinct day/department/item combinations, not
+    on how many usage events have been logged.
+    """
+
+    def __init__(self):
+        self._totals = defaultdict(int)
+        self._lock = threading.Lock()
+        self._version = 0
+        self._frame = None
+        self._frame_version = -1
+
+    def __len__(self):
+        return len(self._totals)
+
+    def add(self, row):
+        key = (row['Date_Time'][:10], row['Department'], row['Item_Name'])
+        with self._lock:
+            self._totals[key] += int(row['Quantity_Used'])
+            self._version += 1
+
+    def add_frame(self, usage):
+        """Fold a DataFrame of usage rows in with one groupby."""
+        if usage.empty:
+            return
+        grouped = usage.groupby([usage['Date_Time'].str[:10], 'Department', 'Item_Name'])['Quantity_Used'].sum()
+        with self._lock:
+            for key, quantity in grouped.items():
+                self._totals[key] += int(quantity)
+            self._version += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {'rows': [list(key) + [quantity] for key, quantity in self._totals.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        rollup = cls()
+        for day, department, item_name, quantity in data['rows']:
+            rollup._totals[(day, department, item_name)] = quantity
+        return rollup
+
+    def to_frame(self, start=None, end=None):
+        """Rollup rows, optionally limited to days between ``start`` and ``end``."""
+        if self._frame_version != self._version:
+            with self._lock:
+                version = self._version
+                rows = [key + (quantity,) for key, quantity in self._totals.items()]
+            self._frame = pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+            self._frame_version = version
+        frame = self._frame
+        if start is not None:
+            frame = frame[frame['Day'] >= start.strftime('%Y-%m-%d')]
+        if end is not None:
+            frame = frame[frame['Day'] <= end.strftime('%Y-%m-%d')]
+        return frame
+
+    def by_department(self, start=None, end=None):
+        return self.to_frame(start, end).groupby('Department')['Quantity_Used'].sum().reset_index()
+
+    def top_items(self, n=5, start=None, end=None):
+        return self.to_frame(start, end).groupby('Item_Name')['Quantity_Used'].sum().nlargest(n).reset_index()
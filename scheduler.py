@@ -0,0 +1,191 @@
+import heapq
+import itertools
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+
+APPOINTMENT_COLUMNS = ['ID', 'Patient', 'Doctor', 'Room', 'Department', 'Start', 'End']
+
+DEFAULT_DURATION = timedelta(minutes=30)
+# Suggested slots start on this grid, within clinic hours
+SLOT_STEP = timedelta(minutes=15)
+DAY_START = time(9)
+DAY_END = time(17)
+# How far ahead a free slot is looked for before giving up on a doctor
+SEARCH_DAYS = 90
+
+
+def _ceil(moment, step=SLOT_STEP):
+    """``moment`` rounded up to the slot grid."""
+    midnight = datetime.combine(moment.date(), time())
+    steps = -(-(moment - midnight) // step)
+    return midnight + steps * step
+
+
+class Calendar:
+    """Bookings of one doctor or room, as parallel lists sorted by start.
+
+    Bookings never overlap, so their ends are sorted too, and the only
+    booking that can clash with a new one is the one starting at or
+    before it or the one after: a conflict check is one binary search.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def conflict(self, start, end):
+        """Index of a booking overlapping [start, end), or None."""
+        i = bisect_right(self.starts, start)
+        if i and self.ends[i - 1] > start:
+            return i - 1
+        if i < len(self.starts) and self.starts[i] < end:
+            return i
+        return None
+
+    def add(self, start, end, appointment_id):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, appointment_id)
+
+    def remove(self, start, appointment_id):
+        i = bisect_left(self.starts, start)
+        while i < len(self.ids) and self.ids[i] != appointment_id:
+            i += 1
+        if i < len(self.ids):
+            del self.starts[i], self.ends[i], self.ids[i]
+
+    def free_slots(self, after, duration, until):
+        """Start times of free slots of ``duration`` from ``after`` up to
+        ``until``, on the slot grid and within clinic hours, earliest
+        first. Each booked stretch is jumped over with one binary search."""
+        slot = _ceil(after)
+        while slot < until:
+            if slot.time() < DAY_START:
+                slot = datetime.combine(slot.date(), DAY_START)
+            end = slot + duration
+            if end > datetime.combine(slot.date(), DAY_END):
+                slot = datetime.combine(slot.date() + timedelta(days=1), DAY_START)
+                continue
+            clash = self.conflict(slot, end)
+            if clash is not None:
+                slot = _ceil(self.ends[clash])
+                continue
+            yield slot
+            slot = _ceil(end)
+
+
+class Scheduler:
+    """Appointments as typed [start, end) intervals with a calendar per
+    doctor and per room.
+
+    Booking checks both calendars in O(log n) under one lock, so a doctor
+    or room can never be double-booked, even with concurrent sessions.
+    Free-slot suggestions for a department merge every doctor's free
+    slots in time order with a heap, so the first N cost about
+    N log(doctors) plus the bookings skipped on the way.
+    """
+
+    def __init__(self):
+        self._department_of = {}
+        self._calendars = {}
+        self._rooms = {}
+        self._appointments = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._appointments)
+
+    def add_doctor(self, doctor, department):
+        with self._lock:
+            self._department_of[doctor] = department
+            self._calendars.setdefault(doctor, Calendar())
+
+    def doctors(self, department=None):
+        return sorted(d for d, dept in self._department_of.items() if department is None or dept == department)
+
+    def departments(self):
+        return sorted(set(self._department_of.values()))
+
+    def book(self, patient, doctor, start, duration=DEFAULT_DURATION, room=None):
+        """Book ``doctor`` (and ``room``, if given) from ``start``. Returns
+        (True, appointment ID) or (False, the reason it clashed)."""
+        end = start + duration
+        if end <= start:
+            return False, "Duration must be positive"
+        with self._lock:
+            calendar = self._calendars.get(doctor)
+            if calendar is None:
+                return False, f"Unknown doctor: {doctor}"
+            clash = calendar.conflict(start, end)
+            if clash is not None:
+                return False, f"{doctor} is booked {calendar.starts[clash]:%d %b %H:%M}-{calendar.ends[clash]:%H:%M}"
+            room_calendar = self._rooms.setdefault(room, Calendar()) if room else None
+            if room_calendar is not None:
+                clash = room_calendar.conflict(start, end)
+                if clash is not None:
+                    return False, f"{room} is booked {room_calendar.starts[clash]:%d %b %H:%M}-{room_calendar.ends[clash]:%H:%M}"
+            appointment_id = f"A{next(self._ids):06}"
+            self._appointments[appointment_id] = (patient, doctor, room or '', self._department_of[doctor], start, end)
+            calendar.add(start, end, appointment_id)
+            if room_calendar is not None:
+                room_calendar.add(start, end, appointment_id)
+            return True, appointment_id
+
+    def cancel(self, appointment_id):
+        with self._lock:
+            appointment = self._appointments.pop(appointment_id, None)
+            if appointment is None:
+                return False
+            _, doctor, room, _, start, _ = appointment
+            self._calendars[doctor].remove(start, appointment_id)
+            if room:
+                self._rooms[room].remove(start, appointment_id)
+            return True
+
+    def is_free(self, doctor, start, duration=DEFAULT_DURATION):
+        calendar = self._calendars.get(doctor)
+        return calendar is not None and calendar.conflict(start, start + duration) is None
+
+    def next_free_slots(self, department, after=None, n=5, duration=DEFAULT_DURATION):
+        """The ``n`` earliest (start, doctor) slots of ``duration`` across
+        the doctors of ``department``."""
+        after = after or datetime.now()
+        until = after + timedelta(days=SEARCH_DAYS)
+        with self._lock:
+            slots = [self._doctor_slots(doctor, after, duration, until) for doctor in self.doctors(department)]
+            return list(itertools.islice(heapq.merge(*slots), n))
+
+    def _doctor_slots(self, doctor, after, duration, until):
+        for start in self._calendars[doctor].free_slots(after, duration, until):
+            yield start, doctor
+
+    def frame(self, start=None, end=None):
+        """Appointments starting in [start, end), as APPOINTMENT_COLUMNS sorted by start."""
+        with self._lock:
+            rows = [(appointment_id,) + appointment for appointment_id, appointment in self._appointments.items()
+                    if (start is None or appointment[4] >= start) and (end is None or appointment[4] < end)]
+        frame = pd.DataFrame(rows, columns=APPOINTMENT_COLUMNS)
+        return frame.sort_values(['Start', 'Doctor'], ignore_index=True)
+
+    @classmethod
+    def from_frame(cls, appointments, day, departments=None, duration=DEFAULT_DURATION):
+        """A scheduler from rows with Patient, Doctor, Department and a
+        Time like "10:00 AM" on ``day``. Doctors not in any row can be
+        added with ``departments`` ({doctor: department})."""
+        scheduler = cls()
+        for doctor, department in (departments or {}).items():
+            scheduler.add_doctor(doctor, department)
+        for row in appointments.itertuples(index=False):
+            scheduler.add_doctor(row.Doctor, row.Department)
+            start = datetime.combine(day, datetime.strptime(row.Time, "%I:%M %p").time())
+            scheduler.book(row.Patient, row.Doctor, start, duration)
+        return scheduler
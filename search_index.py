@@ -0,0 +1,154 @@
+from collections import Counter, defaultdict
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _within_distance(a, b, max_dist):
+    """True if the Levenshtein distance between a and b is at most max_dist."""
+    if abs(len(a) - len(b)) > max_dist:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > max_dist:
+            return False
+        previous = current
+    return previous[-1] <= max_dist
+
+
+def _allowed_typos(word, max_typos):
+    if len(word) < 4:
+        return 0
+    if len(word) < 8:
+        return min(1, max_typos)
+    return max_typos
+
+
+class SearchIndex:
+    """Trigram inverted index for case-insensitive search over short texts.
+
+    Queries of three or more characters match any entry containing them
+    (like ``str.contains``) by intersecting trigram postings. Shorter
+    queries match word prefixes. When nothing matches exactly, each query
+    word is matched against the vocabulary of indexed words allowing up to
+    ``max_typos`` edits (fewer for short words), which keeps typo matching
+    proportional to the vocabulary rather than to the number of entries.
+    Entries can be added, replaced and removed one at a time.
+    """
+
+    def __init__(self, max_typos=2):
+        self.max_typos = max_typos
+        self._text = {}
+        self._postings = defaultdict(set)
+        self._prefixes = defaultdict(set)
+        self._word_docs = defaultdict(set)
+        self._word_postings = defaultdict(set)
+
+    def __len__(self):
+        return len(self._text)
+
+    def add(self, doc_id, text):
+        if doc_id in self._text:
+            self.remove(doc_id)
+        text = ' '.join(str(text).lower().split())
+        self._text[doc_id] = text
+        for gram in _trigrams(text):
+            self._postings[gram].add(doc_id)
+        for word in set(text.split()):
+            self._prefixes[word[:1]].add(doc_id)
+            self._prefixes[word[:2]].add(doc_id)
+            if not self._word_docs[word]:
+                for gram in _trigrams(word):
+                    self._word_postings[gram].add(word)
+            self._word_docs[word].add(doc_id)
+
+    def remove(self, doc_id):
+        text = self._text.pop(doc_id, None)
+        if text is None:
+            return
+        for gram in _trigrams(text):
+            self._postings[gram].discard(doc_id)
+        for word in set(text.split()):
+            self._prefixes[word[:1]].discard(doc_id)
+            self._prefixes[word[:2]].discard(doc_id)
+            self._word_docs[word].discard(doc_id)
+            if not self._word_docs[word]:
+                del self._word_docs[word]
+                for gram in _trigrams(word):
+                    self._word_postings[gram].discard(word)
+
+    def search(self, query, limit=None):
+        """Matching doc ids: entries starting with the query first, then
+        entries with a word starting with it, then other matches. Ties keep
+        doc id order."""
+        query = ' '.join(str(query).lower().split())
+        if not query:
+            return []
+        if len(query) < 3:
+            return self._rank(self._prefixes.get(query, ()), query, limit)
+
+        postings = sorted((self._postings.get(gram, set()) for gram in _trigrams(query)), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        ranked = self._rank(candidates, query, limit, exact=True)
+        if ranked or not self.max_typos:
+            return ranked
+        return self._rank(self._fuzzy(query), query, limit)
+
+    def _rank(self, doc_ids, query, limit, exact=False):
+        # With exact=True, candidates that share every trigram but don't
+        # actually contain the query are dropped here
+        starts, word_starts, others = [], [], []
+        for doc_id in doc_ids:
+            text = self._text[doc_id]
+            at = text.find(query)
+            if at < 0 and exact:
+                continue
+            if at == 0:
+                starts.append(doc_id)
+            elif at > 0 and text[at - 1] == ' ':
+                word_starts.append(doc_id)
+            else:
+                others.append(doc_id)
+        ranked = []
+        for group in (starts, word_starts, others):
+            if limit is not None and len(ranked) >= limit:
+                break
+            ranked.extend(sorted(group))
+        return ranked if limit is None else ranked[:limit]
+
+    def _fuzzy(self, query):
+        # Every query word must match some word of the entry within its typo
+        # allowance; the last word may still be being typed, so it is also
+        # compared against word prefixes.
+        words = query.split()
+        matched = None
+        for i, word in enumerate(words):
+            docs = set()
+            for candidate in self._similar_words(word, prefix=i == len(words) - 1):
+                docs |= self._word_docs[candidate]
+            matched = docs if matched is None else matched & docs
+            if not matched:
+                return []
+        return list(matched)
+
+    def _similar_words(self, word, prefix):
+        typos = _allowed_typos(word, self.max_typos)
+        grams = _trigrams(word)
+        if not typos or not grams:
+            return [w for w in self._word_docs if w.startswith(word)] if prefix else [word] if word in self._word_docs else []
+        # Each edit breaks at most three trigrams of the word
+        needed = max(1, len(grams) - 3 * typos)
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self._word_postings.get(gram, ()))
+        similar = []
+        for candidate, count in overlap.items():
+            if count < needed:
+                continue
+            if _within_distance(word, candidate, typos) or (prefix and _within_distance(word, candidate[:len(word)], typos)):
+                similar.append(candidate)
+        return similar
@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from inventory_db import InventoryDB
+
+GAUZE = {
+    'Item_ID': 'SUP001', 'Item_Name': 'Gauze Dressings', 'Category': 'Supply',
+    'Quantity': 10, 'Min_Stock': 5, 'Unit': 'Packet', 'Expiry_Date': '2027-01-10',
+    'Location': 'Medical Store', 'Last_Updated': '2026-01-01 08:00',
+}
+
+
+def test_empty_directory_opens_and_takes_items(tmp_path):
+    db = InventoryDB(str(tmp_path))
+    assert len(db.store) == 0
+    assert db.add_item(dict(GAUZE))
+    ok, remaining = db.record_usage('SUP001', 3, 'Nurse', 'General Ward', '')
+    assert ok and remaining == 7
+    db.journal.close()
+
+    reopened = InventoryDB(str(tmp_path))
+    assert reopened.store.get('SUP001', 'Quantity') == 7
+    assert reopened.store.df['Quantity'].dtype == 'int64'
+    reopened.journal.close()
+
+
+def test_transfer_rejects_non_positive_quantities(tmp_path):
+    db = InventoryDB(str(tmp_path))
+    db.add_item(dict(GAUZE))
+    seq = db.journal.seq
+    for quantity in (0, -5, 2.5, True):
+        assert not db.transfer_stock('SUP001', 'Medical Store', 'ICU', quantity, 'Admin')
+    assert db.journal.seq == seq
+    assert db.transfer_stock('SUP001', 'Medical Store', 'ICU', 4, 'Admin')
+    assert db.location_stock.available(0, 'ICU') == 4
+    db.journal.close()
+
+
+def test_location_edit_moves_home_stock(tmp_path):
+    db = InventoryDB(str(tmp_path))
+    db.add_item(dict(GAUZE))
+    db.transfer_stock('SUP001', 'Medical Store', 'ICU', 4, 'Admin')
+    db.update_item('SUP001', Location='Pharmacy')
+    assert db.location_stock.available(0, 'Medical Store') == 0
+    assert db.location_stock.available(0, 'Pharmacy') == 6
+    assert db.location_stock.available(0, 'ICU') == 4
+    db.journal.close()
+
+    reopened = InventoryDB(str(tmp_path))
+    assert reopened.location_stock.available(0, 'Pharmacy') == 6
+    reopened.journal.close()